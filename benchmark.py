@@ -0,0 +1,205 @@
+# Times the operations of the Matrix class across sizes and structures of matrices, so every performance
+# change can be measured and regressions are caught.
+#
+# Every operation is run on fresh Matrix objects for each repeat, so factorizations and structure checks kept
+# by a Matrix are never reused between runs. The median and percentiles of the times are recorded, with the
+# peak memory of one more run traced by tracemalloc (not timed, as tracing slows Numpy down).
+#
+# Usage:
+#   py .\benchmark.py [--sizes 10 100 500 1000] [--structures dense symmetric triangular] [--ops add inverse]
+#                     [--repeats 5] [--output bench.json] [--baseline baseline.json] [--threshold 0.2]
+#
+# Exits with 1 if the median of a operation is more than the threshold slower than in the baseline.
+
+# %%
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from script import Matrix, MatrixStore
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+SIZES = [10, 100, 500, 1000, 2000, 4000]
+STRUCTURES = ["dense", "symmetric", "triangular"]
+
+# Operations that do not depend on the structure of the matrix are only run on dense matrices
+DENSE_ONLY = ["createRandom", "createImport", "save", "load"]
+OPERATIONS = ["createRandom", "createImport", "add", "subtract", "multiply", "transpose",
+              "determinate", "inverse", "eigenDecomp", "save", "load"]
+
+# %%
+# Makes the values of a test matrix. The triangular matrix has small values above a diagonal of distinct values
+# whose product is 1, so it is far from singular and its determinate does not overflow.
+#
+# size - int - the rows and columns of the matrix
+# structure - str - "dense", "symmetric", or "triangular"
+#
+# Returns a numpy matrix
+def makeValues(size, structure):
+    values = np.random.default_rng(size).random((size, size))
+    if structure == "symmetric":
+        return (values + values.T) / 2
+    elif structure == "triangular":
+        return np.triu(values, 1) / size + np.diag(np.exp(np.linspace(-0.5, 0.5, size)))
+    return values
+
+# Makes the function timed for a operation, with the set up it needs done before the timing starts.
+# The Matrix objects are made in the set up so every run starts without any kept factorizations.
+#
+# operation - str - the name of the operation
+# values - the numpy matrix used by the operation
+# folder - str - a empty folder the operation can write files to
+#
+# Returns a function that does the set up and returns the function to time
+def makeRun(operation, values, folder):
+    size = values.shape[0]
+    csvPath = os.path.join(folder, "benchmark.csv")
+
+    if operation == "createImport" and not os.path.exists(csvPath):
+        np.savetxt(csvPath, values, delimiter = ",")
+    if operation == "load":
+        MatrixStore(folder).saveMatrix("benchmark", Matrix(values))
+
+    def setUp():
+        matrixA, matrixB = Matrix(values), Matrix(values.copy())
+        store = MatrixStore(folder)
+
+        match operation:
+            case "createRandom":
+                return lambda: Matrix.createRandom(size, size, False, seed = 0)
+            case "createImport":
+                return lambda: Matrix.createImport(csvPath)
+            case "add":
+                return lambda: matrixA.add(matrixB)
+            case "subtract":
+                return lambda: matrixA.subtract(matrixB)
+            case "multiply":
+                return lambda: matrixA.multiply(matrixB)
+            case "transpose":
+                # A transpose is a view, so the copy into a contiguous array is included
+                return lambda: np.ascontiguousarray(matrixA.transpose().getMatrix())
+            case "determinate":
+                return lambda: matrixA.determinate()
+            case "inverse":
+                return lambda: matrixA.inverse()
+            case "eigenDecomp":
+                return lambda: matrixA.eigenDecomp()
+            case "save":
+                return lambda: store.saveMatrix("benchmarkSave", matrixA)
+            case "load":
+                # Loaded matrices are memory mapped, so the values are read to include the time spent on the disk
+                return lambda: np.asarray(store.loadMatrix("benchmark").getMatrix()).sum()
+
+    return setUp
+
+# Times one operation, then traces the peak memory of one more run.
+# The determinates of large random matrices overflow, which is not a error for the benchmark.
+#
+# setUp - a function returned by makeRun
+# repeats - int - the amount of timed runs
+#
+# Returns a dict of the timings in seconds and the peak memory in bytes
+def measure(setUp, repeats):
+    timings = []
+    with np.errstate(over = "ignore"):
+        for i in range(repeats):
+            run = setUp()
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+        run = setUp()
+        tracemalloc.start()
+        run()
+        peakBytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {"median": float(np.median(timings)),
+            "p10": float(np.percentile(timings, 10)),
+            "p90": float(np.percentile(timings, 90)),
+            "min": min(timings),
+            "peakBytes": peakBytes}
+
+# Compares the results against a baseline
+#
+# results - dict - the results of this run, by operation, structure, and size
+# baseline - dict - the results of a earlier run
+# threshold - float - the fraction a median may be slower than the baseline, 0.2 allows 20% slower
+# noise - float - differences smaller than this many seconds are never counted as regressions
+#
+# Returns a list of the keys of the operations that regressed
+def compare(results, baseline, threshold, noise):
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+
+        before, after = baseline[key]["median"], result["median"]
+        ratio = after / before if before > 0 else 1.0
+        if ratio > 1 + threshold and after - before > noise:
+            regressions.append(key)
+            print(f"Regression: {key} median {after:.6f}s, baseline {before:.6f}s ({ratio:.2f}x)")
+    return regressions
+
+# %%
+def main():
+    parser = argparse.ArgumentParser(description = "Measure the speed and memory of the Matrix operations.")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = SIZES, help = "rows and columns of the matrices")
+    parser.add_argument("--structures", nargs = "+", default = STRUCTURES, choices = STRUCTURES, help = "structures of the matrices")
+    parser.add_argument("--ops", nargs = "+", default = OPERATIONS, choices = OPERATIONS, help = "operations to time")
+    parser.add_argument("--repeats", type = int, default = 5, help = "number of timed runs of each operation")
+    parser.add_argument("--output", default = None, help = "path of a JSON file to write the results to")
+    parser.add_argument("--baseline", default = None, help = "path of a JSON file of earlier results to compare against")
+    parser.add_argument("--threshold", type = float, default = 0.2, help = "fraction a median may be slower than the baseline")
+    parser.add_argument("--noise", type = float, default = 0.001, help = "differences in seconds too small to count as regressions")
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        for structure in args.structures:
+            values = makeValues(size, structure)
+            folder = tempfile.mkdtemp(dir = FOLDER)
+
+            try:
+                for operation in args.ops:
+                    if structure != "dense" and operation in DENSE_ONLY:
+                        continue
+
+                    key = f"{operation}/{structure}/{size}"
+                    results[key] = measure(makeRun(operation, values, folder), args.repeats)
+                    print(f"{key:<32} median {results[key]['median']:.6f}s  p90 {results[key]['p90']:.6f}s  "
+                          f"peak {results[key]['peakBytes'] / 1024 / 1024:.1f} MB")
+            finally:
+                shutil.rmtree(folder, ignore_errors = True)
+
+    report = {"python": platform.python_version(),
+              "numpy": np.__version__,
+              "platform": platform.platform(),
+              "repeats": args.repeats,
+              "results": results}
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent = 2)
+
+    failed = False
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        failed = len(compare(results, baseline, args.threshold, args.noise)) > 0
+        if not failed:
+            print(f"No operation is more than {args.threshold:.0%} slower than the baseline.")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Client of the MatrixServer of script.py, so other programs can run the Matrix operations on the matrices kept
+# by a running server.
+#
+# Start the server with:
+#   py .\script.py --serve [--port 8765] [--workers 4]
+#
+# Then, from python:
+#   with MatrixClient() as client:
+#       client.put("A", np.random.random((1000, 1000)))
+#       inverse = client.call("inverse", "A")
+#       client.call("multiply", "A", "A", keep = ["B"])
+#       values, vectors = client.call("eigenDecomp", "B", reconstruct = False)[1:]
+#
+# A client sends one request at a time and waits for its answer, so threads that send requests at the same
+# time each need their own client.
+
+# %%
+import json
+import socket
+import struct
+
+import numpy as np
+
+from script import Matrix, MatrixServer
+
+# %%
+class MatrixClient:
+
+    # host - str - the address of the server
+    # port - int - the port of the server, MatrixServer.port if not provided
+    # timeout - float - the most seconds to wait for a answer, forever if None
+    def __init__(self, host = "127.0.0.1", port = None, timeout = None):
+        self.__socket = socket.create_connection((host, port if port is not None else MatrixServer.port), timeout = timeout)
+        self.__socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.__id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    # Closes the connection to the server
+    def close(self):
+        self.__socket.close()
+
+    # Runs a operation on the server
+    #
+    # operation - str - the name of the operation, such as "multiply" or "inverse"
+    # matrices - the names of matrices on the server, or Matrix objects, Numpy arrays or SparseArrays to send
+    # keep - list - names to keep the results under on the server instead of sending them back, "_" skips a result
+    # parameters - the parameters of the operation, such as dtype = "float32" for toDtype
+    #
+    # Will return either the result, a list of results for eigenDecomp, the kept results if keep is given, or None
+    # if the server could not run the operation
+    def call(self, operation, *matrices, keep = None, **parameters):
+        response, values = self.request(operation, matrices, parameters, keep)
+        if not response["ok"]:
+            print(response["error"])
+            return
+        elif keep is not None:
+            return response["kept"]
+        elif operation == "eigenDecomp":
+            return values
+        return values[0] if len(values) > 0 else None
+
+    # Sends a request and reads its answer
+    #
+    # operation - str - the name of the operation
+    # matrices - list - the names of matrices on the server, or values to send
+    # parameters - dict - the parameters of the operation
+    # keep - list - names to keep the results under, or None
+    #
+    # Returns a tuple of the header of the answer and the list of its values
+    def request(self, operation, matrices = (), parameters = None, keep = None):
+        references, sent = [], []
+        for matrix in matrices:
+            if isinstance(matrix, str):
+                references.append(matrix)
+            else:
+                references.append(len(sent))
+                sent.append(matrix.getMatrix() if isinstance(matrix, Matrix) else matrix)
+
+        self.__id += 1
+        descriptions, arrays = MatrixServer.describe(sent)
+        header = {"id": self.__id, "operation": operation, "matrices": references,
+                  "parameters": parameters or {}, "values": descriptions}
+        if keep is not None:
+            header["keep"] = list(keep)
+
+        data = json.dumps(header).encode()
+        self.__socket.sendall(struct.pack("<I", len(data)) + data)
+        for array in arrays:
+            for chunk in MatrixServer.chunks(array):
+                self.__socket.sendall(chunk)
+
+        response = json.loads(self.__read(struct.unpack("<I", self.__read(4))[0]))
+        arrays = []
+        for dtype, shape in MatrixServer.layout(response.get("values", [])):
+            array = np.empty(shape, dtype = dtype)
+            self.__readInto(array.reshape(-1).view(np.uint8))
+            arrays.append(array)
+        return response, MatrixServer.rebuild(response.get("values", []), arrays)
+
+    # Keeps a matrix on the server under a name
+    #
+    # name - str - the name to keep it under
+    # matrix - a Matrix object, Numpy array, or SparseArray
+    #
+    # Will return either a dict of the rows, cols and dtype of the kept matrix or None
+    def put(self, name, matrix):
+        kept = self.call("put", matrix, keep = [name])
+        return kept[0] if kept else None
+
+    # Will return either the values of a kept or saved matrix, a Numpy array or SparseArray, or None
+    def get(self, name):
+        return self.call("get", name)
+
+    # Forgets kept matrices, the saved matrices of the server are not deleted
+    def drop(self, *names):
+        self.request("drop", names)
+
+    # Saves a kept matrix to the matrices folder of the server
+    #
+    # Returns wether the matrix was saved
+    def save(self, name, savedName = None):
+        response = self.request("save", [name], {"name": savedName if savedName is not None else name})[0]
+        if not response["ok"]:
+            print(response["error"])
+        return response["ok"]
+
+    # Returns the list of the names of the kept and saved matrices
+    def list(self):
+        return self.request("list")[0]["names"]
+
+    # Sends a request that does nothing, used to check that the server answers
+    def ping(self):
+        self.request("ping")
+
+    # Reads a amount of bytes from the server
+    def __read(self, size):
+        data = bytearray(size)
+        self.__readInto(memoryview(data))
+        return bytes(data)
+
+    # Reads from the server until a buffer is full
+    #
+    # buffer - a writable buffer, such as a Numpy array of bytes
+    def __readInto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        received = 0
+        while received < len(view):
+            count = self.__socket.recv_into(view[received:])
+            if count == 0:
+                raise ConnectionError("the server closed the connection")
+            received += count
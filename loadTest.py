@@ -0,0 +1,158 @@
+# Measures how many requests a MatrixServer answers per second, and how long the requests take, when several
+# clients send requests at the same time.
+#
+# A server is started in a new python process with a empty matrices folder and no result cache, unless the port
+# of a running server is given. A size x size matrix is kept on the server as "loadA", then every client sends
+# its requests for the operation on it one after the other, from a thread of its own.
+#
+# Usage:
+#   py .\loadTest.py [--clients 8] [--requests 50] [--operation multiply] [--size 200] [--workers 4]
+#                    [--port 8765] [--output load.json]
+#
+# Exits with 1 if a request fails.
+
+# %%
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from client import MatrixClient
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+# The matrices each operation is run on, "loadA" is the matrix kept on the server
+OPERATIONS = { "ping": [],
+               "get": ["loadA"],
+               "transpose": ["loadA"],
+               "add": ["loadA", "loadA"],
+               "multiply": ["loadA", "loadA"],
+               "determinate": ["loadA"],
+               "inverse": ["loadA"],
+               "solve": ["loadA", "loadA"],
+               "eigenDecomp": ["loadA"]
+              }
+
+# %%
+# Starts a server in a new python process
+#
+# folder - str - a empty folder to run the server in
+# workers - int - the amount of threads the server runs operations on, or None
+#
+# Returns a tuple of the process and the port the server listens on
+def startServer(folder, workers):
+    command = [sys.executable, "-u", os.path.join(FOLDER, "script.py"), "--serve", "--port", "0", "--result-cache", "0"]
+    if workers is not None:
+        command += ["--workers", str(workers)]
+
+    process = subprocess.Popen(command, cwd = folder, stdout = subprocess.PIPE, text = True)
+    for line in process.stdout:
+        if line.startswith("Serving matrices on"):
+            # The rest of the output is read so the server never waits on a full pipe
+            threading.Thread(target = process.stdout.read, daemon = True).start()
+            return process, int(line.rsplit(":", 1)[1])
+
+    process.wait()
+    raise RuntimeError("the server did not start")
+
+# Sends the requests of one client, one after the other
+#
+# port - int - the port of the server
+# operation - str - the operation to request
+# requests - int - the amount of requests to send
+# latencies - list - the seconds each request took are added to it
+# failures - list - the errors of the failed requests are added to it
+def runClient(port, operation, requests, latencies, failures):
+    try:
+        with MatrixClient(port = port) as client:
+            for i in range(requests):
+                start = time.perf_counter()
+                response = client.request(operation, OPERATIONS[operation])[0]
+                latencies.append(time.perf_counter() - start)
+                if not response["ok"]:
+                    failures.append(response["error"])
+    except (ConnectionError, OSError) as error:
+        failures.append(str(error))
+
+# Runs the load test against a server
+#
+# Returns a dict of the results
+def measure(port, operation, clients, requests, size):
+    with MatrixClient(port = port) as client:
+        # A diagonally dominant matrix, so the inverse and solve never fail
+        values = np.random.default_rng(0).random((size, size)) + np.eye(size) * size
+        client.put("loadA", values)
+
+    latencies, failures = [], []
+    threads = [threading.Thread(target = runClient, args = (port, operation, requests, latencies, failures))
+               for i in range(clients)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {"operation": operation,
+            "size": size,
+            "clients": clients,
+            "requests": len(latencies),
+            "failures": len(failures),
+            "seconds": elapsed,
+            "requestsPerSecond": len(latencies) / elapsed if elapsed > 0 else 0.0,
+            "p50": float(np.percentile(latencies, 50)) if latencies else None,
+            "p90": float(np.percentile(latencies, 90)) if latencies else None,
+            "p99": float(np.percentile(latencies, 99)) if latencies else None,
+            "max": max(latencies) if latencies else None,
+            "errors": sorted(set(failures))[:5]}
+
+# %%
+def main():
+    parser = argparse.ArgumentParser(description = "Measure the requests per second and latencies of a MatrixServer.")
+    parser.add_argument("--clients", type = int, default = 8, help = "number of clients sending requests at the same time")
+    parser.add_argument("--requests", type = int, default = 50, help = "number of requests each client sends")
+    parser.add_argument("--operation", default = "multiply", choices = list(OPERATIONS), help = "operation to request")
+    parser.add_argument("--size", type = int, default = 200, help = "rows and columns of the matrix the operation is run on")
+    parser.add_argument("--workers", type = int, default = None, help = "threads of the started server, all of the cores if not given")
+    parser.add_argument("--port", type = int, default = None, help = "port of a running server to test instead of starting one")
+    parser.add_argument("--output", default = None, help = "path of a JSON file to write the results to")
+    args = parser.parse_args()
+
+    process, folder = None, None
+    port = args.port
+    if port is None:
+        folder = tempfile.mkdtemp()
+        process, port = startServer(folder, args.workers)
+
+    try:
+        results = measure(port, args.operation, args.clients, args.requests, args.size)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+            shutil.rmtree(folder, ignore_errors = True)
+
+    print(f"{results['operation']} on {results['size']}x{results['size']}, {results['clients']} clients: "
+          f"{results['requestsPerSecond']:.1f} requests/s over {results['seconds']:.2f}s")
+    if results["requests"] > 0:
+        print(f"latency p50 {results['p50'] * 1000:.2f}ms  p90 {results['p90'] * 1000:.2f}ms  "
+              f"p99 {results['p99'] * 1000:.2f}ms  max {results['max'] * 1000:.2f}ms")
+    for error in results["errors"]:
+        print(f"Failed: {error}")
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent = 2)
+
+    sys.exit(1 if results["failures"] > 0 else 0)
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,521 @@
 
 # %%
 import numpy as np
+import argparse
+import functools
+import hashlib
+import io
+import json
+import mmap
 import os
-import seaborn as sns
-import matplotlib.pyplot as plt
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+# seaborn and matplotlib are only imported once a heatmap is shown, and asyncio once the server is started,
+# as importing them takes longer than starting the rest of the program
+
+# %% [markdown]
+# # Sparse Array Class
+
+# %%
+# Class utilized to hold the values of a sparse Matrix in the compressed sparse row (CSR) format,
+# where only the nonzero values are stored, so memory and time scale with the nonzeros instead of n^2.
+#
+# data - the nonzero values, ordered by row and then by column
+# indices - the column of each nonzero value
+# indptr - where the values of each row start in data, with one extra entry for the end of the last row
+class SparseArray:
+
+    # The most products held in memory at once while multiplying, the rows are processed in chunks below it
+    chunkProducts = 1 << 22
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data = np.asarray(data)
+        self.indices = np.asarray(indices, dtype = np.int64)
+        self.indptr = np.asarray(indptr, dtype = np.int64)
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.dtype = self.data.dtype
+        self.nbytes = self.data.nbytes + self.indices.nbytes + self.indptr.nbytes
+
+    # Constructor used to build a sparse array from coordinate (COO) triplets,
+    # values given more than once for the same row and column are summed and zeros are dropped
+    #
+    # rows - a numpy array of row indices
+    # cols - a numpy array of column indices
+    # values - a numpy array of values
+    # shape - tuple - the rows and columns of the array
+    #
+    # Returns a SparseArray
+    @classmethod
+    def fromTriplets(cls, rows, cols, values, shape):
+        rows, cols, values = SparseArray.__sumTriplets(rows, cols, values, shape)
+
+        indptr = np.zeros(shape[0] + 1, dtype = np.int64)
+        np.cumsum(np.bincount(rows, minlength = shape[0]), out = indptr[1:])
+        return cls(values, cols, indptr, shape)
+
+    # Constructor used to build a sparse array from a 2-D numpy matrix
+    #
+    # Returns a SparseArray
+    @classmethod
+    def fromDense(cls, npMatrix):
+        rows, cols = np.nonzero(npMatrix)
+        return cls.fromTriplets(rows, cols, npMatrix[rows, cols], npMatrix.shape)
+
+    # Function needed to build sparse arrays, sorts triplets by row and column, sums the values of
+    # repeated coordinates, and drops the zeros
+    #
+    # Returns a tuple of the rows, columns, and values
+    @staticmethod
+    def __sumTriplets(rows, cols, values, shape):
+        keys = np.asarray(rows, dtype = np.int64) * shape[1] + np.asarray(cols, dtype = np.int64)
+        values = np.asarray(values)
+
+        order = np.argsort(keys, kind = "stable")
+        keys = keys[order]
+        values = values[order]
+
+        if keys.size > 0:
+            starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+            keys = keys[starts]
+            values = np.add.reduceat(values, starts)
+
+        nonzero = values != 0
+        keys = keys[nonzero]
+        return keys // shape[1], keys % shape[1], values[nonzero]
+
+    # returns the row of each stored value
+    def rowIndices(self):
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    # returns the amount of stored values
+    def getNnz(self):
+        return self.data.size
+
+    # returns the fraction of the values that are stored
+    def density(self):
+        return self.data.size / max(self.shape[0] * self.shape[1], 1)
+
+    # Structure checks, comparing the row and column of each stored value
+
+    # returns wether no values are stored below the diagonal
+    def isUpperTriangular(self):
+        return bool(np.all(self.indices >= self.rowIndices()))
+
+    # returns wether no values are stored above the diagonal
+    def isLowerTriangular(self):
+        return bool(np.all(self.indices <= self.rowIndices()))
+
+    # returns wether the array is equal to its transpose
+    def isSymmetric(self):
+        transposed = self.transpose()
+        return (self.shape[0] == self.shape[1] and np.array_equal(self.indptr, transposed.indptr)
+                and np.array_equal(self.indices, transposed.indices) and np.array_equal(self.data, transposed.data))
+
+    # returns the array as a 2-D numpy matrix
+    def toDense(self):
+        return self.denseRows(0, self.shape[0])
+
+    # Finds a block of rows as a 2-D numpy matrix, reading only the stored values of those rows
+    #
+    # start - int - the first row of the block
+    # end - int - the row after the last row of the block
+    #
+    # Returns a numpy matrix
+    def denseRows(self, start, end):
+        first, last = self.indptr[start], self.indptr[end]
+        npMatrix = np.zeros((end - start, self.shape[1]), dtype = self.dtype)
+        npMatrix[np.repeat(np.arange(end - start), np.diff(self.indptr[start:end + 1])), self.indices[first:last]] = self.data[first:last]
+        return npMatrix
+
+    # returns the transposed array as a SparseArray
+    def transpose(self):
+        return SparseArray.fromTriplets(self.indices, self.rowIndices(), self.data, (self.shape[1], self.shape[0]))
+
+    # Adds another sparse array of the same shape, multiplied by a sign
+    #
+    # other - a SparseArray
+    # sign - 1 to add or -1 to subtract
+    #
+    # Returns a SparseArray
+    def add(self, other, sign = 1):
+        return SparseArray.fromTriplets(np.concatenate((self.rowIndices(), other.rowIndices())),
+                                        np.concatenate((self.indices, other.indices)),
+                                        np.concatenate((self.data, sign * other.data)),
+                                        self.shape)
+
+    # Adds a dense numpy matrix of the same shape, multiplied by a sign
+    #
+    # npMatrix - a numpy matrix
+    # sign - 1 for (Sparse + Dense) or -1 for (Sparse - Dense)
+    #
+    # Returns a numpy matrix
+    def addDense(self, npMatrix, sign = 1):
+        result = np.array(npMatrix, dtype = np.result_type(self.dtype, npMatrix)) * sign
+        result[self.rowIndices(), self.indices] += self.data
+        return result
+
+    # Multiplies by a dense numpy matrix (Sparse * Dense), a matrix-vector product when it has one column
+    #
+    # npMatrix - a numpy matrix with as many rows as the array has columns
+    #
+    # Returns a numpy matrix
+    def matmulDense(self, npMatrix):
+        result = np.zeros((self.shape[0], npMatrix.shape[1]), dtype = np.result_type(self.dtype, npMatrix))
+        rowLimit = max(SparseArray.chunkProducts // max(npMatrix.shape[1], 1), 1)
+
+        # Rows are processed in chunks so at most chunkProducts products are held at once
+        start = 0
+        while start < self.shape[0]:
+            end = int(np.searchsorted(self.indptr, self.indptr[start] + rowLimit, side = "right")) - 1
+            end = min(max(end, start + 1), self.shape[0])
+
+            first, last = self.indptr[start], self.indptr[end]
+            if last > first:
+                products = self.data[first:last, np.newaxis] * npMatrix[self.indices[first:last]]
+                filled = start + np.flatnonzero(np.diff(self.indptr[start:end + 1]))
+                result[filled] = np.add.reduceat(products, self.indptr[filled] - first)
+            start = end
+
+        return result
+
+    # Multiplies by another sparse array (Sparse * Sparse)
+    #
+    # other - a SparseArray with as many rows as the array has columns
+    #
+    # Returns a SparseArray
+    def matmulSparse(self, other):
+        shape = (self.shape[0], other.shape[1])
+
+        # The amount of products each stored value contributes, and the running total at each row
+        counts = other.indptr[self.indices + 1] - other.indptr[self.indices]
+        rowTotals = np.concatenate(([0], np.cumsum(counts)))[self.indptr]
+
+        # Only the amount of values in each row is kept for each chunk, not a row index for every value
+        rowCounts, cols, values = [], [], []
+        start = 0
+        while start < self.shape[0]:
+            end = int(np.searchsorted(rowTotals, rowTotals[start] + SparseArray.chunkProducts, side = "right")) - 1
+            end = min(max(end, start + 1), self.shape[0])
+
+            first, last = self.indptr[start], self.indptr[end]
+            chunkCounts = counts[first:last]
+            total = int(chunkCounts.sum())
+
+            if total > 0:
+                # Position in other of every product, the values of each row of other used one after another
+                offsets = np.repeat(other.indptr[self.indices[first:last]] - (np.cumsum(chunkCounts) - chunkCounts), chunkCounts)
+                offsets += np.arange(total)
+
+                chunkRows = np.repeat(np.arange(start, end), np.diff(self.indptr[start:end + 1]))
+                chunk = SparseArray.__sumTriplets(np.repeat(chunkRows, chunkCounts),
+                                                  other.indices[offsets],
+                                                  np.repeat(self.data[first:last], chunkCounts) * other.data[offsets],
+                                                  shape)
+                rowCounts.append(np.bincount(chunk[0] - start, minlength = end - start))
+                cols.append(chunk[1])
+                values.append(chunk[2])
+            else:
+                rowCounts.append(np.zeros(end - start, dtype = np.int64))
+            start = end
+
+        if not cols:
+            return SparseArray(np.zeros(0, dtype = np.result_type(self.dtype, other.dtype)), [], np.zeros(shape[0] + 1), shape)
+
+        indptr = np.zeros(shape[0] + 1, dtype = np.int64)
+        np.cumsum(np.concatenate(rowCounts), out = indptr[1:])
+        return SparseArray(np.concatenate(values), np.concatenate(cols), indptr, shape)
+
+    # Returns one row of the array as a dense 1-D Numpy Array
+    def rowDense(self, row):
+        values = np.zeros(self.shape[1], dtype = self.dtype)
+        values[self.indices[self.indptr[row]:self.indptr[row + 1]]] = self.data[self.indptr[row]:self.indptr[row + 1]]
+        return values
+
+    # Returns a summary of the array with its first stored values
+    def __str__(self):
+        lines = [f"Sparse {self.shape[0]} x {self.shape[1]} matrix with {self.getNnz()} stored values (density {self.density():.4g})"]
+        rows = self.rowIndices()[:10]
+        for row, col, value in zip(rows, self.indices[:10], self.data[:10]):
+            lines.append(f"  ({row}, {col})\t{value}")
+        if self.getNnz() > 10:
+            lines.append("  ...")
+        return "\n".join(lines)
+
+# %% [markdown]
+# # CSV Import Worker
+
+# %%
+# Parses one chunk of a CSV file with np.loadtxt, the same parser used for small files, so every import path
+# gives the same values. It is defined outside of the classes so a process pool can send it to its workers.
+#
+# path - str - the path to the csv file
+# chunk - tuple - the (byte offset, byte length, first row, row count) of the chunk
+# cols - int - the amount of columns of the matrix
+# outPath - str - the .npy file the rows are written into, the rows are returned instead if not provided
+# dtype - the Numpy dtype the values are parsed as
+#
+# Will return a Numpy Array of the chunk or None, raises a ValueError if the chunk does not have the expected shape
+def parseCSVChunk(path, chunk, cols, outPath = None, dtype = np.float64):
+    offset, length, firstRow, rows = chunk
+    if rows == 0:
+        return None if outPath is not None else np.empty((0, cols), dtype = dtype)
+
+    with open(path, "rb") as file:
+        file.seek(offset)
+        npChunk = np.loadtxt(io.StringIO(file.read(length).decode()), delimiter=",", ndmin=2, dtype = dtype)
+
+    if npChunk.shape != (rows, cols):
+        raise ValueError("The rows of the CSV file do not have the same amount of columns")
+    if outPath is None:
+        return npChunk
+
+    out = np.load(outPath, mmap_mode = "r+")
+    out[firstRow:firstRow + rows] = npChunk
+    out.flush()
+
+# %% [markdown]
+# # Instrumentation Class
+
+# %%
+# Class utilized to time the operations of the Matrix class and the file helpers of the State Machine, so a
+# slow operation can be found from data instead of guesses.
+#
+# Each call of a timed function records its wall time, the CPU time of the process, the shapes of the matrices
+# it was given, and the bytes of matrices it read and wrote. The last records of each operation are kept, and are
+# summarized as percentiles and a histogram of the wall times. The times of a operation include the operations
+# it calls, such as the add called by add_.
+#
+# When traceMemory is also True, the peak bytes allocated during each call are traced by tracemalloc, and the
+# bytes above the result are reported as temporaries, also counted as full size copies of the largest matrix
+# the call was given. Only the outermost timed call traces memory, as tracing restarts the peak. Tracing makes
+# operations several times slower, so it is only turned on while looking for where memory goes.
+#
+# Nothing is recorded until enabled is set to True. While it is False a timed function only checks the flag
+# before calling the function it wraps.
+class Instrumentation:
+
+    # Whether the timed functions record their calls
+    enabled = False
+
+    # Whether the timed functions also trace the peak memory of their calls
+    traceMemory = False
+
+    # The amount of recent calls of each operation kept for the percentiles and histograms, read when a
+    # operation is first recorded
+    window = 1000
+
+    # The upper edges in seconds of the buckets of the wall time histograms, the last bucket holds everything slower
+    histogramEdges = [1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0, 100.0]
+
+    # name -> [calls, total wall time, total CPU time,
+    #          deque of the recent (wall, cpu, shapes, bytes read, bytes written, peak bytes, temporaries)]
+    __operations = {}
+
+    # Guards the records, as the operations of the MatrixServer are timed from several threads at once
+    __lock = threading.Lock()
+
+    # The amount of timed calls currently running on each thread, so calls made by a timed call do not restart its peak
+    __threads = threading.local()
+
+    # Held by the timed call tracing memory, tracemalloc is shared by every thread so only one call at a time is traced
+    __tracing = threading.Lock()
+
+    # Decorator used to time a function
+    #
+    # name - str - the name the calls are recorded under
+    # disk - None, "read", or "write" - None counts the matrices given to the function as read and the matrices
+    #        it returns as written. "read" counts the returned matrices as read from disk, and "write" counts the
+    #        given matrices as written to disk.
+    #
+    # Returns a function that wraps the timed function
+    @staticmethod
+    def timed(name, disk = None):
+
+        def decorator(function):
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not Instrumentation.enabled:
+                    return function(*args, **kwargs)
+
+                depth = getattr(Instrumentation.__threads, "depth", 0)
+                traced, started, baseBytes = Instrumentation.__startTrace(depth)
+
+                Instrumentation.__threads.depth = depth + 1
+                wallStart, cpuStart = time.perf_counter(), time.process_time()
+                try:
+                    result = function(*args, **kwargs)
+                finally:
+                    wall, cpu = time.perf_counter() - wallStart, time.process_time() - cpuStart
+                    Instrumentation.__threads.depth = depth
+
+                    if traced:
+                        peakBytes = tracemalloc.get_traced_memory()[1] - baseBytes
+                        if started:
+                            tracemalloc.stop()
+                        Instrumentation.__tracing.release()
+
+                given = Instrumentation.__matrices(list(args) + list(kwargs.values()))
+                returned = Instrumentation.__matrices(result if isinstance(result, (list, tuple)) else [result])
+                if disk == "read":
+                    shapes, bytesRead, bytesWritten = returned, returned, []
+                elif disk == "write":
+                    shapes, bytesRead, bytesWritten = given, [], given
+                else:
+                    shapes, bytesRead, bytesWritten = given, given, returned
+
+                written = sum(size for shape, size in bytesWritten)
+                temporaries = None
+                if not traced:
+                    peakBytes = None
+                elif given and max(size for shape, size in given) > 0:
+                    temporaries = max(peakBytes - written, 0) / max(size for shape, size in given)
+
+                Instrumentation.record(name, wall, cpu, [shape for shape, size in shapes],
+                                       sum(size for shape, size in bytesRead), written, peakBytes, temporaries)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    # Function needed for the decorator, starts tracing the memory of a call that is not made by another timed call.
+    # Starting or stopping tracemalloc while other threads allocate can crash Python, so while other threads run
+    # a call is only traced if tracemalloc is already running, as started by main for a server.
+    #
+    # depth - int - the amount of timed calls running on the thread of the call
+    #
+    # Returns a tuple of wether the call is traced, wether tracemalloc was started for it, and the bytes traced before it
+    @staticmethod
+    def __startTrace(depth):
+        if not Instrumentation.traceMemory or depth > 0 or not Instrumentation.__tracing.acquire(blocking = False):
+            return False, False, 0
+
+        started = not tracemalloc.is_tracing()
+        if started and threading.active_count() > 1:
+            Instrumentation.__tracing.release()
+            return False, False, 0
+        elif started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        return True, started, tracemalloc.get_traced_memory()[0]
+
+    # Function needed for the decorator, finds the matrices in the arguments or results of a function
+    #
+    # values - list - the arguments or results
+    #
+    # Returns a list of the (shape, bytes) of each Matrix
+    @staticmethod
+    def __matrices(values):
+        matrices = []
+        for value in values:
+            if isinstance(value, Matrix) and value.getMatrix() is not None:
+                matrices.append(((value.getRows(), value.getCols()), int(value.getMatrix().nbytes)))
+        return matrices
+
+    # Records one call of a operation
+    #
+    # name - str - the name of the operation
+    # wall - float - the wall time in seconds
+    # cpu - float - the CPU time of the process in seconds
+    # shapes - list - the (rows, cols) of the matrices the operation used
+    # bytesRead - int - the bytes of matrices read
+    # bytesWritten - int - the bytes of matrices written
+    # peakBytes - int - the most bytes allocated during the call, None if memory was not traced
+    # temporaries - float - the bytes allocated above the result, as full size copies of the largest matrix given
+    @classmethod
+    def record(cls, name, wall, cpu, shapes, bytesRead, bytesWritten, peakBytes = None, temporaries = None):
+        with cls.__lock:
+            operation = cls.__operations.get(name)
+            if operation is None:
+                operation = cls.__operations[name] = [0, 0.0, 0.0, deque(maxlen = cls.window)]
+
+            operation[0] += 1
+            operation[1] += wall
+            operation[2] += cpu
+            operation[3].append((wall, cpu, shapes, bytesRead, bytesWritten, peakBytes, temporaries))
+
+    # Removes every record
+    @classmethod
+    def clear(cls):
+        with cls.__lock:
+            cls.__operations.clear()
+
+    # Summarizes the records of every operation
+    #
+    # Returns a dict of the operation names to dicts of their calls, total times, percentiles of the recent wall
+    # times, histogram of the recent wall times, bytes, largest shape, and the most peak and temporary bytes and
+    # temporaries of the recent calls that traced memory (None if none did)
+    @classmethod
+    def report(cls):
+        with cls.__lock:
+            operations = [(name, calls, totalWall, totalCpu, list(recent)) for name, (calls, totalWall, totalCpu, recent) in cls.__operations.items()]
+
+        report = {}
+        for name, calls, totalWall, totalCpu, recent in operations:
+            walls = np.array([entry[0] for entry in recent])
+            shapes = [shape for entry in recent for shape in entry[2]]
+            traced = [entry for entry in recent if entry[5] is not None]
+
+            report[name] = {"calls": calls,
+                            "totalWall": totalWall,
+                            "totalCpu": totalCpu,
+                            "recentCalls": len(recent),
+                            "median": float(np.median(walls)),
+                            "p90": float(np.percentile(walls, 90)),
+                            "max": float(walls.max()),
+                            "histogram": np.bincount(np.searchsorted(cls.histogramEdges, walls),
+                                                     minlength = len(cls.histogramEdges) + 1).tolist(),
+                            "bytesRead": sum(entry[3] for entry in recent),
+                            "bytesWritten": sum(entry[4] for entry in recent),
+                            "largestShape": list(max(shapes, key = lambda shape: shape[0] * shape[1])) if shapes else None,
+                            "peakBytes": max((entry[5] for entry in traced), default = None),
+                            "temporaryBytes": max((max(entry[5] - entry[4], 0) for entry in traced), default = None),
+                            "temporaries": max((entry[6] for entry in traced if entry[6] is not None), default = None)}
+        return report
+
+    # Writes the report and the histogram edges to a JSON file
+    #
+    # path - str - the path of the JSON file
+    #
+    # Will return either True or None
+    @classmethod
+    def dumpJSON(cls, path):
+        try:
+            with open(path, "w") as file:
+                json.dump({"histogramEdges": cls.histogramEdges, "operations": cls.report()}, file, indent = 2)
+        except OSError:
+            print("The timings could not be written to that file.")
+            return
+        return True
+
+    # Prints a table of the report, slowest total wall time first
+    @classmethod
+    def printSummary(cls):
+        report = cls.report()
+        if len(report) == 0:
+            print("No operations have been timed yet.")
+            return
+
+        print(f"{'Operation':<24}{'Calls':>8}{'Total':>11}{'CPU':>11}{'Median':>11}{'P90':>11}{'Max':>11}"
+              f"{'Read MB':>10}{'Written MB':>12}{'Peak MB':>10}{'Temps':>7}")
+        for name, entry in sorted(report.items(), key = lambda item: -item[1]["totalWall"]):
+            peak = "-" if entry["peakBytes"] is None else f"{entry['peakBytes'] / 1024 / 1024:.1f}"
+            temporaries = "-" if entry["temporaries"] is None else f"{entry['temporaries']:.1f}"
+            print(f"{name:<24}{entry['calls']:>8}{entry['totalWall']:>10.4f}s{entry['totalCpu']:>10.4f}s"
+                  f"{entry['median']:>10.4f}s{entry['p90']:>10.4f}s{entry['max']:>10.4f}s"
+                  f"{entry['bytesRead'] / 1024 / 1024:>10.1f}{entry['bytesWritten'] / 1024 / 1024:>12.1f}{peak:>10}{temporaries:>7}")
 
 # %% [markdown]
 # # Matrix Class
@@ -13,14 +525,66 @@ import matplotlib.pyplot as plt
 # %%
 # Class utilized to represent a 2-D Matrix, and the operations one can perform on one.
 class Matrix:
+
+    # The amount of rows and columns of the blocks used when multiplying matrices tile by tile
+    blockSize = 1024
+
+    # Products of memory mapped matrices with more bytes than this are computed tile by tile
+    outOfCoreBytes = 1024 * 1024 * 1024
+
+    # The amount of rows solved at a time by the triangular solves, and checked at a time by the structure checks.
+    # The LU factorization splits its columns in halves until a block is at most a quarter of this wide.
+    factorBlockSize = 64
+
+    # Sparse results with a larger fraction of nonzero values than this are converted to dense matrices
+    densifyThreshold = 0.25
+
+    # CSV files larger than this are imported a chunk of this many bytes at a time
+    importChunkBytes = 64 * 1024 * 1024
+
+    # The smallest chunk given to a process of a parallel import, files too small to give every process a chunk
+    # this large are parsed in one process, as starting the processes would take longer than parsing them
+    importMinChunkBytes = 64 * 1024
+
+    # Random matrices are generated a chunk of rows of about this many bytes at a time, each chunk with its own random stream
+    randomChunkBytes = 16 * 1024 * 1024
+
+    # Heatmaps of matrices with at most this many values show each value, larger heatmaps are drawn as a image
+    annotateCells = 400
+
+    # The most rows and columns of cells a heatmap image has, about the pixels of a screen.
+    # Larger matrices are pooled down to this size, so drawing takes the same time for any size of matrix.
+    heatmapCells = 1000
+
+    # Matrices with more values than this are printed as a summary, and pages of this many rows are printed at a time
+    printCells = 1000
+    pageRows = 20
+
+    # The ResultCache the inverse, eigen decomposition, determinate, and solve read their results from and
+    # write them to, no results are cached if None
+    resultCache = None
+
+    # Marks the threads computing a cached operation, so the operations it calls are not cached as well
+    __cachedThreads = threading.local()
     
     # Default Construcion method, used for quick conversions of Numpy Arrays to Matrix Objects
-    # If it recieves something besides a Numpy Array, will instead provide None Values
+    # If it recieves something besides a Numpy Array or SparseArray, will instead provide None Values
     #
-    # npMatrix - a Numpy Matrix
+    # npMatrix - a Numpy Matrix, or a SparseArray for a sparse Matrix
     def __init__( self, npMatrix ):
         
-        if isinstance(npMatrix, np.ndarray):
+        # The LU and Cholesky factorizations and the structure checks are only computed once they
+        # are needed, and are kept for later operations
+        self.__lu = None
+        self.__cholesky = None
+        self.__flags = {}
+        self.__contentHash = None
+
+        if isinstance(npMatrix, SparseArray):
+            self.__npMatrix = npMatrix
+            self.__rows, self.__cols = npMatrix.shape
+
+        elif isinstance(npMatrix, np.ndarray):
 
             self.__npMatrix = npMatrix
 
@@ -36,17 +600,31 @@ class Matrix:
             self.__rows, self.__cols = (None, None)
         
     # Constructor Method used to arrays of random sizes and values, expects paramters to limit the randomness.
+    # Values are whole numbers from 0 to 99, or decimal numbers from 0 up to 100.
+    #
+    # The array is filled a chunk of rows at a time by a pool of threads, each chunk with its own random stream
+    # spawned from the seed, so the same seed always gives the same matrix no matter how many workers are used.
+    # Each chunk is written straight into the output, so only one copy of the matrix is ever held.
     #
     # rows - int - The amount of rows of the Array
     # cols - int - The amount of columns of the array
     # wholeNum - bool - wether the values inside should be whole numbers or floats
+    # seed - int, np.random.SeedSequence, or np.random.Generator - the seed of the values, a random seed if not provided
+    # dtype - the Numpy dtype of the values, int64 for whole numbers and float64 for decimal numbers if not provided
+    # workers - int - the amount of threads filling the array, all of the cores of the computer if None
+    # outPath - str - the path of a .npy file the matrix is written to and memory mapped from, in memory if not provided
     #
     # Will return either a Matrix object or None
     @classmethod
+    @Instrumentation.timed("Matrix.createRandom")
     def createRandom( cls, 
                         rows, 
                         cols,
-                        wholeNum ):
+                        wholeNum,
+                        seed = None,
+                        dtype = None,
+                        workers = None,
+                        outPath = None ):
         
         # parameter validation
         if type(rows) is not int or type(cols) is not int:
@@ -58,31 +636,298 @@ class Matrix:
         elif type(wholeNum) is not bool:
             print("wholeNum must have a bool passed in")
             return
-        
-        # Generates the np array and then sends it to the default constructor
-        if wholeNum:
-            return cls(np.random.randint(low = 0, high = 100, size=(rows, cols)))
+        elif seed is not None and not isinstance(seed, (int, np.random.SeedSequence, np.random.Generator)):
+            print("The seed must be a int, a SeedSequence, or a Generator.")
+            return
+
+        dtype = Matrix.__numberType(dtype if dtype is not None else (np.int64 if wholeNum else np.float64))
+        if dtype is None:
+            return
+        elif not wholeNum and not np.issubdtype(dtype, np.floating):
+            print("The dtype must be a float type for decimal numbers.")
+            return
+
+        # Each chunk of rows gets its own random stream, spawned from the seed
+        chunkRows = max(1, Matrix.randomChunkBytes // (cols * dtype.itemsize))
+        starts = range(0, rows, chunkRows)
+        if isinstance(seed, np.random.Generator):
+            streams = seed.spawn(len(starts))
+        else:
+            seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+            streams = [np.random.Generator(np.random.PCG64(child)) for child in seed.spawn(len(starts))]
+
+        if outPath is None:
+            npMatrix = np.empty((rows, cols), dtype = dtype)
+        else:
+            npMatrix = np.lib.format.open_memmap(outPath, mode = "w+", dtype = dtype, shape = (rows, cols))
+
+        # Fills the rows of one chunk, the random functions release the GIL so the threads run at the same time
+        def fillChunk(start, generator):
+            chunk = npMatrix[start:start + chunkRows]
+            if wholeNum:
+                chunk[...] = generator.integers(low = 0, high = 100, size = chunk.shape, dtype = np.int64)
+            elif dtype in (np.float32, np.float64):
+                generator.random(out = chunk, dtype = dtype)
+                chunk *= 100
+            else:
+                chunk[...] = generator.random(size = chunk.shape) * 100
+
+        workers = workers if workers is not None else os.cpu_count()
+        if workers > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers = workers) as pool:
+                list(pool.map(fillChunk, starts, streams))
         else:
-            return cls(np.random.uniform( size=(rows, cols)) * 100)
+            for start, generator in zip(starts, streams):
+                fillChunk(start, generator)
+
+        if outPath is not None:
+            npMatrix.flush()
+
+        # Generates the np array and then sends it to the default constructor
+        return cls(npMatrix)
         
     # Constructor used to create a Matrix based on a CSV file
+    # Files larger than the chunk size are streamed, a first pass finds the shape of the matrix and a second
+    # pass parses one chunk at a time into a preallocated array, so the memory used is bounded by the chunk
+    # size instead of several times the size of the file. With more than one worker the chunks are parsed
+    # by a pool of processes, which write their rows straight into the output file when one is given.
+    #
     # path - str - the path to the csv file
+    # chunkBytes - int - the amount of bytes parsed at a time, Matrix.importChunkBytes if not provided
+    # outPath - str - the path of a .npy file the matrix is written to and memory mapped from, in memory if not provided
+    # report - bool - wether the import speed in rows per second should be printed
+    # workers - int - the amount of processes parsing the file, all of the cores of the computer if None
+    # dtype - the Numpy dtype of the values, int64 if every value of the file is a whole number and float64 otherwise
+    #         if not provided
     #
     # Will return either a Matrix object or None
     @classmethod      
-    def createImport(cls, path):
-        
+    @Instrumentation.timed("Matrix.createImport")
+    def createImport(cls, path, chunkBytes = None, outPath = None, report = False, workers = 1, dtype = None):
+        chunkBytes = chunkBytes if chunkBytes is not None else Matrix.importChunkBytes
+        workers = workers if workers is not None else os.cpu_count()
+        out = None
+
+        inferred = dtype is None
+        if not inferred:
+            dtype = Matrix.__numberType(dtype)
+            if dtype is None:
+                return
+
         # Imports file, will return nothing if not provided a proper path, a CSV file, or if the file contents are incompatible with transforming into a numpy array
         try:
-            return cls(np.loadtxt( path, delimiter=",", ndmin=2))
+            start = time.perf_counter()
+            fileBytes = os.path.getsize(path)
+            if inferred:
+                dtype = Matrix.__csvType(path)
+
+            if workers > 1 and fileBytes < workers * Matrix.importMinChunkBytes:
+                workers = 1
+
+            if outPath is None and workers <= 1 and fileBytes <= chunkBytes:
+                npMatrix = np.loadtxt( path, delimiter=",", ndmin=2, dtype = dtype)
+            else:
+                # Each worker is given a few chunks, so a slower chunk does not hold up the others
+                if workers > 1:
+                    chunkBytes = max(Matrix.importMinChunkBytes, min(chunkBytes, fileBytes // (workers * 4)))
+
+                chunks, cols = Matrix.__scanCSV(path, chunkBytes)
+                rows = sum(chunk[3] for chunk in chunks)
+
+                if outPath is None:
+                    out = np.empty((rows, cols), dtype = dtype)
+                else:
+                    out = np.lib.format.open_memmap(outPath, mode = "w+", dtype = dtype, shape = (rows, cols))
+                    out.flush()
+
+                if workers > 1:
+                    with ProcessPoolExecutor(max_workers = workers) as pool:
+                        results = pool.map(parseCSVChunk, repeat(path), chunks, repeat(cols), repeat(outPath), repeat(dtype))
+                        for chunk, npChunk in zip(chunks, results):
+                            if outPath is None:
+                                out[chunk[2]:chunk[2] + chunk[3]] = npChunk
+                else:
+                    for chunk in chunks:
+                        out[chunk[2]:chunk[2] + chunk[3]] = parseCSVChunk(path, chunk, cols, dtype = dtype)
+
+                if outPath is not None:
+                    out.flush()
+                npMatrix = out
+
+            if report:
+                elapsed = time.perf_counter() - start
+                print(f"Imported {npMatrix.shape[0]} rows in {elapsed:.2f} seconds ({npMatrix.shape[0] / max(elapsed, 1e-9):,.0f} rows/second)")
+            return cls(npMatrix)
+        except:
+            # A partly written output file is removed
+            if out is not None and outPath is not None:
+                del out
+                os.remove(outPath)
+
+            # Whole numbers too large for int64 are read as float64 instead
+            if inferred and dtype == np.int64:
+                return cls.createImport(path, chunkBytes, outPath, report, workers, np.float64)
+
+    # Function needed for the imports, finds the dtype of a CSV file that no dtype was given for. Files whose
+    # values are all written as whole numbers, without a decimal point, exponent, nan, or inf, are read as int64,
+    # and other files as float64. The file is searched through a memory map, and the search for a file of decimal
+    # numbers ends at its first value.
+    #
+    # path - str - the path to the csv file
+    #
+    # Returns a Numpy dtype
+    @staticmethod
+    def __csvType(path):
+        with open(path, "rb") as file:
+            try:
+                with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as data:
+                    if any(data.find(character) != -1 for character in (b".", b"e", b"E", b"n", b"N", b"i", b"I")):
+                        return np.dtype(np.float64)
+            except ValueError:
+                # Empty files cannot be memory mapped, they fail to import either way
+                pass
+        return np.dtype(np.int64)
+
+    # Function needed for the dtype parameters, checks that a dtype is a Numpy number type
+    #
+    # dtype - a Numpy dtype, or anything np.dtype accepts such as "float32"
+    #
+    # Will return either a Numpy dtype or None
+    @staticmethod
+    def __numberType(dtype):
+        try:
+            dtype = np.dtype(dtype)
+        except TypeError:
+            dtype = None
+
+        if dtype is None or not np.issubdtype(dtype, np.number):
+            print("The dtype must be a Numpy number type, such as int32, int64, float32, or float64.")
+            return
+        return dtype
+
+    # Finds the chunks of a CSV file for a streaming import, reading chunkBytes at a time and ending each
+    # chunk at a new line. Lines that are blank or only a comment are not counted as rows, as np.loadtxt skips them.
+    #
+    # path - str - the path to the csv file
+    # chunkBytes - int - the amount of bytes read at a time
+    #
+    # Will return a list of (byte offset, byte length, first row, row count) tuples and the amount of columns
+    @staticmethod
+    def __scanCSV(path, chunkBytes):
+        chunks = []
+        cols = None
+        offset = 0
+        rows = 0
+        remainder = b""
+
+        with open(path, "rb") as file:
+            while True:
+                block = file.read(chunkBytes)
+                data = remainder + block
+                if not data:
+                    break
+
+                # Ends the chunk at the last new line, unless the end of the file has been reached
+                end = data.rfind(b"\n") + 1 if block else len(data)
+                if end == 0:
+                    remainder = data
+                    continue
+
+                chunk, remainder = data[:end], data[end:]
+                if b"#" not in chunk and b"\n\n" not in chunk and b"\n\r\n" not in chunk and not chunk.startswith((b"\n", b"\r\n")):
+                    count = chunk.count(b"\n") + (not chunk.endswith(b"\n"))
+                else:
+                    count = sum(1 for line in chunk.split(b"\n") if line.split(b"#", 1)[0].rstrip(b"\r"))
+
+                if cols is None and count > 0:
+                    firstLine = next(line for line in chunk.split(b"\n") if line.split(b"#", 1)[0].rstrip(b"\r"))
+                    cols = len(firstLine.split(b"#", 1)[0].split(b","))
+
+                chunks.append((offset, len(chunk), rows, count))
+                offset += len(chunk)
+                rows += count
+
+                if not block:
+                    break
+
+        if cols is None:
+            raise ValueError("The CSV file has no rows")
+        return chunks, cols
+
+    # Constructor used to create a sparse Matrix from a CSV file of coordinate triplets,
+    # one "row,column,value" line for each nonzero value with rows and columns counted from 0.
+    # Values given more than once for the same row and column are summed.
+    #
+    # path - str - the path to the csv file
+    # rows - int - the amount of rows of the matrix, the largest row given plus one if not provided
+    # cols - int - the amount of columns of the matrix, the largest column given plus one if not provided
+    # dtype - the Numpy dtype of the values, int64 if every value of the file is a whole number and float64 otherwise
+    #         if not provided
+    #
+    # Will return either a Matrix object or None
+    @classmethod
+    @Instrumentation.timed("Matrix.createImportSparse")
+    def createImportSparse(cls, path, rows = None, cols = None, dtype = None):
+        if dtype is not None:
+            dtype = Matrix.__numberType(dtype)
+            if dtype is None:
+                return
+
+        # Imports file, will return nothing if not provided a proper path, or if the file is not made of triplets
+        try:
+            # The rows and columns are read with the values, so files of whole numbers are read as int64
+            fileType = Matrix.__csvType(path)
+            triplets = np.loadtxt(path, delimiter=",", ndmin=2, dtype = fileType)
+            rowIndices = triplets[:, 0].astype(np.int64)
+            colIndices = triplets[:, 1].astype(np.int64)
+
+            if triplets.shape[1] != 3 or np.any(triplets[:, :2] != np.stack((rowIndices, colIndices), axis = 1)):
+                return
+            elif np.any(rowIndices < 0) or np.any(colIndices < 0):
+                return
+
+            rows = rows if rows is not None else int(rowIndices.max(initial = -1)) + 1
+            cols = cols if cols is not None else int(colIndices.max(initial = -1)) + 1
+            if rows < 1 or cols < 1 or np.any(rowIndices >= rows) or np.any(colIndices >= cols):
+                return
+
+            values = triplets[:, 2].astype(dtype if dtype is not None else fileType)
+            return cls(SparseArray.fromTriplets(rowIndices, colIndices, values, (rows, cols)))
+        except:
+            pass
+
+    # Constructor used to open a Matrix saved in the binary format of the matrices folder, either a
+    # dense matrix (.npy) or a sparse matrix (.npz). By default dense files are memory mapped, so the
+    # values are only read from disk once they are used.
+    #
+    # path - str - the path to the .npy or .npz file
+    # mmap - bool - wether the file should be memory mapped or fully read into memory
+    #
+    # Will return either a Matrix object or None
+    @classmethod
+    @Instrumentation.timed("Matrix.createLoad")
+    def createLoad(cls, path, mmap = True):
+
+        # Loads the file, will return nothing if the path does not exist or is not a numeric .npy or .npz file
+        try:
+            loaded = np.load(path, mmap_mode = "r" if mmap else None, allow_pickle = False)
+
+            if isinstance(loaded, np.lib.npyio.NpzFile):
+                with loaded:
+                    return cls(SparseArray(loaded["data"], loaded["indices"], loaded["indptr"], loaded["shape"]))
+            return cls(loaded)
         except:
             pass
 
     # Constructor used to create a Matrix based off of a list of lists.
     #
+    # listMatrix - list - a list of the rows of the matrix, each a list of numbers
+    # dtype - the Numpy dtype of the values, int64 if every value is a int and float64 otherwise if not provided
+    #
     # Will return either a Matrix object or None
     @classmethod
-    def createManual(cls, listMatrix):
+    @Instrumentation.timed("Matrix.createManual")
+    def createManual(cls, listMatrix, dtype = None):
         
         # Returns none if given a empty list, a list does not have a list inside of it, or a non-list
         if type(listMatrix) is not list:
@@ -91,161 +936,2410 @@ class Matrix:
         if len(listMatrix) == 0:
             return
 
-        if type(listMatrix[0]) is not list:
-            return 
+        if type(listMatrix[0]) is not list:
+            return 
+
+        if dtype is not None:
+            dtype = Matrix.__numberType(dtype)
+            if dtype is None:
+                return
+        try:
+            return cls(np.array(listMatrix, dtype = dtype))
+        except:
+            pass
+        
+    # Adds two matrices together, two sparse matrices give a sparse result
+    #
+    # out - a dense Matrix Object the result is written into instead of making a new Matrix
+    #
+    # Will return either a Matrix object or None
+    @Instrumentation.timed("Matrix.add")
+    def add(self, matrixB, out = None):
+        if self.__npMatrix.shape != matrixB.getMatrix().shape:
+            print("To add Matrices they must have the same amount of rows and columns.")
+        elif out is not None:
+            return self.__elementwiseOut(matrixB, np.add, out)
+        elif self.isSparse() or matrixB.isSparse():
+            return Matrix.__sparseSum(self, matrixB, 1)
+        else:
+            return Matrix(npMatrix = np.add(self.__npMatrix,matrixB.getMatrix()))
+
+    # Subtracts two matrices, two sparse matrices give a sparse result
+    #
+    # out - a dense Matrix Object the result is written into instead of making a new Matrix
+    #
+    # Will return either a Matrix object or None
+    @Instrumentation.timed("Matrix.subtract")
+    def subtract(self, matrixB, out = None):
+        if self.__npMatrix.shape != matrixB.getMatrix().shape:
+            print("To subtract Matrices they must have the same amount of rows and columns.")
+        elif out is not None:
+            return self.__elementwiseOut(matrixB, np.subtract, out)
+        elif self.isSparse() or matrixB.isSparse():
+            return Matrix.__sparseSum(self, matrixB, -1)
+        else:
+            return Matrix(npMatrix = np.subtract(self.__npMatrix,matrixB.getMatrix()))
+
+    # In place versions of add, subtract, and scaling, which change the values of the current matrix instead
+    # of making a new Matrix, so loops that keep updating a matrix do not allocate a new one each time.
+    # Only dense matrices that are not read only, unlike the memory mapped matrices loaded from the matrices
+    # folder, can be changed in place.
+    #
+    # Will return either the current Matrix object or None
+
+    # Adds matrixB to the current matrix
+    @Instrumentation.timed("Matrix.add_")
+    def add_(self, matrixB):
+        return self.add(matrixB, out = self)
+
+    # Subtracts matrixB from the current matrix
+    @Instrumentation.timed("Matrix.subtract_")
+    def subtract_(self, matrixB):
+        return self.subtract(matrixB, out = self)
+
+    # Multiplies every value of the current matrix by a number
+    @Instrumentation.timed("Matrix.scale_")
+    def scale_(self, scalar):
+        if not isinstance(scalar, (int, float, complex, np.number)):
+            print("A matrix can only be scaled by a number.")
+        elif self.__npMatrix is not None and Matrix.__checkOut(self, (self.__rows, self.__cols), np.result_type(self.__npMatrix, scalar)):
+            np.multiply(self.__npMatrix, scalar, out = self.__npMatrix)
+            self.__valuesChanged()
+            return self
+
+    # Function needed for the out parameters of add and subtract
+    #
+    # matrixB - a Matrix Object with the same shape as the current matrix
+    # ufunc - the Numpy function of the operation
+    # out - a Matrix Object the result is written into
+    #
+    # Will return either out or None
+    def __elementwiseOut(self, matrixB, ufunc, out):
+        npMatrixA, npMatrixB = self.toDense().getMatrix(), matrixB.toDense().getMatrix()
+        if Matrix.__checkOut(out, npMatrixA.shape, np.result_type(npMatrixA, npMatrixB)):
+            ufunc(npMatrixA, npMatrixB, out = out.getMatrix())
+            out.__valuesChanged()
+            return out
+
+    # Function needed for the out parameters and the in place operations, checks that a Matrix can be written into
+    #
+    # out - a Matrix Object
+    # shape - tuple - the rows and columns of the result
+    # dtype - the Numpy dtype of the result
+    #
+    # Returns a bool, printing why the Matrix cannot be written into when it is False
+    @staticmethod
+    def __checkOut(out, shape, dtype):
+        if not isinstance(out, Matrix) or not isinstance(out.getMatrix(), np.ndarray):
+            print("Results can only be written into a dense Matrix.")
+        elif out.getMatrix().shape != shape:
+            print(f"The Matrix written into must have {shape[0]} rows and {shape[1]} columns.")
+        elif not np.can_cast(dtype, out.getMatrix().dtype, "same_kind"):
+            print(f"A Matrix of {out.getMatrix().dtype} values cannot hold the {dtype} values of the result.")
+        elif not out.getMatrix().flags.writeable:
+            print("The Matrix written into is read only, such as a matrix loaded from the matrices folder.")
+        else:
+            return True
+        return False
+
+    # Finds the dtype of the results of the operations whose results are not whole numbers, such as the inverse.
+    # float32 and complex64 values keep their precision, so their results take half the memory of float64,
+    # while whole numbers and other types are computed as float64 or complex128.
+    #
+    # values - the Numpy arrays or dtypes of the operation
+    #
+    # Returns a Numpy dtype
+    @staticmethod
+    def inexactType(*values):
+        dtype = np.result_type(*values)
+        if dtype in (np.float32, np.complex64):
+            return dtype
+        return np.result_type(dtype, np.float64)
+
+    # Function needed for the out parameters and the in place operations, forgets the factorizations
+    # and structure checks once the values of the matrix have changed
+    def __valuesChanged(self):
+        self.__lu = None
+        self.__cholesky = None
+        self.__flags = {}
+        self.__contentHash = None
+
+    # Function needed for adding and subtracting sparse matrices
+    #
+    # matrixA - a Matrix Object
+    # matrixB - a Matrix Object with the same shape, at least one of the two must be sparse
+    # sign - 1 for (A + B) or -1 for (A - B)
+    #
+    # Returns a Matrix
+    @staticmethod
+    def __sparseSum(matrixA, matrixB, sign):
+        npMatrixA, npMatrixB = matrixA.getMatrix(), matrixB.getMatrix()
+
+        if matrixA.isSparse() and matrixB.isSparse():
+            return Matrix.__sparseResult(npMatrixA.add(npMatrixB, sign))
+        elif matrixA.isSparse():
+            return Matrix(npMatrix = npMatrixA.addDense(npMatrixB, sign))
+        else:
+            return Matrix(npMatrix = npMatrixB.addDense(npMatrixA, sign) * sign)
+
+    # Function needed for operations that give sparse results, converts the result to a dense
+    # Matrix once its density is above Matrix.densifyThreshold
+    #
+    # sparse - a SparseArray
+    #
+    # Returns a Matrix
+    @staticmethod
+    def __sparseResult(sparse):
+        if sparse.density() > Matrix.densifyThreshold:
+            return Matrix(npMatrix = sparse.toDense())
+        return Matrix(npMatrix = sparse)
+
+    # Multiplies two matrices together (the matrix product)
+    #
+    # Sparse matrices are multiplied without converting them to dense matrices, the product of two sparse
+    # matrices is sparse and the product of a sparse and a dense matrix is dense.
+    # Matrices in memory are multiplied with a single BLAS matmul call. When either matrix is memory mapped
+    # and the matrices and their product are larger than Matrix.outOfCoreBytes, or when a blockSize is given,
+    # the product is computed tile by tile instead so only a few blocks are ever in memory.
+    #
+    # matrixB - a Matrix Object
+    # blockSize - int - the rows and columns of the tiles, Matrix.blockSize is used if not provided
+    # outPath - str - a .npy file the tiled product is written to, a temporary file is used if not provided
+    # out - a dense Matrix Object the product is written into instead of making a new Matrix
+    #
+    # Will return either a Matrix object or None
+    @Instrumentation.timed("Matrix.multiply")
+    def multiply(self, matrixB, blockSize = None, outPath = None, out = None):
+        if self.__cols != matrixB.getRows():
+            print("To multiply Matrices the amount of columns of the first Martix must match the amount of rows of the second.")
+            return
+        elif blockSize is not None and (type(blockSize) is not int or blockSize < 1):
+            print("The block size must be a integer greater than 0.")
+            return
+
+        npMatrixB = matrixB.getMatrix()
+
+        if out is not None:
+            if blockSize is not None or outPath is not None:
+                print("A product written into a Matrix cannot also be tiled.")
+            elif Matrix.__checkOut(out, (self.__rows, matrixB.getCols()), np.result_type(self.__npMatrix.dtype, npMatrixB.dtype)):
+                if self.isSparse() or matrixB.isSparse():
+                    np.copyto(out.getMatrix(), self.multiply(matrixB).toDense().getMatrix())
+                else:
+                    np.matmul(self.__npMatrix, npMatrixB, out = out.getMatrix())
+                out.__valuesChanged()
+                return out
+            return
+
+        if self.isSparse() and matrixB.isSparse():
+            return Matrix.__sparseResult(self.__npMatrix.matmulSparse(npMatrixB))
+        elif self.isSparse():
+            return Matrix(npMatrix = self.__npMatrix.matmulDense(npMatrixB))
+        elif matrixB.isSparse():
+            # (A * B) is found as (B^T * A^T)^T
+            return Matrix(npMatrix = npMatrixB.transpose().matmulDense(self.__npMatrix.T).T)
+
+        if blockSize is None and outPath is None:
+            mapped = isinstance(self.__npMatrix, np.memmap) or isinstance(npMatrixB, np.memmap)
+            productBytes = self.__rows * matrixB.getCols() * np.result_type(self.__npMatrix, npMatrixB).itemsize
+
+            if not mapped or self.__npMatrix.nbytes + npMatrixB.nbytes + productBytes <= Matrix.outOfCoreBytes:
+
+                # A diagonal matrix only scales the rows or columns of the other matrix
+                if self.isDiagonal():
+                    return Matrix(npMatrix = np.diagonal(self.__npMatrix)[:, np.newaxis] * npMatrixB)
+                elif matrixB.isDiagonal():
+                    return Matrix(npMatrix = self.__npMatrix * np.diagonal(npMatrixB))
+
+                return Matrix(npMatrix = np.matmul(self.__npMatrix, npMatrixB))
+
+        return Matrix(npMatrix = self.__tiledMultiply(npMatrixB, blockSize or Matrix.blockSize, outPath))
+
+    # Function needed for tiled multiplication, streams blocks of both matrices and writes
+    # each finished tile of the product into a memory mapped output
+    #
+    # npMatrixB - a numpy matrix with as many rows as the current matrix has columns
+    # blockSize - int - the rows and columns of the tiles
+    # outPath - str - the .npy file to write the product to, or None for a temporary file
+    #
+    # Returns a numpy memmap
+    def __tiledMultiply(self, npMatrixB, blockSize, outPath):
+        rows, inner, cols = self.__rows, self.__cols, npMatrixB.shape[1]
+        dtype = np.result_type(self.__npMatrix, npMatrixB)
+
+        if outPath is None:
+            output = np.memmap(tempfile.TemporaryFile(), dtype = dtype, mode = "w+", shape = (rows, cols))
+        else:
+            output = np.lib.format.open_memmap(outPath, mode = "w+", dtype = dtype, shape = (rows, cols))
+
+        # The tile being summed and the product of the current pair of blocks are reused for every tile
+        tile = np.empty((min(blockSize, rows), min(blockSize, cols)), dtype = dtype)
+        product = np.empty_like(tile)
+
+        for i in range(0, rows, blockSize):
+            iEnd = min(i + blockSize, rows)
+            for j in range(0, cols, blockSize):
+                jEnd = min(j + blockSize, cols)
+                outTile = tile[:iEnd - i, :jEnd - j]
+                outTile.fill(0)
+
+                for k in range(0, inner, blockSize):
+                    kEnd = min(k + blockSize, inner)
+                    blockA = np.ascontiguousarray(self.__npMatrix[i:iEnd, k:kEnd])
+                    blockB = np.ascontiguousarray(npMatrixB[k:kEnd, j:jEnd])
+                    blockProduct = product[:iEnd - i, :jEnd - j]
+                    np.matmul(blockA, blockB, out = blockProduct)
+                    outTile += blockProduct
+
+                output[i:iEnd, j:jEnd] = outTile
+
+        output.flush()
+        return output
+
+    # Transposes the current matrix
+    #
+    # out - a dense Matrix Object the result is written into instead of making a new Matrix
+    #
+    # Will return either a Matrix object or None
+    @Instrumentation.timed("Matrix.transpose")
+    def transpose(self, out = None):
+        if self.__npMatrix is None:
+            pass
+        elif out is not None:
+            if Matrix.__checkOut(out, (self.__cols, self.__rows), self.__npMatrix.dtype):
+                np.copyto(out.getMatrix(), self.toDense().getMatrix().T)
+                out.__valuesChanged()
+                return out
+        elif self.isSparse():
+            return Matrix(npMatrix = self.__npMatrix.transpose())
+        else:
+            return Matrix(npMatrix =  np.transpose(self.__npMatrix))
+
+    # Finds the determinate of the current matrix.
+    # Diagonal and triangular matrices use the product of their diagonal, positive definite matrices
+    # their Cholesky factorization, and other matrices their LU factorization.
+    #
+    # Will return either a float or complex Numpy scalar, float32 and complex64 for matrices of those types, or None
+    @Instrumentation.timed("Matrix.determinate")
+    def determinate(self):
+        if self.__rows != self.__cols:
+            print("A matrix must be square (same number of rows and columns) to have a determinant.")
+            return
+        elif self.isSparse():
+            return self.toDense().determinate()
+        return self.__cached("determinate", [], (), self.__determinate)
+
+    # Function needed for determinate, finds the determinate of a dense square matrix
+    def __determinate(self):
+        structure = self.__structure()
+        if structure in ("diagonal", "upper", "lower"):
+            return np.prod(np.diagonal(self.__npMatrix), dtype = Matrix.inexactType(self.__npMatrix))
+        elif structure == "positiveDefinite":
+            return np.prod(np.diagonal(self.__cholesky)) ** 2
+        else:
+            # The determinates of large matrices overflow to inf, as with np.linalg.det
+            lu, permutation, sign, singular = self.__factorLU()
+            with np.errstate(over = "ignore"):
+                return sign * np.prod(np.diagonal(lu))
+
+    # Finds the inverse of the current Matrix, by solving against the identity.
+    # The inverse of a sparse matrix is dense, so sparse matrices are converted first.
+    #
+    # out - a dense Matrix Object the result is written into instead of making a new Matrix
+    #
+    # Will return either a Matrix object or None
+    @Instrumentation.timed("Matrix.inverse")
+    def inverse(self, out = None):
+        if self.__cols != self.__rows:
+            print("A matrix must be square (same number of rows and columns) to have a inverse.")
+        elif self.isSparse():
+            return self.toDense().inverse(out)
+        elif out is None:
+            return self.__cached("inverse", [], (), self.__inverse)
+        elif Matrix.__checkOut(out, self.__npMatrix.shape, Matrix.inexactType(self.__npMatrix)):
+            if not self.__inverseInto(out.getMatrix()):
+                print("A matrix must not have a determinate of 0 to have a inverse.")
+                return
+            out.__valuesChanged()
+            return out
+
+    # Function needed for inverse, finds the inverse of a dense square matrix as a new Matrix
+    #
+    # Will return either a Matrix object or None
+    def __inverse(self):
+        npInverse = self.__solveStructured(None)
+        if npInverse is None:
+            print("A matrix must not have a determinate of 0 to have a inverse.")
+        else:
+            return Matrix(npMatrix = npInverse)
+
+    # Function needed for the out parameter of inverse, solves against the identity written straight into
+    # the output, so no identity or solution matrix is allocated
+    #
+    # npOut - a numpy matrix with the shape of the current matrix
+    #
+    # Returns wether the inverse was written, the output is not changed for a singular matrix
+    def __inverseInto(self, npOut):
+        structure = self.__structure()
+
+        # The triangular solves read the current matrix, so it cannot also be the output
+        if np.shares_memory(npOut, self.__npMatrix):
+            npInverse = self.__solveStructured(None)
+            if npInverse is None:
+                return False
+            np.copyto(npOut, npInverse)
+            return True
+        elif self.__isSingular():
+            return False
+
+        npOut.fill(0)
+
+        if structure == "diagonal":
+            np.fill_diagonal(npOut, 1 / np.diagonal(self.__npMatrix))
+        elif structure in ("upper", "lower"):
+            np.fill_diagonal(npOut, 1)
+            Matrix.__triangularSolve(self.__npMatrix, npOut, lower = structure == "lower")
+        elif structure == "positiveDefinite":
+            np.fill_diagonal(npOut, 1)
+            Matrix.__triangularSolve(self.__cholesky, npOut, lower = True)
+            Matrix.__triangularSolve(self.__cholesky.T, npOut, lower = False)
+        else:
+            # The rows of the identity in the order of the row permutation
+            lu, permutation, sign, singular = self.__factorLU()
+            npOut[np.arange(self.__rows), permutation] = 1
+            Matrix.__triangularSolve(lu, npOut, lower = True, unitDiagonal = True)
+            Matrix.__triangularSolve(lu, npOut, lower = False)
+        return True
+
+    # Solves the linear system (Current * X = B) for X.
+    # Diagonal matrices divide the rows of B, triangular matrices use a single triangular solve,
+    # positive definite matrices use their Cholesky factorization, and other matrices their
+    # LU factorization. The factorizations are kept, so every solve after the first only costs
+    # O(n^2) per column of B.
+    #
+    # matrixB - a Matrix Object with as many rows as the current matrix
+    #
+    # Will return either a Matrix object or None
+    @Instrumentation.timed("Matrix.solve")
+    def solve(self, matrixB):
+        if self.__cols != self.__rows:
+            print("A matrix must be square (same number of rows and columns) to solve a linear system.")
+        elif self.__rows != matrixB.getRows():
+            print("To solve a linear system the matrix being solved for must have as many rows as the current matrix.")
+        elif self.isSparse():
+            return self.toDense().solve(matrixB)
+        elif matrixB.isSparse():
+            return self.solve(matrixB.toDense())
+        else:
+            return self.__cached("solve", [matrixB], (), lambda: self.__solve(matrixB))
+
+    # Function needed for solve, solves the linear system for a dense square matrix and a dense matrix B
+    #
+    # Will return either a Matrix object or None
+    def __solve(self, matrixB):
+        solution = self.__solveStructured(matrixB.getMatrix())
+        if solution is None:
+            print("A matrix must not have a determinate of 0 to solve a linear system.")
+        else:
+            return Matrix(npMatrix = solution)
+
+    # Function needed for the result cache, reads the result of a operation from Matrix.resultCache, or computes
+    # it and writes it to the cache. Nothing is cached for small matrices, or for the operations a cached
+    # operation calls while it is computed.
+    #
+    # operation - str - the name of the operation
+    # operands - list - the other Matrix Objects of the operation
+    # parameters - tuple - the other arguments of the operation
+    # compute - a function that computes the result
+    #
+    # Returns the result of compute
+    def __cached(self, operation, operands, parameters, compute):
+        cache = Matrix.resultCache
+        if cache is None or getattr(Matrix.__cachedThreads, "computing", False) or self.__rows * self.__cols < cache.getMinCells():
+            return compute()
+
+        key = ResultCache.key(operation, [self.contentHash()] + [operand.contentHash() for operand in operands], parameters)
+        found, result = cache.get(key, operation)
+        if found:
+            return result
+
+        Matrix.__cachedThreads.computing = True
+        try:
+            result = compute()
+        finally:
+            Matrix.__cachedThreads.computing = False
+
+        if result is not None:
+            cache.put(key, operation, result)
+        return result
+
+    # Structure checks, used to pick faster kernels for the operations.
+    # Each check stops at the first block of rows that fails it, and its result is kept for later calls.
+    #
+    # Will return a bool, non square matrices are never treated as having a structure
+
+    # Checks if the matrix is equal to its transpose
+    def isSymmetric(self):
+        if "symmetric" not in self.__flags and self.isSparse():
+            self.__flags["symmetric"] = self.__npMatrix.isSymmetric()
+        elif "symmetric" not in self.__flags:
+            self.__flags["symmetric"] = self.__checkRows(
+                lambda npMatrix, start, end: np.array_equal(npMatrix[start:end, :end], npMatrix[:end, start:end].T))
+        return self.__flags["symmetric"]
+
+    # Checks if every value below the diagonal is zero
+    def isUpperTriangular(self):
+        if "upper" not in self.__flags and self.isSparse():
+            self.__flags["upper"] = self.__rows == self.__cols and self.__npMatrix.isUpperTriangular()
+        elif "upper" not in self.__flags:
+            self.__flags["upper"] = self.__checkRows(
+                lambda npMatrix, start, end: not np.any(np.tril(npMatrix[start:end, :end], start - 1)))
+        return self.__flags["upper"]
+
+    # Checks if every value above the diagonal is zero
+    def isLowerTriangular(self):
+        if "lower" not in self.__flags and self.isSparse():
+            self.__flags["lower"] = self.__rows == self.__cols and self.__npMatrix.isLowerTriangular()
+        elif "lower" not in self.__flags:
+            self.__flags["lower"] = self.__checkRows(
+                lambda npMatrix, start, end: not np.any(np.triu(npMatrix[start:end, start:], 1)))
+        return self.__flags["lower"]
+
+    # Checks if every value outside of the diagonal is zero
+    def isDiagonal(self):
+        return self.isUpperTriangular() and self.isLowerTriangular()
+
+    # Checks if the matrix is real, symmetric, and positive definite, by attempting a Cholesky
+    # factorization that is kept for the determinate, inverse, and solve.
+    # Sparse matrices are converted to dense matrices for these operations, so they are never checked.
+    def isPositiveDefinite(self):
+        if "positiveDefinite" not in self.__flags:
+            positiveDefinite = False
+
+            if self.isSymmetric() and not self.isSparse() and not np.iscomplexobj(self.__npMatrix):
+                try:
+                    self.__cholesky = np.linalg.cholesky(self.__npMatrix)
+                    positiveDefinite = True
+                except np.linalg.LinAlgError:
+                    pass
+
+            self.__flags["positiveDefinite"] = positiveDefinite
+        return self.__flags["positiveDefinite"]
+
+    # Function needed for the structure checks, runs a check over each block of rows
+    #
+    # check - a function taking the numpy matrix and the first and last row of a block,
+    #         returning wether the block passes
+    #
+    # Returns a bool
+    def __checkRows(self, check):
+        if self.__npMatrix is None or self.__rows != self.__cols:
+            return False
+
+        for start in range(0, self.__rows, Matrix.factorBlockSize):
+            end = min(start + Matrix.factorBlockSize, self.__rows)
+            if not check(self.__npMatrix, start, end):
+                return False
+        return True
+
+    # Function needed to pick the kernel used by the determinate, inverse, and solve
+    #
+    # Returns "diagonal", "upper", "lower", "positiveDefinite", or "general"
+    def __structure(self):
+        if self.isDiagonal():
+            return "diagonal"
+        elif self.isUpperTriangular():
+            return "upper"
+        elif self.isLowerTriangular():
+            return "lower"
+        elif self.isPositiveDefinite():
+            return "positiveDefinite"
+        return "general"
+
+    # Function needed for the inverse and solve, checks the pivots of the kernel that will be used
+    #
+    # Returns a bool
+    def __isSingular(self):
+        structure = self.__structure()
+        if structure in ("diagonal", "upper", "lower"):
+            return Matrix.__singularPivots(np.diagonal(self.__npMatrix))
+        elif structure == "positiveDefinite":
+            return Matrix.__singularPivots(np.diagonal(self.__cholesky))
+        else:
+            return self.__factorLU()[3]
+
+    # Function needed for the inverse and solve, solves (Current * X = B) with the kernel for the structure
+    # of the current matrix
+    #
+    # npMatrixB - a numpy matrix with as many rows as the current matrix, or None for the identity to find the inverse
+    #
+    # Will return either a numpy matrix or None if the current matrix is singular
+    def __solveStructured(self, npMatrixB):
+        structure = self.__structure()
+        if self.__isSingular():
+            return
+        elif structure == "general":
+            return self.__solveLU(npMatrixB)
+        elif npMatrixB is None:
+            npMatrixB = np.identity(self.__rows, dtype = Matrix.inexactType(self.__npMatrix))
+
+        dtype = Matrix.inexactType(self.__npMatrix, npMatrixB)
+        if structure == "diagonal":
+            return np.divide(npMatrixB, np.diagonal(self.__npMatrix)[:, np.newaxis], dtype = dtype)
+        elif structure in ("upper", "lower"):
+            solution = np.array(npMatrixB, dtype = dtype)
+            return Matrix.__triangularSolve(self.__npMatrix, solution, lower = structure == "lower")
+        elif structure == "positiveDefinite":
+            solution = np.array(npMatrixB, dtype = dtype)
+            Matrix.__triangularSolve(self.__cholesky, solution, lower = True)
+            return Matrix.__triangularSolve(self.__cholesky.T, solution, lower = False)
+
+    # Function needed for the determinate, inverse, and solve of matrices without a structure.
+    # Computes the LU factorization the first time it is needed and keeps it for the later calls.
+    #
+    # Returns a tuple of the combined LU array, the row permutation, the sign of the permutation,
+    # and wether the matrix is singular
+    def __factorLU(self):
+        if self.__lu is None:
+            lu = np.array(self.__npMatrix, dtype = Matrix.inexactType(self.__npMatrix))
+            permutation, sign = Matrix.__luDecompose(lu)
+            self.__lu = (lu, permutation, sign, Matrix.__singularPivots(np.diagonal(lu)))
+        return self.__lu
+
+    # Function needed for the inverse and solve, solves (Current * X = B) with the LU factorization
+    #
+    # npMatrixB - a numpy matrix with as many rows as the current matrix, or None for the identity
+    #
+    # Returns a numpy matrix
+    def __solveLU(self, npMatrixB):
+        lu, permutation, sign, singular = self.__factorLU()
+
+        if npMatrixB is None:
+            # The rows of the identity in the order of the row permutation
+            solution = np.zeros(lu.shape, dtype = lu.dtype)
+            solution[np.arange(self.__rows), permutation] = 1
+        else:
+            solution = np.array(npMatrixB[permutation], dtype = np.result_type(lu, npMatrixB))
+        Matrix.__triangularSolve(lu, solution, lower = True, unitDiagonal = True)
+        return Matrix.__triangularSolve(lu, solution, lower = False)
+
+    # Computes the LU factorization with partial pivoting (P * A = L * U) of a numpy matrix with at least
+    # as many rows as columns, writing L and U over it.
+    #
+    # The columns are split in halves, the left half is factored, then the rows of U to the right of it
+    # and the rest of the right half are found with a triangular solve and a matrix product before the
+    # right half is factored. So most of the work is done by matrix products, and only blocks a quarter of
+    # Matrix.factorBlockSize wide are factored a column at a time.
+    #
+    # npMatrix - a float or complex numpy matrix, it is overwritten with L below the diagonal, with a diagonal
+    #            of ones that is not stored, and U on and above it
+    #
+    # Returns a tuple of the row permutation and the sign of the permutation
+    @staticmethod
+    def __luDecompose(npMatrix):
+        rows, cols = npMatrix.shape
+        permutation = np.arange(rows)
+        sign = 1
+
+        if cols <= max(Matrix.factorBlockSize // 4, 1):
+            for k in range(cols):
+                # Each column is updated with the columns left of it before its pivot is picked
+                if k > 0:
+                    npMatrix[k:, k] -= np.matmul(npMatrix[k:, :k], npMatrix[:k, k])
+
+                pivot = k + int(np.argmax(np.abs(npMatrix[k:, k])))
+                if pivot != k:
+                    npMatrix[[k, pivot]] = npMatrix[[pivot, k]]
+                    permutation[[k, pivot]] = permutation[[pivot, k]]
+                    sign = -sign
+
+                if npMatrix[k, k] != 0:
+                    npMatrix[k + 1:, k] /= npMatrix[k, k]
+                if k > 0 and k + 1 < cols:
+                    npMatrix[k, k + 1:] -= np.matmul(npMatrix[k, :k], npMatrix[:k, k + 1:])
+            return permutation, sign
+
+        half = cols // 2
+        left, right = npMatrix[:, :half], npMatrix[:, half:]
+
+        leftPermutation, leftSign = Matrix.__luDecompose(left)
+        right[:] = right[leftPermutation]
+        Matrix.__triangularSolve(left[:half], right[:half], lower = True, unitDiagonal = True)
+        right[half:] -= np.matmul(left[half:], right[:half])
+
+        rightPermutation, rightSign = Matrix.__luDecompose(right[half:])
+        left[half:] = left[half:][rightPermutation]
+        permutation = np.concatenate((leftPermutation[:half], leftPermutation[half:][rightPermutation]))
+        return permutation, leftSign * rightSign
+
+    # Function needed to detect singular matrices, a matrix is treated as singular when one of the
+    # pivots of its factorization is zero relative to the largest pivot
+    #
+    # pivots - a numpy array of the pivots
+    #
+    # Returns a bool
+    @staticmethod
+    def __singularPivots(pivots):
+        pivots = np.abs(pivots)
+        if pivots.size == 0:
+            return True
+
+        tolerance = pivots.max() * pivots.size * np.finfo(Matrix.inexactType(pivots)).eps
+        return bool(pivots.min() <= tolerance)
+
+    # Solves (T * X = B) for a triangular numpy matrix T, writing X over B.
+    # Rows are solved a block at a time, with a matrix product to remove the rows already solved.
+    #
+    # triangle - a square numpy matrix, only the triangle being used is read
+    # npMatrixB - a numpy matrix with as many rows as the triangle, it is overwritten with the solution
+    # lower - bool - wether the triangle below (True) or above (False) the diagonal is used
+    # unitDiagonal - bool - wether the diagonal should be read as all ones
+    #
+    # Returns npMatrixB
+    @staticmethod
+    def __triangularSolve(triangle, npMatrixB, lower, unitDiagonal = False):
+        size = triangle.shape[0]
+        starts = range(0, size, Matrix.factorBlockSize)
+
+        for start in (starts if lower else reversed(starts)):
+            end = min(start + Matrix.factorBlockSize, size)
+
+            if lower and start > 0:
+                npMatrixB[start:end] -= np.matmul(triangle[start:end, :start], npMatrixB[:start])
+            elif not lower and end < size:
+                npMatrixB[start:end] -= np.matmul(triangle[start:end, end:], npMatrixB[end:])
+
+            block = np.tril(triangle[start:end, start:end]) if lower else np.triu(triangle[start:end, start:end])
+            if unitDiagonal:
+                np.fill_diagonal(block, 1)
+            npMatrixB[start:end] = np.linalg.solve(block, npMatrixB[start:end])
+
+        return npMatrixB
+
+    # Finds the identity matrix of the current Matrix, with the same dtype
+    #
+    # Will return either a Matrix object or None
+    def identity(self):
+        if self.__cols != self.__rows:
+            print("A matrix must be square (same number of rows and columns) to have a identity matrix.")
+        elif self.__rows is None:
+            pass
+        elif self.__rows < 1:
+            print("Somehow you made a Matrix with less than one row.")
+        elif self.isSparse():
+            diagonal = np.arange(self.__rows)
+            return Matrix(npMatrix = SparseArray.fromTriplets(diagonal, diagonal, np.ones(self.__rows, dtype = self.__npMatrix.dtype), (self.__rows, self.__rows)))
+        else:
+            return Matrix(npMatrix = np.identity(self.__rows, dtype = self.__npMatrix.dtype))
+
+    # Finds the zero matrix of the current matrix, with the same dtype
+    #
+    # Will return either a Matrix object or None
+    def zero(self):
+        if type(self.__rows) is not int or type(self.__cols) is not int:
+            print("Their is a problem, the Matrix's shape is not made of ints.")
+        elif self.__rows < 1:
+            print("Somehow you made a Matrix with less than one row.")
+        elif self.isSparse():
+            return Matrix(npMatrix = SparseArray.fromTriplets([], [], np.zeros(0, dtype = self.__npMatrix.dtype), self.__npMatrix.shape))
+        else:
+            return Matrix(npMatrix = np.zeros(self.__npMatrix.shape, dtype = self.__npMatrix.dtype))
+
+    # Finds the eigen values, vectors, and decomposition of the current matrix.
+    #
+    # The decomposition (V * D * V^-1) is rebuilt by scaling the columns of the eigen vectors by the
+    # eigen values, then multiplying by the transposed vectors for symmetric matrices, or solving
+    # against the vectors for other matrices, so no diagonal matrix or inverse is ever built.
+    #
+    # valuesOnly - bool - wether to only find the eigen values, which skips finding the vectors entirely
+    # reconstruct - bool - wether to rebuild the decomposition from the eigen values and vectors
+    #
+    # Will return either a list with a Matrix object for each of the eigen decomposition, vectors, and
+    # values, with None in place of the ones that were not asked for, or will return None
+    @Instrumentation.timed("Matrix.eigenDecomp")
+    def eigenDecomp(self, valuesOnly = False, reconstruct = True):
+
+        if self.__cols != self.__rows:
+            print("A matrix must be square (same number of rows and columns) to perform eigen decomposition.\n")
+        elif self.isSparse():
+            return self.toDense().eigenDecomp(valuesOnly, reconstruct)
+        else:
+            return self.__cached("eigenDecomp", [], (valuesOnly, reconstruct), lambda: self.__eigenDecomp(valuesOnly, reconstruct))
+
+    # Function needed for eigenDecomp, finds the eigen values, vectors, and decomposition of a dense square matrix
+    def __eigenDecomp(self, valuesOnly, reconstruct):
+
+        # eigh is only used for real symmetric matrices, complex symmetric matrices are not hermitian
+        symmetric = self.isSymmetric() and not np.iscomplexobj(self.__npMatrix)
+
+        # A diagonal matrix already holds its eigen values, and its eigen vectors are the identity.
+        # Real values are sorted from smallest to largest like eigh sorts them.
+        if self.isDiagonal():
+            eigValues = np.array(np.diagonal(self.__npMatrix), dtype = Matrix.inexactType(self.__npMatrix))
+            order = np.argsort(eigValues, kind = "stable") if symmetric else np.arange(self.__rows)
+            eigValues = eigValues[order]
+
+            if valuesOnly:
+                return [None, None, Matrix(eigValues)]
+
+            decomposition = None
+            if reconstruct:
+                decomposition = Matrix(npMatrix = np.array(self.__npMatrix, dtype = eigValues.dtype))
+
+            return [decomposition,
+                    Matrix(np.identity(self.__rows, dtype = eigValues.dtype)[:, order]),
+                    Matrix(eigValues)]
+
+        # Only the eigen values, returned as a 1 row Matrix.
+        # The eigen values of a triangular matrix are its diagonal.
+        if valuesOnly:
+            if self.isUpperTriangular() or self.isLowerTriangular():
+                eigValues = np.array(np.diagonal(self.__npMatrix), dtype = Matrix.inexactType(self.__npMatrix))
+            elif symmetric:
+                eigValues = np.linalg.eigvalsh(self.__npMatrix)
+            else:
+                eigValues = np.linalg.eigvals(self.__npMatrix)
+            return [None, None, Matrix(eigValues)]
+
+        if symmetric:
+            eigValues, eigVectors = np.linalg.eigh(self.__npMatrix)
+        else:
+            eigValues, eigVectors = np.linalg.eig(self.__npMatrix)
+
+        decomposition = None
+        if reconstruct:
+            # V * D, the eigen vectors with each column scaled by its eigen value
+            scaled = eigVectors * eigValues
+
+            if symmetric:
+                # The eigen vectors of a symmetric matrix are orthonormal, so V^-1 is V^T
+                decomposition = Matrix(npMatrix = np.matmul(scaled, eigVectors.T))
+            else:
+                # (V * D) * V^-1 is found by solving (V^T * X^T = (V * D)^T). The eigen vectors of a defective
+                # matrix, such as [[1,1],[0,1]], are not independent, so it has no eigen decomposition.
+                solved = Matrix(eigVectors.T).__solveStructured(scaled.T)
+                if solved is None:
+                    print("The eigen vectors of this matrix are not independent, so the matrix is not diagonalizable "
+                          "and has no eigen decomposition.")
+                else:
+                    decomposition = Matrix(npMatrix = solved).transpose()
+
+        return [decomposition,
+                Matrix(eigVectors),
+                Matrix(eigValues)]
+
+    # Estimates the most bytes a operation on dense matrices allocates, including its result, from the shapes of the
+    # matrices, so a caller can refuse a operation or switch to a tiled one before running out of memory.
+    #
+    # The estimates are the most each operation was measured to allocate for each structure of matrix, both
+    # traced by tracemalloc and as the peak resident memory of the process, since the work copies LAPACK makes
+    # are not traced. The eigen vectors of general matrices are counted as complex, which doubles their size.
+    #
+    # operation - str - "add", "subtract", "multiply", "transpose", "determinate", "inverse", "solve",
+    #             "eigenDecomp", or "statistics"
+    # shape - tuple - the rows and columns of the matrix the operation is called on
+    # shapeB - tuple - the rows and columns of the second matrix of add, subtract, multiply, and solve
+    # structure - str - "diagonal", "upper", "lower", "positiveDefinite", "symmetric", or "general", the
+    #             default, which is never below the estimate of the other structures
+    # dtype - the Numpy dtype of the values
+    # valuesOnly - bool - the valuesOnly argument of eigenDecomp
+    # reconstruct - bool - the reconstruct argument of eigenDecomp
+    #
+    # Will return either a int of bytes or None
+    @staticmethod
+    def estimateMemory(operation, shape, shapeB = None, structure = "general", dtype = np.float64, valuesOnly = False, reconstruct = True):
+        if structure not in Matrix.__MEMORY_STRUCTURES:
+            print("The structure must be one of " + ", ".join(Matrix.__MEMORY_STRUCTURES) + ".")
+            return
+        elif operation in ("add", "subtract", "multiply", "solve") and shapeB is None:
+            print(f"The shape of the second matrix is needed to estimate {operation}.")
+            return
+
+        rows, cols = shape
+        itemSize = Matrix.inexactType(dtype).itemsize
+        column = Matrix.__MEMORY_STRUCTURES.index(structure)
+
+        match operation:
+            case "add" | "subtract" | "statistics":
+                arrays = rows * cols
+            case "transpose":
+                arrays = 0
+            case "multiply":
+                arrays = rows * shapeB[1]
+            case "determinate":
+                arrays = Matrix.__MEMORY_ARRAYS["factor"][column] * rows * cols
+            case "solve" | "inverse":
+                # The factorization, then the solution and the blocks of the triangular solves.
+                # The inverse solves against a identity matrix as large as the matrix.
+                solutionCols = shapeB[1] if operation == "solve" else cols
+                arrays = Matrix.__MEMORY_ARRAYS["factor"][column] * rows * cols + 1.25 * rows * solutionCols
+                if operation == "inverse":
+                    arrays += rows * cols
+            case "eigenDecomp":
+                part = "eigenValues" if valuesOnly else ("eigenDecomp" if reconstruct else "eigenVectors")
+                arrays = Matrix.__MEMORY_ARRAYS[part][column] * rows * cols
+            case _:
+                print(f"The memory of {operation} cannot be estimated.")
+                return
+
+        # The blocks of rows used by the structure checks and the triangular solves, and the work space of LAPACK,
+        # which only matter for small matrices
+        if operation in ("determinate", "solve", "inverse", "eigenDecomp"):
+            arrays += 4 * Matrix.factorBlockSize * (rows + cols)
+
+        return int(np.ceil(arrays * itemSize))
+
+    # The structures known by estimateMemory, in the order of the columns of __MEMORY_ARRAYS
+    __MEMORY_STRUCTURES = ("diagonal", "upper", "lower", "positiveDefinite", "symmetric", "general")
+
+    # The most full size arrays allocated by each part of a operation, for each structure.
+    # factor - the factorization used by the determinate, inverse, and solve, with the update it makes
+    # eigenDecomp, eigenVectors, eigenValues - eigenDecomp with reconstruct, without it, and with valuesOnly
+    __MEMORY_ARRAYS = { "factor": (0, 0, 0, 2.2, 2.2, 2.2),
+                        "eigenDecomp": (3.1, 6.5, 6.5, 4.5, 4.5, 12.5),
+                        "eigenVectors": (2.1, 6.5, 6.5, 4.5, 4.5, 6.5),
+                        "eigenValues": (0.15, 0.15, 0.15, 1.25, 1.25, 1.5) }
+
+    # Operators, +, -, * (element by element), @, and .T build a MatrixExpression that is only computed once
+    # evaluate is called on it, so a chain of operations does not make a new matrix for every step.
+    # numpy scalars defer to these operators instead of treating the Matrix as a object array.
+    __array_ufunc__ = None
+
+    def __add__(self, other):
+        return MatrixExpression.leaf(self) + other
+
+    def __radd__(self, other):
+        return other + MatrixExpression.leaf(self)
+
+    def __sub__(self, other):
+        return MatrixExpression.leaf(self) - other
+
+    def __rsub__(self, other):
+        return other - MatrixExpression.leaf(self)
+
+    def __mul__(self, other):
+        return MatrixExpression.leaf(self) * other
+
+    def __rmul__(self, other):
+        return other * MatrixExpression.leaf(self)
+
+    def __matmul__(self, other):
+        return MatrixExpression.leaf(self) @ other
+
+    def __rmatmul__(self, other):
+        return other @ MatrixExpression.leaf(self)
+
+    @property
+    def T(self):
+        return MatrixExpression.leaf(self).T
+
+    # Getters
+
+    # returns the numpy matrix
+    def getMatrix(self):
+        return self.__npMatrix
+    
+    # returns the rows of the matrix
+    def getRows(self):
+        return self.__rows
+    
+    # returns the columns of the matrix
+    def getCols(self):
+        return self.__cols
+
+    # returns wether the matrix is stored as a SparseArray
+    def isSparse(self):
+        return isinstance(self.__npMatrix, SparseArray)
+
+    # returns the matrix as a dense Matrix, or the current Matrix if it is already dense
+    def toDense(self):
+        if self.isSparse():
+            return Matrix(npMatrix = self.__npMatrix.toDense())
+        return self
+
+    # returns the matrix as a sparse Matrix, or the current Matrix if it is already sparse
+    def toSparse(self):
+        if self.__npMatrix is None or self.isSparse():
+            return self
+        return Matrix(npMatrix = SparseArray.fromDense(self.__npMatrix))
+
+    # Converts the values of the matrix to another dtype, such as float32 to halve the memory of a float64 matrix.
+    # Decimal values converted to a integer type are cut off toward zero.
+    #
+    # dtype - the Numpy dtype of the values, or anything np.dtype accepts such as "float32"
+    #
+    # Will return either a Matrix object or None
+    @Instrumentation.timed("Matrix.toDtype")
+    def toDtype(self, dtype):
+        dtype = Matrix.__numberType(dtype)
+        if dtype is None or self.__npMatrix is None:
+            return
+        elif np.iscomplexobj(self.__npMatrix) and not np.issubdtype(dtype, np.complexfloating):
+            print("A matrix of complex values can only be converted to a complex type.")
+        elif self.isSparse():
+            # Values cut off to zero are dropped
+            return Matrix(npMatrix = SparseArray.fromTriplets(self.__npMatrix.rowIndices(), self.__npMatrix.indices,
+                                                              self.__npMatrix.data.astype(dtype), self.__npMatrix.shape))
+        else:
+            return Matrix(npMatrix = self.__npMatrix.astype(dtype))
+
+    # Finds a hash of the dtype, shape, and values of the matrix, or the CSR arrays of a sparse matrix, used to
+    # name the blobs of the matrices folder and to key the result cache. The values are hashed a block of rows
+    # at a time when they are not contiguous, such as a transposed matrix, so they are never copied as a whole.
+    #
+    # The hash is kept for matrices memory mapped read only, such as the ones loaded from the matrices folder, as
+    # the values of other matrices can be changed through getMatrix without the Matrix knowing.
+    #
+    # Returns a str of the SHA-256 hash in hexadecimal
+    def contentHash(self):
+        if self.__contentHash is not None:
+            return self.__contentHash
+
+        checksum = hashlib.sha256()
+        if self.isSparse():
+            checksum.update(f"sparse {self.__npMatrix.dtype.str} {self.__npMatrix.shape}".encode())
+            arrays = [self.__npMatrix.data, self.__npMatrix.indices, self.__npMatrix.indptr]
+        else:
+            checksum.update(f"dense {self.__npMatrix.dtype.str} {self.__npMatrix.shape}".encode())
+            arrays = [self.__npMatrix]
+
+        for array in arrays:
+            if array.flags.c_contiguous:
+                checksum.update(array)
+            else:
+                for start in range(0, array.shape[0], Matrix.factorBlockSize):
+                    checksum.update(np.ascontiguousarray(array[start:start + Matrix.factorBlockSize]))
+
+        if isinstance(self.__npMatrix, np.memmap) and self.__npMatrix.mode == "r":
+            self.__contentHash = checksum.hexdigest()
+        return checksum.hexdigest()
+    
+    # creates a pop-up image of the heatmap of the current matrix, or writes it to a PNG file without opening a window.
+    # Small matrices show the value of every cell, larger matrices are pooled down to Matrix.heatmapCells rows and
+    # columns and drawn as a single image.
+    #
+    # path - str - the path of a PNG file to write the heatmap to, a pop-up is shown if not provided
+    # pooling - str - "mean" or "max", how each block of values of a large matrix is shown
+    #
+    # Will return True when the heatmap is written to a file, otherwise None
+    @Instrumentation.timed("Matrix.showVisualization")
+    def showVisualization(self, path = None, pooling = "mean"):
+        if self.__npMatrix is None:
+            print("You cannot show a empty or null matrix.")
+            return
+        elif pooling not in ("mean", "max"):
+            print("The pooling must be either mean or max.")
+            return
+
+        # A figure made without pyplot is never shown, so no window or display is needed to write the file
+        if path is None:
+            import matplotlib.pyplot as plt
+            figure = plt.figure()
+        else:
+            from matplotlib.figure import Figure
+            figure = Figure()
+        axes = figure.add_subplot()
+
+        if self.__rows * self.__cols <= Matrix.annotateCells:
+            import seaborn as sns
+            sns.heatmap(self.toDense().getMatrix(), annot = True, cmap ='plasma', 
+                linecolor ='black', linewidths = 1, ax = axes)
+        else:
+            image = axes.imshow(self.pooledMatrix(Matrix.heatmapCells, pooling), cmap = "plasma", aspect = "auto",
+                                interpolation = "nearest", extent = (0, self.__cols, self.__rows, 0))
+            figure.colorbar(image, ax = axes)
+
+        if path is None:
+            plt.show()
+            return
+
+        try:
+            figure.savefig(path)
+            return True
+        except:
+            print("The heatmap could not be written to " + str(path) + ".")
+
+    # Shrinks the matrix to at most maxCells rows and columns, each cell holding the mean or max of a block of values.
+    # Dense matrices are read a strip of rows at a time and sparse matrices only read their stored values, so memory
+    # mapped and sparse matrices are never fully loaded. Complex values are pooled by their size.
+    #
+    # maxCells - int - the most rows and columns of the result
+    # pooling - str - "mean" or "max"
+    #
+    # Will return a Numpy Array
+    def pooledMatrix(self, maxCells, pooling = "mean"):
+        rowFactor = -(-self.__rows // maxCells)
+        colFactor = -(-self.__cols // maxCells)
+        rowStarts = np.arange(0, self.__rows, rowFactor)
+        colStarts = np.arange(0, self.__cols, colFactor)
+
+        # The amount of values in each block, the blocks of the last row and column can be smaller
+        counts = np.outer(np.diff(np.append(rowStarts, self.__rows)), np.diff(np.append(colStarts, self.__cols)))
+
+        if self.isSparse():
+            values = self.__npMatrix.data
+            values = np.abs(values) if np.iscomplexobj(values) else values
+            blocks = (self.__npMatrix.rowIndices() // rowFactor) * len(colStarts) + self.__npMatrix.indices // colFactor
+
+            if pooling == "mean":
+                sums = np.bincount(blocks, weights = values, minlength = counts.size).reshape(counts.shape)
+                return sums / counts
+
+            pooled = np.full(counts.size, -np.inf)
+            np.maximum.at(pooled, blocks, values)
+            pooled = pooled.reshape(counts.shape)
+
+            # Blocks with a value that is not stored hold a zero
+            stored = np.bincount(blocks, minlength = counts.size).reshape(counts.shape)
+            return np.where(stored < counts, np.maximum(pooled, 0), pooled)
+
+        ufunc = np.add if pooling == "mean" else np.maximum
+        pooled = np.empty(counts.shape)
+        stripRows = rowFactor * max(1, (Matrix.blockSize * Matrix.blockSize) // (rowFactor * self.__cols))
+
+        for start in range(0, self.__rows, stripRows):
+            strip = np.asarray(self.__npMatrix[start:start + stripRows])
+            strip = np.abs(strip) if np.iscomplexobj(strip) else strip
+            stripStarts = np.arange(0, strip.shape[0], rowFactor)
+            first = start // rowFactor
+            pooled[first:first + len(stripStarts)] = ufunc.reduceat(ufunc.reduceat(strip, stripStarts, axis = 0), colStarts, axis = 1)
+
+        return pooled / counts if pooling == "mean" else pooled
+
+    # Writes the current matrix to a CSV file, the only format used to share matrices outside of the program.
+    # Sparse matrices are written as "row,column,value" triplets, the format read by createImportSparse.
+    #
+    # path - str - the path of the csv file to write
+    #
+    # Will return either True or None
+    @Instrumentation.timed("Matrix.exportCSV")
+    def exportCSV(self, path):
+        if self.__npMatrix is None:
+            print("You cannot export a empty or null matrix.")
+            return
+
+        try:
+            valueFormat = Matrix.__csvFormat(self.__npMatrix.dtype)
+            if self.isSparse():
+                # The rows, columns, and values keep their own dtypes, so whole number values are not converted to floats
+                triplets = np.rec.fromarrays((self.__npMatrix.rowIndices(), self.__npMatrix.indices, self.__npMatrix.data))
+                np.savetxt(path, triplets, delimiter=",", fmt=["%d", "%d", valueFormat])
+            else:
+                np.savetxt(path, self.__npMatrix, delimiter=",", fmt = valueFormat)
+            return True
+        except:
+            print("The matrix could not be written to that path.")
+
+    # Function needed for exporting, finds the shortest format that writes the values of a dtype without changing
+    # them when they are imported again, so whole numbers stay whole numbers
+    #
+    # dtype - the Numpy dtype of the values
+    #
+    # Returns a str of the printf format
+    @staticmethod
+    def __csvFormat(dtype):
+        if np.issubdtype(dtype, np.integer):
+            return "%d"
+        elif dtype == np.float32:
+            return "%.9g"
+        elif dtype == np.float64:
+            return "%.17g"
+        return "%.18e"
+
+    # prints the current matrix to the terminal
+    # Matrices with more than Matrix.printCells values are printed as a summary, the first and last rows and
+    # columns with the shape, dtype, and statistics of the values, so no large string is ever built.
+    #
+    # mode - str - "auto", "summary", "page" to print the rows from start, or "full" to print every row one at a time
+    # start - int - the first row printed by the page mode
+    # rows - int - the amount of rows printed by the page mode, Matrix.pageRows if not provided
+    # edgeItems - int - the amount of first and last rows and columns printed by the summary
+    @Instrumentation.timed("Matrix.printMatrix")
+    def printMatrix(self, mode = "auto", start = 0, rows = None, edgeItems = 3):
+        if self.__npMatrix is None:
+            print('None')
+        elif mode not in ("auto", "summary", "page", "full"):
+            print("The print mode must be auto, summary, page, or full.")
+        elif mode == "auto" and self.__rows * self.__cols <= Matrix.printCells:
+            print(str(self.__npMatrix))
+        elif mode in ("auto", "summary"):
+            self.__printSummary(edgeItems)
+        else:
+            # Only the rows being printed are read, so memory mapped matrices are never fully loaded
+            end = self.__rows if mode == "full" else min(self.__rows, start + (rows if rows is not None else Matrix.pageRows))
+            for row in range(max(0, start), end):
+                values = self.__npMatrix.rowDense(row) if self.isSparse() else self.__npMatrix[row]
+                print(np.array2string(np.asarray(values), threshold = self.__cols + 1, max_line_width = np.inf))
+
+    # Function needed for printing, prints the shape, dtype, and statistics of the matrix with its first and
+    # last rows and columns
+    def __printSummary(self, edgeItems):
+        print(f"{self.__rows} x {self.__cols} {'sparse ' if self.isSparse() else ''}matrix of {self.__npMatrix.dtype}")
+
+        if self.isSparse():
+            print(str(self.__npMatrix))
+        else:
+            # Only the first and last rows and columns are read, with one row and column between them that
+            # Numpy summarizes as "...", as it does for any axis longer than twice edgeItems
+            rowIndices = Matrix.__edgeIndices(self.__rows, edgeItems)
+            colIndices = Matrix.__edgeIndices(self.__cols, edgeItems)
+            corners = np.asarray(self.__npMatrix[rowIndices][:, colIndices])
+            print(np.array2string(corners, threshold = 0, edgeitems = edgeItems))
+
+        statistics = self.statistics()
+        if "min" in statistics:
+            print(f"min {statistics['min']:.6g}, max {statistics['max']:.6g}, mean {statistics['mean']:.6g}, std {statistics['std']:.6g}")
+        else:
+            print(f"mean {statistics['mean']:.6g}")
+
+    # Function needed for the summary, the indices of the first and last edgeItems of a axis and one index between them
+    @staticmethod
+    def __edgeIndices(size, edgeItems):
+        if size <= 2 * edgeItems + 1:
+            return np.arange(size)
+        return np.r_[0:edgeItems, edgeItems, size - edgeItems:size]
+
+    # Finds the min, max, mean, and standard deviation of the values, reading a strip of rows at a time
+    # so memory mapped matrices are never fully loaded. Complex values only have a mean.
+    #
+    # Will return a dict of the statistics
+    @Instrumentation.timed("Matrix.statistics")
+    def statistics(self):
+        size = self.__rows * self.__cols
+        complexValues = np.iscomplexobj(self.__npMatrix.data if self.isSparse() else self.__npMatrix)
+
+        if self.isSparse():
+            values = self.__npMatrix.data
+            strips = [np.append(values, 0) if values.size < size else values]
+        else:
+            stripRows = max(1, (Matrix.blockSize * Matrix.blockSize) // self.__cols)
+            strips = (self.__npMatrix[start:start + stripRows] for start in range(0, self.__rows, stripRows))
+
+        total, squares, low, high = 0, 0.0, np.inf, -np.inf
+        for strip in strips:
+            strip = np.asarray(strip)
+            total += strip.sum(dtype = np.result_type(strip, np.float64))
+            if not complexValues:
+                squares += np.square(strip, dtype = np.float64).sum()
+                low, high = min(low, strip.min()), max(high, strip.max())
+
+        mean = total / size
+        if complexValues:
+            return {"mean": mean}
+        return {"min": low, "max": high, "mean": mean, "std": np.sqrt(max(squares / size - mean * mean, 0.0))}
+
+
+
+# %% [markdown]
+# # Matrix Expression Class
+
+# %%
+# Class utilized to hold a lazy expression of matrices, made by the operators of the Matrix class, which is
+# only computed once evaluate is called.
+#
+# When evaluated, transposes are moved down to the matrices so they become views instead of copies, and a
+# chain of element by element operations (+, -, *) is fused into one pass over the rows, a chunk of rows at
+# a time, written into a single output array. Long expressions like (A + B - C * D) only need memory for the
+# result and a few chunks, instead of a full array for each step.
+#
+# Shapes are checked as the expression is built, raising a ValueError like the operators of Numpy.
+class MatrixExpression:
+
+    # The amount of bytes in each chunk of rows of a fused evaluation, small enough to stay in the cache
+    chunkBytes = 256 * 1024
+
+    # The Numpy functions of the element by element operations
+    __UFUNCS = { "add": np.add, "subtract": np.subtract, "multiply": np.multiply }
+
+    __array_ufunc__ = None
+
+    # operation - str - "leaf", "scalar", "add", "subtract", "multiply", "matmul", or "transpose"
+    # operands - list - the Matrix of a leaf, the value of a scalar, or the MatrixExpressions the operation uses
+    # shape - tuple - the rows and columns of the result, None for a scalar
+    def __init__(self, operation, operands, shape):
+        self.__operation = operation
+        self.__operands = operands
+        self.__shape = shape
+
+    # Constructor used to make a expression of a single Matrix
+    #
+    # Will return a MatrixExpression
+    @classmethod
+    def leaf(cls, matrix):
+        return cls("leaf", [matrix], (matrix.getRows(), matrix.getCols()))
+
+    # Turns a operand of a operator into a expression, Matrix objects become leaves and numbers become scalars
+    #
+    # Will return a MatrixExpression, or NotImplemented for operands that are not supported
+    @staticmethod
+    def __wrap(operand):
+        if isinstance(operand, MatrixExpression):
+            return operand
+        elif isinstance(operand, Matrix):
+            return MatrixExpression.leaf(operand)
+        elif isinstance(operand, (int, float, complex, np.number)):
+            return MatrixExpression("scalar", [operand], None)
+        return NotImplemented
+
+    # Function needed for building the element by element operations, a scalar is used for every value
+    #
+    # Will return a MatrixExpression or NotImplemented
+    @staticmethod
+    def __elementwise(operation, left, right):
+        left, right = MatrixExpression.__wrap(left), MatrixExpression.__wrap(right)
+        if left is NotImplemented or right is NotImplemented:
+            return NotImplemented
+
+        shape = left.getShape() if left.getShape() is not None else right.getShape()
+        if right.getShape() is not None and right.getShape() != shape:
+            raise ValueError(f"To {operation} matrices they must have the same amount of rows and columns, not {left.getShape()} and {right.getShape()}.")
+        return MatrixExpression(operation, [left, right], shape)
+
+    def __add__(self, other):
+        return MatrixExpression.__elementwise("add", self, other)
+
+    def __radd__(self, other):
+        return MatrixExpression.__elementwise("add", other, self)
+
+    def __sub__(self, other):
+        return MatrixExpression.__elementwise("subtract", self, other)
+
+    def __rsub__(self, other):
+        return MatrixExpression.__elementwise("subtract", other, self)
+
+    def __mul__(self, other):
+        return MatrixExpression.__elementwise("multiply", self, other)
+
+    def __rmul__(self, other):
+        return MatrixExpression.__elementwise("multiply", other, self)
+
+    def __matmul__(self, other):
+        other = MatrixExpression.__wrap(other)
+        if other is NotImplemented or other.getShape() is None:
+            return NotImplemented
+        elif self.__shape[1] != other.getShape()[0]:
+            raise ValueError(f"To multiply matrices the columns of the first must match the rows of the second, not {self.__shape} and {other.getShape()}.")
+        return MatrixExpression("matmul", [self, other], (self.__shape[0], other.getShape()[1]))
+
+    def __rmatmul__(self, other):
+        other = MatrixExpression.__wrap(other)
+        if other is NotImplemented or other.getShape() is None:
+            return NotImplemented
+        return other @ self
+
+    @property
+    def T(self):
+        return MatrixExpression("transpose", [self], (self.__shape[1], self.__shape[0]))
+
+    # Computes the expression
+    #
+    # Will return a Matrix object
+    def evaluate(self):
+        return MatrixExpression.__evaluatePlan(self.__plan(False))
+
+    # Function needed for evaluation, turns the expression into a plan where transposes are applied to the matrices.
+    # Matrix products are computed here, and their results become leaves of the plan.
+    #
+    # transposed - bool - wether the transpose of this expression is wanted
+    #
+    # Will return a plan, a ("leaf", Matrix), ("scalar", value), or (operation, left plan, right plan) tuple
+    def __plan(self, transposed):
+        operands = self.__operands
+
+        match self.__operation:
+            case "leaf":
+                return ("leaf", operands[0].transpose() if transposed else operands[0])
+            case "scalar":
+                return ("scalar", operands[0])
+            case "transpose":
+                return operands[0].__plan(not transposed)
+            case "matmul":
+                # (A @ B)^T is found as (B^T @ A^T)
+                if transposed:
+                    left, right = operands[1].__plan(True), operands[0].__plan(True)
+                else:
+                    left, right = operands[0].__plan(False), operands[1].__plan(False)
+                return ("leaf", MatrixExpression.__evaluatePlan(left).multiply(MatrixExpression.__evaluatePlan(right)))
+            case _:
+                return (self.__operation, operands[0].__plan(transposed), operands[1].__plan(transposed))
+
+    # Function needed for evaluation, computes a plan
+    #
+    # Will return a Matrix object
+    @staticmethod
+    def __evaluatePlan(plan):
+        if plan[0] == "leaf":
+            return plan[1]
+
+        leaves = []
+        MatrixExpression.__collect(plan, leaves)
+
+        # Sums of sparse matrices stay sparse, so they are added one operation at a time
+        if all(leaf[0] == "leaf" and leaf[1].isSparse() for leaf in leaves) and MatrixExpression.__onlySums(plan):
+            return MatrixExpression.__evaluateSparse(plan)
+
+        # Sparse leaves are not converted, each chunk reads only the stored values of its rows
+        values = [leaf[1].getMatrix().dtype if leaf[0] == "leaf" else leaf[1] for leaf in leaves]
+        shape = next((leaf[1].getRows(), leaf[1].getCols()) for leaf in leaves if leaf[0] == "leaf")
+        out = np.empty(shape, dtype = np.result_type(*values))
+
+        # Each chunk of rows is computed through the whole expression before moving to the next chunk,
+        # scratch holds a chunk sized buffer for each level of right hand operations that are not leaves
+        chunkRows = max(1, MatrixExpression.chunkBytes // max(1, shape[1] * out.itemsize))
+        scratch = []
+        for start in range(0, shape[0], chunkRows):
+            rows = slice(start, min(start + chunkRows, shape[0]))
+            MatrixExpression.__evaluateChunk(plan, rows, out[rows], scratch, 0)
+
+        return Matrix(out)
+
+    # Function needed for the fused evaluation, computes a chunk of rows of a plan.
+    # Dense leaves give a view of their rows, sparse leaves the dense values of only their rows, and operations
+    # write into the given output buffer.
+    #
+    # Will return a Numpy Array or scalar of the values of the rows
+    @staticmethod
+    def __evaluateChunk(plan, rows, out, scratch, depth):
+        if plan[0] == "leaf" and plan[1].isSparse():
+            return plan[1].getMatrix().denseRows(rows.start, rows.stop)
+        elif plan[0] == "leaf":
+            return plan[1].getMatrix()[rows]
+        elif plan[0] == "scalar":
+            return plan[1]
+
+        left = MatrixExpression.__evaluateChunk(plan[1], rows, out, scratch, depth)
+
+        rightOut = None
+        if plan[2][0] not in ("leaf", "scalar"):
+            if len(scratch) <= depth:
+                scratch.append(np.empty(out.shape, dtype = out.dtype))
+            rightOut = scratch[depth][:out.shape[0]]
+        right = MatrixExpression.__evaluateChunk(plan[2], rows, rightOut, scratch, depth + 1)
+
+        MatrixExpression.__UFUNCS[plan[0]](left, right, out = out)
+        return out
+
+    # Function needed for evaluation, adds the leaves and scalars of a plan to a list
+    @staticmethod
+    def __collect(plan, leaves):
+        if plan[0] in ("leaf", "scalar"):
+            leaves.append(plan)
+        else:
+            MatrixExpression.__collect(plan[1], leaves)
+            MatrixExpression.__collect(plan[2], leaves)
+
+    # Function needed for evaluation, checks if a plan only adds and subtracts
+    @staticmethod
+    def __onlySums(plan):
+        if plan[0] == "leaf":
+            return True
+        elif plan[0] in ("add", "subtract"):
+            return MatrixExpression.__onlySums(plan[1]) and MatrixExpression.__onlySums(plan[2])
+        return False
+
+    # Function needed for evaluation, computes a plan of sums of sparse matrices with the Matrix operations
+    #
+    # Will return a Matrix object
+    @staticmethod
+    def __evaluateSparse(plan):
+        if plan[0] == "leaf":
+            return plan[1]
+
+        left = MatrixExpression.__evaluateSparse(plan[1])
+        right = MatrixExpression.__evaluateSparse(plan[2])
+        return left.add(right) if plan[0] == "add" else left.subtract(right)
+
+    # Getters
+
+    # returns the rows and columns of the result, or None for a scalar
+    def getShape(self):
+        return self.__shape
+
+# %% [markdown]
+# # Matrix Batch Class
+
+# %%
+# Class utilized to hold a stack of matrices with the same shape in a single 3-D Numpy Array, so an operation
+# is run over every matrix with one stacked Numpy call instead of one Matrix object at a time.
+#
+# Instead of printing and returning None for each matrix, a batch keeps a valid mask with a bool for each
+# matrix, which is False where the operation could not be done (such as the inverse of a singular matrix).
+# Operations that cannot be done for the whole batch, such as adding batches of different shapes, still print
+# and return None like the Matrix class.
+class MatrixBatch:
+
+    # npBatch - a 3-D Numpy Array of (matrices, rows, columns)
+    # valid - a 1-D bool Numpy Array, every matrix is valid if not provided
+    def __init__(self, npBatch, valid = None):
+
+        if isinstance(npBatch, np.ndarray) and npBatch.ndim == 3:
+            self.__npBatch = npBatch
+            if valid is None:
+                self.__valid = np.ones(npBatch.shape[0], dtype = bool)
+            else:
+                self.__valid = np.array(valid, dtype = bool)
+        else:
+            self.__npBatch = None
+            self.__valid = None
+
+    # Constructor used to create a batch from a list of Matrix objects with the same shape.
+    # If the matrices are the consecutive matrices of a batch, as given by toMatrices, that batch is used without copying.
+    #
+    # matrices - list - a list of Matrix Objects
+    #
+    # Will return either a MatrixBatch object or None
+    @classmethod
+    def fromMatrices(cls, matrices):
+        if type(matrices) is not list or len(matrices) == 0:
+            print("A batch must be made from a non empty list of matrices.")
+            return
+
+        npMatrices = [matrix.toDense().getMatrix() for matrix in matrices]
+        if any(not isinstance(npMatrix, np.ndarray) or npMatrix.shape != npMatrices[0].shape for npMatrix in npMatrices):
+            print("To make a batch every Matrix must have the same amount of rows and columns.")
+            return
+
+        npBatch = MatrixBatch.__sharedBatch(npMatrices)
+        if npBatch is None:
+            npBatch = np.stack(npMatrices)
+        return cls(npBatch)
+
+    # Finds the 3-D array the matrices are consecutive views of, so it can be used without copying
+    #
+    # npMatrices - list - a list of 2-D Numpy Arrays with the same shape
+    #
+    # Will return a 3-D Numpy Array or None
+    @staticmethod
+    def __sharedBatch(npMatrices):
+        base = npMatrices[0].base
+        if not isinstance(base, np.ndarray) or base.ndim != 3 or base.shape[1:] != npMatrices[0].shape:
+            return
+
+        baseAddress = base.__array_interface__["data"][0]
+        first = npMatrices[0].__array_interface__["data"][0] - baseAddress
+        if base.strides[0] == 0 or first % base.strides[0] != 0:
+            return
+
+        start = first // base.strides[0]
+        for i, npMatrix in enumerate(npMatrices):
+            if (npMatrix.base is not base or npMatrix.strides != base.strides[1:]
+                    or npMatrix.__array_interface__["data"][0] != baseAddress + (start + i) * base.strides[0]):
+                return
+        if start < 0 or start + len(npMatrices) > base.shape[0]:
+            return
+        return base[start:start + len(npMatrices)]
+
+    # Returns the batch as a list of Matrix objects, each a view of the batch so nothing is copied.
+    # Only the valid matrices are returned if validOnly is True.
+    #
+    # Will return a list of Matrix objects
+    def toMatrices(self, validOnly = False):
+        return [Matrix(self.__npBatch[i]) for i in range(self.getSize()) if self.__valid[i] or not validOnly]
+
+    # Function needed for the operations between two batches, or a batch and a single Matrix used for every matrix
+    #
+    # Will return a tuple of the 3-D or 2-D Numpy Array and the valid mask of the other operand
+    def __operand(self, other):
+        if isinstance(other, MatrixBatch):
+            return other.getBatch(), other.getValid()
+        return other.toDense().getMatrix(), np.ones(self.getSize(), dtype = bool)
+
+    # Adds each matrix of the batch and the matching matrix of batchB, or a single Matrix to every matrix
+    #
+    # Will return either a MatrixBatch object or None
+    def add(self, batchB):
+        npBatchB, validB = self.__operand(batchB)
+        if npBatchB.shape[-2:] != self.__npBatch.shape[1:] or (npBatchB.ndim == 3 and len(npBatchB) != self.getSize()):
+            print("To add batches they must have the same amount of matrices, rows, and columns.")
+        else:
+            return MatrixBatch(np.add(self.__npBatch, npBatchB), self.__valid & validB)
+
+    # Subtracts the matching matrix of batchB, or a single Matrix, from each matrix of the batch
+    #
+    # Will return either a MatrixBatch object or None
+    def subtract(self, batchB):
+        npBatchB, validB = self.__operand(batchB)
+        if npBatchB.shape[-2:] != self.__npBatch.shape[1:] or (npBatchB.ndim == 3 and len(npBatchB) != self.getSize()):
+            print("To subtract batches they must have the same amount of matrices, rows, and columns.")
+        else:
+            return MatrixBatch(np.subtract(self.__npBatch, npBatchB), self.__valid & validB)
+
+    # Multiplies each matrix of the batch by the matching matrix of batchB, or by a single Matrix
+    #
+    # Will return either a MatrixBatch object or None
+    def multiply(self, batchB):
+        npBatchB, validB = self.__operand(batchB)
+        if self.getCols() != npBatchB.shape[-2] or (npBatchB.ndim == 3 and len(npBatchB) != self.getSize()):
+            print("To multiply batches the columns of the first must match the rows of the second, for the same amount of matrices.")
+        else:
+            return MatrixBatch(np.matmul(self.__npBatch, npBatchB), self.__valid & validB)
+
+    # Transposes each matrix of the batch, the result is a view of the batch
+    #
+    # Will return either a MatrixBatch object
+    def transpose(self):
+        return MatrixBatch(np.swapaxes(self.__npBatch, 1, 2), self.__valid)
+
+    # Finds the determinate of each matrix of the batch
+    #
+    # Will return either a 1-D Numpy Array, with NaN for the matrices that are not valid, or None
+    def determinate(self):
+        if self.getRows() != self.getCols():
+            print("The matrices must be square (same number of rows and columns) to have a determinant.")
+            return
+
+        determinates = np.linalg.det(self.__npBatch)
+        determinates[~self.__valid] = np.nan
+        return determinates
+
+    # Finds the inverse of each matrix of the batch. Matrices treated as singular by the Matrix class, those
+    # with a condition number above 1 / (n * eps), are marked as not valid instead of stopping the batch.
+    #
+    # Will return either a MatrixBatch object or None
+    def inverse(self):
+        if self.getRows() != self.getCols():
+            print("The matrices must be square (same number of rows and columns) to have a inverse.")
+            return
+
+        inverses, invertible = MatrixBatch.__inverseStack(self.__npBatch)
+        return MatrixBatch(inverses, self.__valid & invertible)
+
+    # Function needed for inverting a stack of square matrices without a singular matrix stopping the others
+    #
+    # npBatch - a 3-D Numpy Array of square matrices
+    #
+    # Will return a tuple of the inverses and a bool mask of the matrices that could be inverted
+    @staticmethod
+    def __inverseStack(npBatch):
+        n = npBatch.shape[1]
+        npBatch = np.asarray(npBatch, dtype = Matrix.inexactType(npBatch))
+
+        # Exactly singular matrices would stop np.linalg.inv, so the identity is inverted in their place
+        exact = np.linalg.det(npBatch) == 0
+        if np.any(exact):
+            npBatch = npBatch.copy()
+            npBatch[exact] = np.identity(n)
+
+        inverses = np.linalg.inv(npBatch)
+        with np.errstate(over = "ignore", invalid = "ignore"):
+            condition = np.linalg.norm(npBatch, 1, axis = (1, 2)) * np.linalg.norm(inverses, 1, axis = (1, 2))
+            invertible = ~exact & np.isfinite(condition) & (condition * n * np.finfo(npBatch.dtype).eps < 1)
+        return inverses, invertible
+
+    # Finds the eigen decomposition of each matrix of the batch, using eigh when every matrix is real and symmetric.
+    #
+    # valuesOnly - bool - only the eigen values are found
+    # reconstruct - bool - wether the decomposition (V * D * V^-1) is rebuilt, a matrix whose eigen vectors
+    #   cannot be inverted is marked as not valid in the decomposition
+    #
+    # Will return either a list with a MatrixBatch object for each of the eigen decomposition, vectors, and
+    # values (each a 1 row matrix), with None in place of the ones that were not asked for, or will return None
+    def eigenDecomp(self, valuesOnly = False, reconstruct = True):
+        if self.getRows() != self.getCols():
+            print("The matrices must be square (same number of rows and columns) to perform eigen decomposition.\n")
+            return
+
+        symmetric = not np.iscomplexobj(self.__npBatch) and np.array_equal(self.__npBatch, np.swapaxes(self.__npBatch, 1, 2))
+
+        if valuesOnly:
+            eigValues = np.linalg.eigvalsh(self.__npBatch) if symmetric else np.linalg.eigvals(self.__npBatch)
+            return [None, None, MatrixBatch(eigValues[:, np.newaxis, :], self.__valid)]
+
+        if symmetric:
+            eigValues, eigVectors = np.linalg.eigh(self.__npBatch)
+        else:
+            eigValues, eigVectors = np.linalg.eig(self.__npBatch)
+
+        decomposition = None
+        if reconstruct:
+            # V * D, the eigen vectors with each column scaled by its eigen value
+            scaled = eigVectors * eigValues[:, np.newaxis, :]
+
+            if symmetric:
+                decomposition = MatrixBatch(np.matmul(scaled, np.swapaxes(eigVectors, 1, 2)), self.__valid)
+            else:
+                inverses, invertible = MatrixBatch.__inverseStack(eigVectors)
+                decomposition = MatrixBatch(np.matmul(scaled, inverses), self.__valid & invertible)
+
+        return [decomposition,
+                MatrixBatch(eigVectors, self.__valid),
+                MatrixBatch(eigValues[:, np.newaxis, :], self.__valid)]
+
+    # Getters
+
+    # returns the 3-D numpy array of the batch
+    def getBatch(self):
+        return self.__npBatch
+
+    # returns the valid mask of the batch
+    def getValid(self):
+        return self.__valid
+
+    # returns the amount of matrices in the batch
+    def getSize(self):
+        return self.__npBatch.shape[0]
+
+    # returns the rows of each matrix
+    def getRows(self):
+        return self.__npBatch.shape[1]
+
+    # returns the columns of each matrix
+    def getCols(self):
+        return self.__npBatch.shape[2]
+
+# %% [markdown]
+# # Matrix Cache Class
+
+# %%
+# Class utilized to keep recently loaded matrices in memory, so operations that use the same
+# stored matrix again do not read it from disk again.
+#
+# Entries are keyed by the name of the matrix and a stamp of its file (the size and modification time),
+# so a file changed outside of the program is never served from the cache. Once the cached matrices take
+# up more than the byte limit the least recently used ones are evicted.
+class MatrixCache:
+
+    # maxBytes - int - the most bytes of matrix values the cache will hold
+    def __init__(self, maxBytes = 512 * 1024 * 1024):
+
+        self.__maxBytes = maxBytes
+        self.__bytes = 0
+
+        # name -> (stamp, Matrix Object, bytes), ordered from least to most recently used
+        self.__entries = OrderedDict()
+
+    # Returns the cached matrix for a name if its stamp still matches the file
+    #
+    # name - str - the name of the matrix
+    # stamp - tuple - the stamp of the file the matrix would be loaded from
+    #
+    # Will return either a Matrix object or None
+    def get(self, name, stamp):
+
+        entry = self.__entries.get(name)
+        if entry is None:
+            return
+        elif entry[0] != stamp:
+            self.invalidate(name)
+            return
+
+        self.__entries.move_to_end(name)
+        return entry[1]
+
+    # Adds a loaded matrix to the cache, evicting the least recently used matrices if needed.
+    # Matrices larger than the whole cache are not kept.
+    #
+    # name - str - the name of the matrix
+    # stamp - tuple - the stamp of the file the matrix was loaded from
+    # matrix - a Matrix Object
+    def put(self, name, stamp, matrix):
+
+        self.invalidate(name)
+
+        size = matrix.getMatrix().nbytes
+        if size > self.__maxBytes:
+            return
+
+        while self.__entries and self.__bytes + size > self.__maxBytes:
+            self.__bytes -= self.__entries.popitem(last = False)[1][2]
+
+        self.__entries[name] = (stamp, matrix, size)
+        self.__bytes += size
+
+    # Removes a matrix from the cache, used when its file is saved over or deleted
+    #
+    # name - str - the name of the matrix
+    def invalidate(self, name):
+
+        entry = self.__entries.pop(name, None)
+        if entry is not None:
+            self.__bytes -= entry[2]
+
+    # Removes every matrix from the cache
+    def clear(self):
+        self.__entries.clear()
+        self.__bytes = 0
+
+    # returns the amount of bytes currently held by the cache
+    def getBytes(self):
+        return self.__bytes
+
+    # returns the names of the cached matrices, from least to most recently used
+    def getNames(self):
+        return list(self.__entries.keys())
+
+# %% [markdown]
+# # Result Cache Class
+
+# %%
+# Class utilized to keep the results of expensive operations on disk, so a inverse, eigen decomposition,
+# determinate, or solve of a matrix that has not changed is read back instead of computed again, even
+# in a later session.
+#
+# Each result is keyed by a hash of the operation, the content hashes of its matrices (Matrix.contentHash),
+# and its parameters, so a matrix with the same values always finds its results no matter its name or where
+# it came from. Results are saved in the NumPy binary formats, so dense results are memory mapped when read.
+# A SQLite index keeps the parts, size, and last use of each result, and once the results take up more than
+# the byte limit the least recently used ones are deleted.
+#
+# Operations on matrices with fewer values than minCells are not cached, as they are computed faster than
+# their matrices are hashed and their results read from disk.
+class ResultCache:
+
+    # folder - str - the folder the results are kept in, it will be created if it does not exist
+    # maxBytes - int - the most bytes of results kept in the folder
+    # minCells - int - the fewest values a matrix needs for its operations to be cached
+    def __init__(self, folder = os.path.join("matrices", "results"), maxBytes = 2 * 1024 * 1024 * 1024, minCells = 256 * 256):
+
+        self.__folder = folder
+        self.__maxBytes = maxBytes
+        self.__minCells = minCells
+
+        # operation -> [hits, misses] of the current session
+        self.__counts = {}
+
+        if not os.path.isdir(self.__folder):
+            os.makedirs(self.__folder)
+
+        # The index only describes the results in the folder, results it does not know are deleted by clear.
+        # Operations run on several threads by the MatrixServer share the index, one thread at a time.
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(os.path.join(self.__folder, "index.sqlite"), check_same_thread = False)
+        self.__connection.execute("PRAGMA journal_mode = MEMORY")
+        self.__connection.execute("PRAGMA synchronous = OFF")
+        with self.__connection:
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, operation TEXT, "
+                                      "parts TEXT, bytes INTEGER, used REAL, hits INTEGER)")
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS resultsUsed ON results (used)")
+
+    # Finds the key of a result
+    #
+    # operation - str - the name of the operation
+    # hashes - list - the content hashes of the matrices of the operation, in order
+    # parameters - tuple - the other arguments of the operation, which must be JSON serializable
+    #
+    # Returns a str of the SHA-256 hash in hexadecimal
+    @staticmethod
+    def key(operation, hashes, parameters = ()):
+        return hashlib.sha256(json.dumps([operation, list(hashes), list(parameters)]).encode()).hexdigest()
+
+    # Returns the path a part of a result is stored at
+    #
+    # key - str - the key of the result
+    # index - int - the position of the part in the result
+    # part - str - "dense", "sparse", or "scalar"
+    def __path(self, key, index, part):
+        return os.path.join(self.__folder, f"{key}.{index}" + (".npz" if part == "sparse" else ".npy"))
+
+    # Function needed for get and put, counts a hit or miss of a operation
+    def __count(self, operation, hit):
+        self.__counts.setdefault(operation, [0, 0])[0 if hit else 1] += 1
+
+    # Reads a result from the cache
+    #
+    # key - str - the key of the result, from ResultCache.key
+    # operation - str - the name of the operation, only used for the report
+    #
+    # Returns a tuple of wether the result was found and the result, which is either a Matrix object, a list of
+    # Matrix objects and None, or a scalar
+    def get(self, key, operation):
+        with self.__lock:
+            row = self.__connection.execute("SELECT parts FROM results WHERE key = ?", (key,)).fetchone()
+            result = None
+
+            if row is not None:
+                parts = row[0].split(",")
+                try:
+                    values = []
+                    for index, part in enumerate(parts):
+                        if part == "none":
+                            values.append(None)
+                        elif part == "scalar":
+                            values.append(np.load(self.__path(key, index, part), allow_pickle = False)[()])
+                        else:
+                            matrix = Matrix.createLoad(self.__path(key, index, part))
+                            if matrix is None:
+                                raise OSError
+                            values.append(matrix)
+                    result = values if len(values) > 1 else values[0]
+                except (OSError, ValueError):
+                    # A part was deleted or cut short outside of the program
+                    self.__remove([key])
+                    row = None
+
+            if row is None:
+                self.__count(operation, False)
+                return False, None
+
+            with self.__connection:
+                self.__connection.execute("UPDATE results SET used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            self.__count(operation, True)
+            return True, result
+
+    # Writes a result to the cache, deleting the least recently used results if needed.
+    # Results larger than the whole cache are not kept.
+    #
+    # key - str - the key of the result, from ResultCache.key
+    # operation - str - the name of the operation
+    # result - a Matrix object, a list of Matrix objects and None, or a scalar
+    #
+    # Will return either True or None
+    def put(self, key, operation, result):
+        values = result if isinstance(result, list) else [result]
+        parts = ["none" if value is None else "scalar" if not isinstance(value, Matrix)
+                 else "sparse" if value.isSparse() else "dense" for value in values]
+
+        size = sum(value.getMatrix().nbytes if isinstance(value, Matrix) else 0 for value in values if value is not None)
+        if size > self.__maxBytes:
+            return
+
+        # Each part is written under a temporary name of its thread and then moved into place, so threads that
+        # compute the same result at the same time do not write into the same file
+        paths = []
+        temporary = f".{threading.get_ident()}.tmp"
+        try:
+            for index, (part, value) in enumerate(zip(parts, values)):
+                if part == "none":
+                    continue
+                path = self.__path(key, index, part)
+                paths.append(path)
+                with open(path + temporary, "wb") as file:
+                    if part == "sparse":
+                        sparse = value.getMatrix()
+                        np.savez(file, data = sparse.data, indices = sparse.indices, indptr = sparse.indptr, shape = np.array(sparse.shape))
+                    else:
+                        np.save(file, value.getMatrix() if part == "dense" else np.asarray(value), allow_pickle = False)
+                os.replace(path + temporary, path)
+        except OSError:
+            for path in paths:
+                for leftover in (path, path + temporary):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+            return
+
+        size = sum(os.path.getsize(path) for path in paths)
+        with self.__lock:
+            with self.__connection:
+                self.__connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, 0)",
+                                          (key, operation, ",".join(parts), size, time.time()))
+            self.__evict()
+        return True
+
+    # Function needed for put, deletes the least recently used results until the rest fit in the byte limit
+    def __evict(self):
+        total = self.getBytes()
+        if total <= self.__maxBytes:
+            return
+
+        evicted = []
+        for key, size in self.__connection.execute("SELECT key, bytes FROM results ORDER BY used"):
+            if total <= self.__maxBytes:
+                break
+            evicted.append(key)
+            total -= size
+        self.__remove(evicted)
+
+    # Function needed for evicting and clearing, deletes the files and index entries of results.
+    # A file that cannot be deleted yet, such as one memory mapped on Windows, is deleted by clear.
+    #
+    # keys - list - the keys of the results
+    def __remove(self, keys):
+        for key in keys:
+            row = self.__connection.execute("SELECT parts FROM results WHERE key = ?", (key,)).fetchone()
+            for index, part in enumerate(row[0].split(",") if row is not None else []):
+                try:
+                    if part != "none" and os.path.isfile(self.__path(key, index, part)):
+                        os.remove(self.__path(key, index, part))
+                except OSError:
+                    pass
+
+        with self.__connection:
+            self.__connection.executemany("DELETE FROM results WHERE key = ?", [(key,) for key in keys])
+
+    # Deletes every result, along with any file in the folder that is not a part of a result
+    def clear(self):
+        with self.__lock:
+            self.__remove([row[0] for row in self.__connection.execute("SELECT key FROM results")])
+            for entry in os.scandir(self.__folder):
+                if entry.is_file() and entry.name.endswith((".npy", ".npz", ".tmp")):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+            self.__counts = {}
+
+    # Returns a dict of the hits and misses of each operation in this session, and the amount and bytes of the
+    # results in the cache
+    def report(self):
+        with self.__lock:
+            entries, size = self.__connection.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM results").fetchone()
+            return {"operations": {operation: {"hits": counts[0], "misses": counts[1]} for operation, counts in self.__counts.items()},
+                    "entries": entries,
+                    "bytes": size,
+                    "maxBytes": self.__maxBytes}
+
+    # Prints the report of the cache
+    def printReport(self):
+        report = self.report()
+        print(f"Result cache: {report['entries']} results, {report['bytes'] / 1024 / 1024:.1f} of "
+              f"{report['maxBytes'] / 1024 / 1024:.0f} MB")
+        for operation, counts in sorted(report["operations"].items()):
+            total = counts["hits"] + counts["misses"]
+            print(f"  {operation:<16}{counts['hits']:>6} hits{counts['misses']:>6} misses ({counts['hits'] / total:.0%} hit rate)")
+
+    # returns the amount of bytes of the results in the cache
+    def getBytes(self):
+        with self.__lock:
+            return self.__connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM results").fetchone()[0]
+
+    # returns the fewest values a matrix needs for its operations to be cached
+    def getMinCells(self):
+        return self.__minCells
+
+    # Closes the index
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+
+# %% [markdown]
+# # Matrix Catalog Class
+
+# %%
+# Class utilized to keep a index of the matrices in the matrices folder in a SQLite database, so matrices can be
+# listed and searched by name, shape, and size without opening their files.
+#
+# Each entry holds the file extension, shape, dtype, bytes of the file, nonzero values of a sparse matrix,
+# checksum of the contents (Matrix.contentHash), whether the file is a link to the blob of that checksum,
+# structure flags, when the matrix was first saved and last saved, and the modification time of the file, used
+# to find files changed outside of the program.
+#
+# The catalog only describes the folder, it can always be rebuilt from the files, so the database keeps its
+# journal in memory instead of in a file next to it.
+class MatrixCatalog:
+
+    __COLUMNS = ("name", "extension", "rows", "cols", "dtype", "bytes", "nnz", "checksum", "blob",
+                 "symmetric", "upper", "lower", "created", "modified", "mtime")
+
+    # path - str - the path of the SQLite database, it will be created if it does not exist
+    def __init__(self, path):
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute("PRAGMA journal_mode = MEMORY")
+        self.__connection.execute("PRAGMA synchronous = OFF")
+
+        # A catalog made by a older version with other columns is started over, it is rebuilt from the files
+        columns = tuple(row[1] for row in self.__connection.execute("PRAGMA table_info(matrices)"))
+        with self.__connection:
+            if columns and columns != MatrixCatalog.__COLUMNS:
+                self.__connection.execute("DROP TABLE matrices")
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS matrices (name TEXT PRIMARY KEY, extension TEXT, "
+                                      "rows INTEGER, cols INTEGER, dtype TEXT, bytes INTEGER, nnz INTEGER, checksum TEXT, "
+                                      "blob INTEGER, symmetric INTEGER, upper INTEGER, lower INTEGER, created REAL, "
+                                      "modified REAL, mtime INTEGER)")
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS matricesShape ON matrices (rows, cols)")
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS matricesBytes ON matrices (bytes)")
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS matricesChecksum ON matrices (checksum)")
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value)")
+
+    # Adds or replaces the entry of a matrix, keeping when it was first saved
+    #
+    # entry - dict - the columns of the entry, every column but created
+    def put(self, entry):
+        created = self.__connection.execute("SELECT created FROM matrices WHERE name = ?", (entry["name"],)).fetchone()
+        entry = dict(entry, created = created[0] if created is not None else entry["modified"])
+
+        with self.__connection:
+            self.__connection.execute(f"INSERT OR REPLACE INTO matrices VALUES ({', '.join('?' * len(MatrixCatalog.__COLUMNS))})",
+                                      [entry[column] for column in MatrixCatalog.__COLUMNS])
+
+    # Removes the entry of a matrix
+    #
+    # name - str - the name of the matrix
+    def remove(self, name):
+        with self.__connection:
+            self.__connection.execute("DELETE FROM matrices WHERE name = ?", (name,))
+
+    # Removes every entry
+    def clear(self):
+        with self.__connection:
+            self.__connection.execute("DELETE FROM matrices")
+
+    # Will return either a dict of the entry of a matrix or None
+    #
+    # name - str - the name of the matrix
+    def get(self, name):
+        row = self.__connection.execute("SELECT * FROM matrices WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            return dict(zip(MatrixCatalog.__COLUMNS, row))
+
+    # Returns the amount of matrices linked to the blob of a checksum
+    #
+    # checksum - str - the checksum of the contents of a matrix
+    def references(self, checksum):
+        return self.__connection.execute("SELECT COUNT(*) FROM matrices WHERE checksum = ? AND blob = 1", (checksum,)).fetchone()[0]
+
+    # Returns a sorted list with the names of every matrix
+    def names(self):
+        return [row[0] for row in self.__connection.execute("SELECT name FROM matrices ORDER BY name")]
+
+    # Returns a dict of the names of every matrix to their (extension, modification time, bytes), used to find
+    # the files that changed
+    def stamps(self):
+        return {row[0]: tuple(row[1:]) for row in self.__connection.execute("SELECT name, extension, mtime, bytes FROM matrices")}
+
+    # Finds the matrices that match every condition given, using the indexes of the catalog
+    #
+    # prefix - str - the start of the names
+    # rows - int - the amount of rows
+    # cols - int - the amount of columns
+    # minBytes - int - the fewest bytes of the files
+    # maxBytes - int - the most bytes of the files
+    # columns - tuple - the columns of the entries to return, every column if not provided. Reading the
+    #           checksums and flags of every entry takes most of the time of listing large catalogs.
+    #
+    # Returns a list of the dicts of the entries, sorted by name
+    def find(self, prefix = None, rows = None, cols = None, minBytes = None, maxBytes = None, columns = None):
+        columns = columns if columns is not None else MatrixCatalog.__COLUMNS
+        if any(column not in MatrixCatalog.__COLUMNS for column in columns):
+            print("The columns of the catalog are " + ", ".join(MatrixCatalog.__COLUMNS) + ".")
+            return []
+
+        conditions, values = [], []
+
+        # A range of names instead of LIKE, which ignores case and cannot use the index
+        if prefix:
+            conditions.append("name >= ? AND name < ?")
+            values += [prefix, prefix + chr(0x10FFFF)]
+        for condition, value in (("rows = ?", rows), ("cols = ?", cols), ("bytes >= ?", minBytes), ("bytes <= ?", maxBytes)):
+            if value is not None:
+                conditions.append(condition)
+                values.append(value)
+
+        query = (f"SELECT {', '.join(columns)} FROM matrices" + (" WHERE " + " AND ".join(conditions) if conditions else "")
+                 + " ORDER BY name")
+        return [dict(zip(columns, row)) for row in self.__connection.execute(query, values)]
+
+    # Will return the value of a setting or None
+    #
+    # key - str - the name of the setting
+    def getSetting(self, key):
+        row = self.__connection.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            return row[0]
+
+    # Sets the value of a setting
+    #
+    # key - str - the name of the setting
+    # value - the value of the setting
+    def setSetting(self, key, value):
+        with self.__connection:
+            self.__connection.execute("INSERT OR REPLACE INTO settings VALUES (?, ?)", (key, value))
+
+    # Closes the database
+    def close(self):
+        self.__connection.close()
+
+# %% [markdown]
+# # Matrix Store Class
+
+# %%
+# Class utilized to save, load, list, and delete the matrices kept in the matrices folder.
+#
+# Matrices are saved in the NumPy binary format (.npy), a small header with the shape and dtype
+# followed by the raw values, so loading one memory maps the file instead of parsing text.
+# Sparse matrices are saved as their CSR arrays in a NumPy archive (.npz).
+# CSV files are only used by explicit imports and exports, though CSV files left in the folder
+# by older versions of the program can still be loaded.
+#
+# Loaded matrices are kept in a MatrixCache, so loading the same unchanged matrix again costs no I/O.
+#
+# The matrices are listed and searched through a MatrixCatalog kept in the folder, which is updated by every save
+# and delete. Files added or removed outside of the program are found when the modification time of the folder
+# changes, while files changed in place outside of the program are only found by rebuildCatalog.
+#
+# The values of a saved matrix are stored once in the blobs folder, named by the hash of their dtype, shape, and
+# bytes, and the file of each name is a hard link to its blob. Saving a matrix that is already stored only costs
+# the hash and a new link, and a blob is deleted once no name references it. Files are always replaced and never
+# written in place, so the names sharing a blob never change each other. On file systems without hard links the
+# blob is copied instead.
+class MatrixStore:
+
+    # The file extensions of matrices, in the order they are preferred when a name has more than one
+    __EXTENSIONS = (".npy", ".npz", ".csv")
+
+    # The version of the catalog entries, a catalog from a different version is rebuilt
+    __CATALOG_VERSION = 2
+
+    # folder - str - the folder the matrices are kept in, it will be created if it does not exist
+    # cacheBytes - int - the most bytes of loaded matrices to keep cached in memory
+    def __init__(self, folder = "matrices", cacheBytes = 512 * 1024 * 1024):
+
+        self.__folder = folder
+        self.__cache = MatrixCache(cacheBytes)
+
+        if not os.path.isdir(self.__folder):
+            os.mkdir(self.__folder)
+
+        self.__blobFolder = os.path.join(self.__folder, "blobs")
+        if not os.path.isdir(self.__blobFolder):
+            os.mkdir(self.__blobFolder)
+
+        self.__catalog = MatrixCatalog(os.path.join(self.__folder, "catalog.sqlite"))
+        if self.__catalog.getSetting("version") != MatrixStore.__CATALOG_VERSION:
+            self.rebuildCatalog()
+            self.__catalog.setSetting("version", MatrixStore.__CATALOG_VERSION)
+
+    # Returns the path a matrix is stored at
+    #
+    # name - str - the name of the matrix without the file extension
+    # extension - str - the file extension, including the period
+    def __path(self, name, extension):
+        return os.path.join(self.__folder, name + extension)
+
+    # Loads a matrix from the folder, preferring the binary files over a legacy CSV file.
+    # Matrices already in the cache are returned without reading the file again.
+    #
+    # name - str - the name of the matrix without the file extension
+    #
+    # Will return either a Matrix object or None
+    def loadMatrix(self, name):
+
+        for extension in MatrixStore.__EXTENSIONS:
+            path = self.__path(name, extension)
+            try:
+                fileStat = os.stat(path)
+            except OSError:
+                continue
+
+            stamp = (extension, fileStat.st_mtime_ns, fileStat.st_size)
+            matrix = self.__cache.get(name, stamp)
+
+            if matrix is None:
+                if extension != ".csv":
+                    matrix = Matrix.createLoad(path)
+                else:
+                    matrix = Matrix.createImport(path)
+
+                if matrix is not None:
+                    self.__cache.put(name, stamp, matrix)
+
+            return matrix
+
+    # returns the cache of loaded matrices
+    def getCache(self):
+        return self.__cache
+
+    # returns the catalog of the matrices in the folder
+    def getCatalog(self):
+        return self.__catalog
+
+    # Saves a matrix to the folder in its binary format, replacing any matrix saved with the same name
+    #
+    # The blob is only written if no matrix with the same contents is stored yet. The blob and the link of the
+    # name are made under temporary names and then moved into place, so matrices that are currently memory
+    # mapped from the old file keep working.
+    #
+    # name - str - the name to save the matrix as without the file extension
+    # matrix - a Matrix Object
+    #
+    # Will return either True or None
+    def saveMatrix(self, name, matrix):
+
+        if matrix is None or matrix.getMatrix() is None:
+            return
+
+        self.__cache.invalidate(name)
+        self.__syncCatalog()
+
+        extension = ".npz" if matrix.isSparse() else ".npy"
+        checksum = matrix.contentHash()
+        blobPath = os.path.join(self.__blobFolder, checksum + extension)
+        path = self.__path(name, extension)
+        tempPaths = [blobPath + ".tmp", path + ".tmp"]
+
         try:
-            return cls(np.array(listMatrix))
+            if not os.path.isfile(blobPath):
+                with open(tempPaths[0], "wb") as file:
+                    if matrix.isSparse():
+                        sparse = matrix.getMatrix()
+                        np.savez(file, data = sparse.data, indices = sparse.indices, indptr = sparse.indptr, shape = np.array(sparse.shape))
+                    else:
+                        np.save(file, matrix.getMatrix(), allow_pickle = False)
+                os.replace(tempPaths[0], blobPath)
+
+            try:
+                os.link(blobPath, tempPaths[1])
+            except OSError:
+                shutil.copyfile(blobPath, tempPaths[1])
+            os.replace(tempPaths[1], path)
         except:
-            pass
-        
-    # Adds two matrices together
-    #
-    # Will return either a Matrix object or None
-    def add(self, matrixB):
-        if self.__npMatrix.shape != matrixB.getMatrix().shape:
-            print("To add Matrices they must have the same amount of rows and columns.")
-        else:
-            return Matrix(npMatrix = np.add(self.__npMatrix,matrixB.getMatrix()))
+            for tempPath in tempPaths:
+                if os.path.exists(tempPath):
+                    os.remove(tempPath)
+            return
 
-    # Subtracts two matrices
-    #
-    # Will return either a Matrix object or None
-    def subtract(self, matrixB):
-        if self.__npMatrix.shape != matrixB.getMatrix().shape:
-            print("To subtract Matrices they must have the same amount of rows and columns.")
-        else:
-            return Matrix(npMatrix = np.subtract(self.__npMatrix,matrixB.getMatrix()))
+        previous = self.__catalog.get(name)
 
-    # Multiplies two matrices together
-    #
-    # Will return either a Matrix object or None
-    def multiply(self, matrixB):
-        if self.__cols != matrixB.getRows():
-            print("To multiply Matrices the amount of columns of the first Martix must match the amount of rows of the second.")
-        else:
-            return Matrix(npMatrix = np.multiply(self.__npMatrix,matrixB.getMatrix()))
+        # Files in the other formats with the same name would now be out of date
+        for otherExtension in MatrixStore.__EXTENSIONS:
+            otherPath = self.__path(name, otherExtension)
+            if otherExtension != extension and os.path.isfile(otherPath):
+                os.remove(otherPath)
 
-    # Transposes the current matrix
-    #
-    # Will return either a Matrix object or None
-    def transpose(self):
-        if self.__npMatrix is None:
-            pass
-        else:
-            return Matrix(npMatrix =  np.transpose(self.__npMatrix))
+        self.__catalog.put(self.__describe(name, extension, matrix, checksum, saved = True))
+        self.__catalogSynced()
+        if previous is not None:
+            self.__releaseBlob(previous)
+        return True
 
-    # Finds the determinate of the current matrix
+    # Deletes a matrix from the folder, in all of the formats it is saved in
     #
-    # Will return either float64, complex 128, or None
-    def determinate(self):
-        if self.__rows != self.__cols:
-            print("A matrix must be square (same number of rows and columns) to have a determinant.")
-        else:
-            return np.linalg.det(self.__npMatrix)
-
-    # Finds the inverse of the current Matrix
+    # name - str - the name of the matrix without the file extension
     #
-    # Will return either a Matrix object or None
-    def inverse(self):
-        if self.__cols != self.__rows:
-            print("A matrix must be square (same number of rows and columns) to have a inverse.")
-        elif self.determinate() == 0:
-            print("A matrix must not have a determinate of 0 to have a inverse.")
-        else:
-            return Matrix(npMatrix = np.linalg.inv(self.__npMatrix))
-        
-    # Finds the identity matrix of the current Matrix
+    # Will return either True or None
+    def deleteMatrix(self, name):
+
+        self.__cache.invalidate(name)
+        self.__syncCatalog()
+
+        deleted = None
+        for extension in MatrixStore.__EXTENSIONS:
+            path = self.__path(name, extension)
+            if os.path.isfile(path):
+                os.remove(path)
+                deleted = True
+
+        previous = self.__catalog.get(name)
+        self.__catalog.remove(name)
+        self.__catalogSynced()
+        if previous is not None:
+            self.__releaseBlob(previous)
+        return deleted
+
+    # Function needed for saving and deleting, deletes the blob a name referenced once no name references it.
+    # A blob that cannot be deleted yet, such as one memory mapped on Windows, is deleted by rebuildCatalog.
     #
-    # Will return either a Matrix object or None
-    def identity(self):
-        if self.__cols != self.__rows:
-            print("A matrix must be square (same number of rows and columns) to have a identity matrix.")
-        elif self.__rows is None:
-            pass
-        elif self.__rows < 1:
-            print("Somehow you made a Matrix with less than one row.")
-        else:
-            return Matrix(npMatrix = np.identity(self.__rows))
+    # entry - dict - the catalog entry the name had
+    def __releaseBlob(self, entry):
+        if entry["checksum"] is None or self.__catalog.references(entry["checksum"]) > 0:
+            return
 
-    # Finds the zero matrix of the current matrix
-    #
-    # Will return either a Matrix object or None
-    def zero(self):
-        if type(self.__rows) is not int or type(self.__cols) is not int:
-            print("Their is a problem, the Matrix's shape is not made of ints.")
-        elif self.__rows < 1:
-            print("Somehow you made a Matrix with less than one row.")
-        else:
-            return Matrix(npMatrix = np.zeros(self.__npMatrix.shape))
+        blobPath = os.path.join(self.__blobFolder, entry["checksum"] + entry["extension"])
+        try:
+            if os.path.isfile(blobPath):
+                os.remove(blobPath)
+        except OSError:
+            pass
 
-    # Function needed for Eigen Decomposition
-    # values - expects the eigenvalues from a np.linalg.eig or np.linalg.eigh call
-    # Returns a Matrix
-    def __diagonal(self, values):
-        return Matrix(npMatrix = np.diag(values))
+    # Returns a sorted list with the names of the matrices in the folder
+    def listMatrices(self):
+        self.__syncCatalog()
+        return self.__catalog.names()
 
-    # Finds the eigen values, vectors, and decomposition of the current matrix.
+    # Finds the matrices in the folder that match every condition given, without opening their files
     #
-    # Will return either a list with a Matrix object for each of the eigen value,
-    # vector, and decomposition or will return None
-    def eigenDecomp(self):
-
-        if self.__cols != self.__rows:
-            print("A matrix must be square (same number of rows and columns) to perform eigen decomposition.\n")
-        else:
-            eigValues = None
-            eigVectors = None
-
-            #check for symmetric array
-            if ((self.__npMatrix==self.transpose().getMatrix()).all()):
-                eigValues, eigVectors = np.linalg.eigh(self.__npMatrix)
-                eigVectors = Matrix(eigVectors)
-                return [Matrix(npMatrix = np.dot(eigVectors.getMatrix(), 
-                                                np.dot(self.__diagonal(eigValues).getMatrix(), eigVectors.transpose().getMatrix()))),
-                        eigVectors,
-                        eigValues]
-            else:
-                eigValues, eigVectors = np.linalg.eig(self.__npMatrix)
-                eigVectors = Matrix(eigVectors)
-                
-                # Required for testing, transforms the np [] array to a np [[]] array
-                eigHold = []
-                eigHold.append(eigValues.tolist())
-                eigValuesMatrix = Matrix.createManual(eigHold)
+    # prefix - str - the start of the names
+    # rows - int - the amount of rows
+    # cols - int - the amount of columns
+    # minBytes - int - the fewest bytes of the files
+    # maxBytes - int - the most bytes of the files
+    # columns - tuple - the columns of the entries to return, every column if not provided
+    #
+    # Returns a list of the catalog entries, dicts with the name, extension, rows, cols, dtype, bytes, nnz,
+    # checksum, blob, symmetric, upper, lower, created, modified, and mtime of each matrix, sorted by name
+    def findMatrices(self, prefix = None, rows = None, cols = None, minBytes = None, maxBytes = None, columns = None):
+        self.__syncCatalog()
+        return self.__catalog.find(prefix, rows, cols, minBytes, maxBytes, columns)
 
-                return [Matrix(npMatrix = np.dot(eigVectors.getMatrix(), 
-                                                np.dot(self.__diagonal(eigValues).getMatrix(), eigVectors.inverse().getMatrix()))),
-                        eigVectors,
-                        eigValuesMatrix]
+    # Will return either the catalog entry of a matrix or None
+    #
+    # name - str - the name of the matrix without the file extension
+    def getInfo(self, name):
+        self.__syncCatalog()
+        return self.__catalog.get(name)
+
+    # Rebuilds the catalog from the files in the folder, which also finds files changed in place outside of the program,
+    # and deletes the blobs no name references
+    def rebuildCatalog(self):
+        self.__catalog.clear()
+        self.__catalog.setSetting("folderTime", None)
+        self.__syncCatalog()
+
+        for fileName in os.listdir(self.__blobFolder):
+            checksum, extension = os.path.splitext(fileName)
+            if extension == ".tmp" or self.__catalog.references(checksum) == 0:
+                self.__releaseBlob({"checksum": checksum, "extension": extension})
+
+    # Function needed for the catalog, adds the files that are new or changed since the folder was last seen
+    # and removes the files that are gone. When the folder has not changed this only costs a single stat.
+    def __syncCatalog(self):
+        if self.__catalog.getSetting("folderTime") == os.stat(self.__folder).st_mtime_ns:
+            return
 
-    # Getters
+        # name -> (extension, modification time, bytes) of the preferred file of each name
+        files = {}
+        for entry in os.scandir(self.__folder):
+            name, extension = os.path.splitext(entry.name)
+            if extension not in MatrixStore.__EXTENSIONS or not entry.is_file():
+                continue
+
+            if name not in files or MatrixStore.__EXTENSIONS.index(extension) < MatrixStore.__EXTENSIONS.index(files[name][0]):
+                fileStat = entry.stat()
+                files[name] = (extension, fileStat.st_mtime_ns, fileStat.st_size)
+
+        # The blobs of names deleted or replaced outside of the program are released too
+        stamps = self.__catalog.stamps()
+        previous = []
+        for name in stamps.keys() - files.keys():
+            previous.append(self.__catalog.get(name))
+            self.__catalog.remove(name)
+        for name, stamp in files.items():
+            if stamps.get(name) != stamp:
+                if name in stamps:
+                    previous.append(self.__catalog.get(name))
+                self.__catalog.put(self.__describe(name, stamp[0]))
+
+        self.__catalogSynced()
+        for entry in previous:
+            self.__releaseBlob(entry)
+
+    # Function needed for the catalog, records the folder as seen after the program changed it
+    def __catalogSynced(self):
+        self.__catalog.setSetting("folderTime", os.stat(self.__folder).st_mtime_ns)
+
+    # Function needed for the catalog, describes the file of a matrix.
+    # Files that cannot be loaded are still listed, without a shape.
+    #
+    # name - str - the name of the matrix without the file extension
+    # extension - str - the file extension of the matrix
+    # matrix - the Matrix Object in the file, loaded from the file if not provided
+    # checksum - str - the contentHash of the matrix, found from the matrix if not provided
+    # saved - bool - whether the file was just saved from its blob
+    #
+    # Returns a dict of the entry of the matrix
+    def __describe(self, name, extension, matrix = None, checksum = None, saved = False):
+        path = self.__path(name, extension)
+        fileStat = os.stat(path)
 
-    # returns the numpy matrix
-    def getMatrix(self):
-        return self.__npMatrix
-    
-    # returns the rows of the matrix
-    def getRows(self):
-        return self.__rows
-    
-    # returns the columns of the matrix
-    def getCols(self):
-        return self.__cols
-    
-    # creates a pop-up image of the heatmap of the current matrix
-    def showVisualization(self):
-        sns.heatmap(self.__npMatrix, annot = True, cmap ='plasma', 
-            linecolor ='black', linewidths = 1)
-        plt.show()
+        # Empty CSV files are only listed, so the warning np.loadtxt gives for them is not shown
+        if matrix is None:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                matrix = Matrix.createLoad(path) if extension != ".csv" else Matrix.createImport(path)
 
-    # prints the current matrix to the terminal
-    def printMatrix(self):
-        if self.__npMatrix is None:
-            print('None')
-        else:
-            print(str(self.__npMatrix))
+        entry = {"name": name, "extension": extension, "rows": None, "cols": None, "dtype": None,
+                 "bytes": fileStat.st_size, "nnz": None, "checksum": None, "blob": 0,
+                 "symmetric": None, "upper": None, "lower": None, "modified": fileStat.st_mtime, "mtime": fileStat.st_mtime_ns}
 
+        if matrix is not None and matrix.getMatrix() is not None:
+            entry.update(rows = matrix.getRows(), cols = matrix.getCols(), dtype = str(matrix.getMatrix().dtype),
+                         checksum = checksum if checksum is not None else matrix.contentHash(),
+                         nnz = matrix.getMatrix().getNnz() if matrix.isSparse() else None,
+                         symmetric = matrix.isSymmetric(), upper = matrix.isUpperTriangular(), lower = matrix.isLowerTriangular())
 
+            # Files saved by the store are links to their blob, or copies of it on file systems without links
+            blobPath = os.path.join(self.__blobFolder, entry["checksum"] + extension)
+            entry["blob"] = int(os.path.isfile(blobPath) and (saved or os.path.samefile(path, blobPath)))
+        return entry
 
 # %% [markdown]
 # # State Machine Class
@@ -256,22 +3350,19 @@ class Matrix:
 # which should be instantiated at the start of the program.
 #
 # Works by moving the user through different states based on user inputs, 
-# with the only memory preserved being the CSV files stored in the matrices folder.
+# with the only memory preserved being the matrices stored in the matrices folder.
 #
 # Will infintely run until the user exits through the home screen.
 class StateMachine:
     
     def __init__(self):
 
-        # Checks to see if a folder exists to store matrices that can be used by the program
-        # if it does not, it creates it instead
+        # Opens the folder that stores matrices that can be used by the program,
+        # if it does not exist the store creates it instead
         folder1 = "matrices"
         os.chdir(".")
 
-        if os.path.isdir(folder1):
-            pass
-        else:
-            os.mkdir(folder1)
+        self.__store = MatrixStore(folder1)
 
         # sets the current state to the Home Screen
         self.__CurrentState = 1  
@@ -297,11 +3388,12 @@ class StateMachine:
               "2.) List current Matrices available\n"
               "3.) Perform a Matrix Operation\n"
               "4.) Delete a Matrix\n"
-              "5.) Exit"
+              "5.) Performance Report\n"
+              "6.) Exit"
         )
 
         # input options and validation call
-        options = [ 1, 2, 3, 4, 5]
+        options = [ 1, 2, 3, 4, 5, 6]
         userInput = None
         userInput = self.__inputValidation(options, userInput)
         
@@ -310,7 +3402,8 @@ class StateMachine:
                       2: 6,
                       3: 8,
                       4: 7,
-                      5: 0 }
+                      5: 10,
+                      6: 0 }
 
         return stateDict[userInput]
     
@@ -324,10 +3417,11 @@ class StateMachine:
               "1.) Create a random matrix\n"
               "2.) Import a matrix\n"
               "3.) Manually create a matrix\n"
-              "4.) Return to home"
+              "4.) Import a sparse matrix\n"
+              "5.) Return to home"
         )
 
-        options = [ 1, 2, 3, 4]
+        options = [ 1, 2, 3, 4, 5]
         userInput = None
         userInput = self.__inputValidation(options, userInput)
 
@@ -335,7 +3429,8 @@ class StateMachine:
         stateDict = { 1: 3, 
                       2: 4,
                       3: 5,
-                      4: 1}
+                      4: 9,
+                      5: 1}
 
         return stateDict[userInput]
 
@@ -419,8 +3514,23 @@ class StateMachine:
                     case 2:
                         wholeNums = False
 
+                print("How precise should the values of the Matrix be?:\n"
+                      "1.) 64 bit\n"
+                      "2.) 32 bit, half the memory, decimals keep about 7 digits"
+                )
+
+                # Precision input validation
+                options3 = [ 1, 2 ]
+                userInput3 = None
+                userInput3 = self.__inputValidation(options3, userInput3)
+
+                dtypes = { (True, 1): np.int64,
+                           (True, 2): np.int32,
+                           (False, 1): np.float64,
+                           (False, 2): np.float32 }
+
                 # matrix is created
-                randomMatrix = Matrix.createRandom(rows, cols, wholeNums)
+                randomMatrix = Matrix.createRandom(rows, cols, wholeNums, dtype = dtypes[(wholeNums, userInput3)])
                 self.__postCreate(randomMatrix)
         
         # local state dictionary to transform user input into the class wide defined states
@@ -501,6 +3611,35 @@ class StateMachine:
                       2: 1 }
 
         return stateDict[userInput]
+
+    # State 9 - Imports a Sparse Matrix, allows the user to import a matrix saved as "row,column,value" triplets,
+    # only the nonzero values are kept in memory so very large matrices with few values can be used
+    #
+    # Will return the state to move to.
+    def __createImportSparse(self):
+
+        print("Please input the path to the file you wish to import.\n"
+              "Each line of the CSV file must be a row, column, and value of the matrix.")
+
+        importMatrix = Matrix.createImportSparse(input())
+        while importMatrix is None:
+            print("Either the path you provided was incorrect, or the file is not made of\n"
+                  " row, column, and value lines with non negative whole number rows and columns")
+            print("Would you like to try again?\n"
+                  "1.) Yes\n"
+                  "2.) No")
+
+            options = [ 1, 2 ]
+            userInput = None
+            userInput = self.__inputValidation(options, userInput)
+
+            if userInput == 2:
+                return 1
+
+            importMatrix = Matrix.createImportSparse(input())
+
+        self.__postCreate(importMatrix)
+        return 1
     
     # State 5 - Create a Matrix Manually, allows the user to create a matrix by terminal inputs.
     # User must finish the inputs before being let back into the rest of the program.
@@ -586,20 +3725,20 @@ class StateMachine:
     # State 6 - List of saved matrices, lists in the terminal the matrices available to perform operations on
     # 
     # Will return the state to move to.
+    @Instrumentation.timed("StateMachine.listSaved")
     def __listSaved(self):
 
         print("The current Matrices available are:")
 
+        # The shapes come from the catalog of the matrices folder, so no matrix is opened
         counter = 0
-        for file_name in os.listdir("matrices/"):
-        # Check if the file has a .csv extension
-            if file_name.endswith(".csv"):
-                # Remove the .csv extension and print the name
-                print(file_name[:-4], end="\t")
-                counter += 1
-
-                if counter % 5 == 0:
-                    print()
+        for entry in self.__store.findMatrices(columns = ("name", "rows", "cols")):
+            shape = f"{entry['rows']}x{entry['cols']}" if entry["rows"] is not None else "unreadable"
+            print(f"{entry['name']} ({shape})", end="\t")
+            counter += 1
+
+            if counter % 5 == 0:
+                print()
         print()
 
         # local state dictionary to transform user input into the class wide defined states
@@ -607,7 +3746,7 @@ class StateMachine:
 
         return stateDict[1]
     
-    # State 7 - Delete Screen, lets users delete the csv files saved in the matrices folder
+    # State 7 - Delete Screen, lets users delete the matrices saved in the matrices folder
     # 
     # Will return the state to move to.
     def __deleteScreen(self):
@@ -644,7 +3783,7 @@ class StateMachine:
         matrixA = None
         
         print("Matrix Operations:")
-        #This loop continues the state untill they choose option 12 (Exit)
+        #This loop continues the state untill they choose option 13 (Exit)
         while(True):
             
             # matrixB is a tuple with 2 values inside
@@ -653,7 +3792,7 @@ class StateMachine:
             matrixB = None
             
             # Details the current Matrix operations will be performed on, this does not change the
-            # state of the csv file the matrix is saved in
+            # state of the file the matrix is saved in
             matrixStr = "Current Matrix: "
 
             if matrixA is None:
@@ -675,11 +3814,12 @@ class StateMachine:
               "9.) Eigen Decomposition\n"
               "10.) Print to console\n"
               "11.) Show Heatmap\n"
-              "12.) Return to Home\n"
+              "12.) Export to CSV\n"
+              "13.) Return to Home\n"
             )
 
             # input validation
-            options = [ 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
+            options = [ 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]
             userInput = None
             userInput = self.__inputValidation(options, userInput)
 
@@ -861,8 +4001,9 @@ class StateMachine:
                             print(eigList[2].printMatrix())
                             print("The eigen vectors are:")
                             eigList[1].printMatrix()
-                            print("The eigen decomposition is:")
-                            eigList[0].printMatrix()
+                            if eigList[0] is not None:
+                                print("The eigen decomposition is:")
+                                eigList[0].printMatrix()
 
                             # Options to let users save the matrices from eigen decomposition
                             print("Would you like to save the eigen values?\n"
@@ -895,20 +4036,21 @@ class StateMachine:
                                 self.__saveMatrix(name, eigList[1])
                                 print("Your matrix has been saved!")
 
-                            print("Would you like to save the eigen decomposition?\n"
-                                  "1.) Yes\n"
-                                  "2.) No"
-                                  )
+                            if eigList[0] is not None:
+                                print("Would you like to save the eigen decomposition?\n"
+                                      "1.) Yes\n"
+                                      "2.) No"
+                                      )
 
-                            options = [ 1, 2 ]
-                            userInput = None
-                            userInput = self.__inputValidation(options, userInput)
+                                options = [ 1, 2 ]
+                                userInput = None
+                                userInput = self.__inputValidation(options, userInput)
 
-                            if userInput == 1:
-                                print("Please enter the name of the matrix:")
-                                name = input()
-                                self.__saveMatrix(name, eigList[0])
-                                print("Your matrix has been saved!")
+                                if userInput == 1:
+                                    print("Please enter the name of the matrix:")
+                                    name = input()
+                                    self.__saveMatrix(name, eigList[0])
+                                    print("Your matrix has been saved!")
 
                 # Print matrix to terminal
                 case 10:
@@ -925,8 +4067,19 @@ class StateMachine:
                         continue
                     else:
                         self.__viewImage(matrixA[1])
-                # Exit - Ends the loop
+
+                # Writes the matrix to a CSV file outside of the matrices folder
                 case 12:
+                    if matrixA is None:
+                        print("Please select a matrix before trying to perform a operation.")
+                        continue
+                    else:
+                        print("Please enter the path of the CSV file to export to:")
+                        if matrixA[1].exportCSV(input()):
+                            print("Your matrix has been exported!")
+
+                # Exit - Ends the loop
+                case 13:
                     break
 
         # When loop is ended returns the user to home
@@ -934,15 +4087,73 @@ class StateMachine:
 
         return stateDict[1]      
 
+    # State 10 - Performance Report, shows how long the operations have taken and how much memory they used, and the
+    # hits and misses of the result cache, and lets users turn the timing and memory tracing of operations on and off or save them to a JSON file
+    # 
+    # Will return the state to move to.
+    def __performanceReport(self):
+
+        if Matrix.resultCache is not None:
+            Matrix.resultCache.printReport()
+            print()
+
+        if not Instrumentation.enabled:
+            print("Operations are not being timed.\n"
+                  "1.) Start timing operations\n"
+                  "2.) Return to the Home Screen")
+
+            options = [ 1, 2 ]
+            userInput = None
+            userInput = self.__inputValidation(options, userInput)
+
+            if userInput == 1:
+                Instrumentation.enabled = True
+                print("Operations are now being timed.")
+            return 1
+
+        Instrumentation.printSummary()
+
+        print("1.) Save the timings to a JSON file\n"
+              "2.) Clear the timings\n"
+              + ("3.) Stop tracing memory, which slows operations down\n" if Instrumentation.traceMemory else
+                 "3.) Start tracing the peak memory of operations, which slows them down\n") +
+              "4.) Stop timing operations\n"
+              "5.) Return to the Home Screen")
+
+        options = [ 1, 2, 3, 4, 5 ]
+        userInput = None
+        userInput = self.__inputValidation(options, userInput)
+
+        if userInput == 1:
+            print("Please enter the path of the JSON file:")
+            if Instrumentation.dumpJSON(input()):
+                print("The timings have been saved!")
+        elif userInput == 2:
+            Instrumentation.clear()
+        elif userInput == 3:
+            Instrumentation.traceMemory = not Instrumentation.traceMemory
+        elif userInput == 4:
+            Instrumentation.enabled = False
+            Instrumentation.traceMemory = False
+
+        # local state dictionary to transform user input into the class wide defined states
+        stateDict = { 1: 10,
+                      2: 10,
+                      3: 10,
+                      4: 1,
+                      5: 1 }
+
+        return stateDict[userInput]
+
     # Helper Functions:
 
     # Returns a tuple with the stripped name of the matrix, and the Matrix Object
     #
     # name - str - The name of a matrix in the matrices folder without the file extension
+    @Instrumentation.timed("StateMachine.loadMatrix", disk = "read")
     def __loadMatrix(self, name):
         
-        path = "matrices\\" + name + ".csv"
-        return (name, Matrix.createImport(path))
+        return (name, self.__store.loadMatrix(name))
     
     # Regularly used code that is ran after nearly every Matrix Operation
     # Gives the user the ability to see the resulting matrix and lets them save it
@@ -1026,9 +4237,15 @@ class StateMachine:
     
     # used to validate that the user provided a number in Manual Matrix Creation
     #
-    # returns a float
+    # returns a int for whole numbers, otherwise a float
     def __numberValidation(self, number):
         while True:
+            # Whole numbers are kept as ints, so a matrix of only whole numbers holds int64 values
+            try:
+                return int(number)
+            except ValueError:
+                pass
+
             try:
                 value = float(number)
                 return value
@@ -1036,12 +4253,31 @@ class StateMachine:
                 print("Invalid input. Please enter a number.")
                 number = input()
         
-    # prints a numpy matrix to the terminal     
+    # prints a numpy matrix to the terminal, large matrices are printed as a summary and can then be
+    # paged through a few rows at a time
     # 
     # matrix - a matrix object   
     def __viewConsoleMatrix(self, matrix):
         matrix.printMatrix()
 
+        if matrix.getMatrix() is None or matrix.getRows() * matrix.getCols() <= Matrix.printCells:
+            return
+
+        start = 0
+        while start < matrix.getRows():
+            print("Would you like to see the next rows of the matrix?\n"
+                  "1.) Yes\n"
+                  "2.) No")
+
+            options = [ 1, 2 ]
+            userInput = None
+            userInput = self.__inputValidation(options, userInput)
+
+            if userInput == 2:
+                break
+            matrix.printMatrix(mode = "page", start = start)
+            start += Matrix.pageRows
+
     # creates a pop up image of a heatmap of the matrix
     #
     # matrix - a matrix object
@@ -1053,23 +4289,20 @@ class StateMachine:
     # filename - the name of a file in the matrices folder without the file extension
     def __deleteMatrix(self, filename):
 
-        try:
-            path = "matrices\\" + filename + ".csv"
-            os.remove(path)
-        except:
+        if not self.__store.deleteMatrix(filename):
             print("That matrix does not exist in the Matrix Operation Manager.")
 
     # Attempts to save a matrix in the matrices folder based on the stripped filename
     #
     # filename - the name you want to save a file in the matrices folder without the file extension
     # matrix - a Matrix Object
+    @Instrumentation.timed("StateMachine.saveMatrix", disk = "write")
     def __saveMatrix(self, filename, matrix):
 
         if matrix is None:
             print("You cannot save a empty or null matrix.")
-        else:
-            path = "matrices\\" + filename + ".csv"
-            np.savetxt(path, matrix.getMatrix(), delimiter=",")
+        elif not self.__store.saveMatrix(filename, matrix):
+            print("The matrix could not be saved.")
 
     # Process Functions:
     
@@ -1081,7 +4314,9 @@ class StateMachine:
                  5: __createManual,
                  6: __listSaved,
                  7: __deleteScreen,
-                 8: __matrixOperations
+                 8: __matrixOperations,
+                 9: __createImportSparse,
+                 10: __performanceReport
                 }
     
     # This function runs the State Machine, and ends it when the user reaches state 0
@@ -1096,13 +4331,701 @@ class StateMachine:
 
 
 
+# %% [markdown]
+# # Batch Runner Class
+
+# %%
+# Class utilized to run a script of matrix operations without the menus, so jobs can run on their own.
+#
+# Each line of a script is one step, "targets = operation arguments" or "operation arguments" for steps
+# without a result. The matrices made by the steps are held in memory by their target names, and are only
+# written to the matrices folder by a save step. A matrix is dropped from memory after the last step that
+# uses it. Blank lines and anything after a # are ignored.
+#
+#   A = load savedA                loads a matrix saved in the matrices folder
+#   B = import path.csv            imports a CSV file
+#   C = add A B                    subtract, multiply, and solve are written the same way
+#   D = inverse C                  transpose is written the same way
+#   H = toDtype D float32          converts the values to int32, int64, float32, or float64
+#   E, F, G = eigenDecomp D        the eigen decomposition, vectors, and values, a _ target is not found
+#   determinate D                  prints the determinate
+#   print D                        prints the matrix
+#   save E savedE                  saves a matrix to the matrices folder
+#   export E path.csv              writes a matrix to a CSV file
+#   heatmap E path.png             writes the heatmap of a matrix to a PNG file
+#
+# With a memory limit, the memory of each operation is estimated before it runs. A multiply that would go over
+# the limit is computed tile by tile into a temporary file instead, and other operations stop the script.
+class BatchRunner:
+
+    # operation -> (amount of targets, amount of arguments, amount of those arguments that are matrix names)
+    __OPERATIONS = { "load": (1, 1, 0),
+                     "import": (1, 1, 0),
+                     "add": (1, 2, 2),
+                     "subtract": (1, 2, 2),
+                     "multiply": (1, 2, 2),
+                     "solve": (1, 2, 2),
+                     "transpose": (1, 1, 1),
+                     "inverse": (1, 1, 1),
+                     "toDtype": (1, 2, 1),
+                     "eigenDecomp": (3, 1, 1),
+                     "determinate": (0, 1, 1),
+                     "print": (0, 1, 1),
+                     "save": (0, 2, 1),
+                     "export": (0, 2, 1),
+                     "heatmap": (0, 2, 1)
+                    }
+
+    # store - a MatrixStore the load and save steps use, the matrices folder if not provided
+    # memoryLimit - int - the most bytes a operation may allocate, no limit if not provided
+    def __init__(self, store = None, memoryLimit = None):
+        self.__store = store if store is not None else MatrixStore("matrices")
+        self.__memoryLimit = memoryLimit
+        self.__matrices = {}
+
+    # Reads a script from a file and runs it
+    #
+    # path - str - the path to the script
+    #
+    # Will return either True if every step ran, or None
+    def runFile(self, path):
+        try:
+            with open(path) as file:
+                script = file.read()
+        except OSError:
+            print("The script " + str(path) + " could not be read.")
+            return
+
+        return self.runScript(script)
+
+    # Runs a script, stopping at the first step that fails
+    #
+    # script - str - the lines of the script
+    #
+    # Will return either True if every step ran, or None
+    def runScript(self, script):
+        steps = []
+        for number, line in enumerate(script.splitlines(), start = 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+
+            step = BatchRunner.__parseStep(number, line)
+            if step is None:
+                return
+            steps.append(step)
+
+        # The last step that uses each matrix, so it can be dropped from memory after that step
+        lastUse = {}
+        for i, (number, targets, operation, arguments) in enumerate(steps):
+            for name in arguments[:BatchRunner.__OPERATIONS[operation][2]]:
+                lastUse[name] = i
+
+        for i, (number, targets, operation, arguments) in enumerate(steps):
+            if not self.__runStep(number, targets, operation, arguments):
+                print(f"Line {number}: the {operation} step failed, the script was stopped.")
+                self.__matrices.clear()
+                return
+
+            for name in arguments[:BatchRunner.__OPERATIONS[operation][2]] + targets:
+                if lastUse.get(name, -1) <= i:
+                    self.__matrices.pop(name, None)
+
+        return True
+
+    # Splits a line of a script into its targets, operation, and arguments
+    #
+    # Will return either a (line number, targets, operation, arguments) tuple or None
+    @staticmethod
+    def __parseStep(number, line):
+        targets = []
+        if "=" in line:
+            targetText, line = line.split("=", 1)
+            targets = [target.strip() for target in targetText.split(",")]
+
+        words = line.split()
+        operation, arguments = words[0], words[1:]
+
+        if operation not in BatchRunner.__OPERATIONS:
+            print(f"Line {number}: {operation} is not a operation.")
+            return
+
+        targetCount, argumentCount, matrixCount = BatchRunner.__OPERATIONS[operation]
+        if len(targets) != targetCount or len(arguments) != argumentCount or "" in targets:
+            print(f"Line {number}: {operation} needs {targetCount} targets and {argumentCount} arguments.")
+            return
+
+        return number, targets, operation, arguments
+
+    # Function needed for the memory limit, estimates the memory of a step from the shapes and structure of its
+    # matrices
+    #
+    # Will return either a int of bytes, or None for steps that are not estimated
+    @staticmethod
+    def __estimateMemory(operation, targets, matrices):
+        if operation not in ("add", "subtract", "multiply", "solve", "transpose", "inverse", "determinate", "eigenDecomp"):
+            return
+        elif operation in ("add", "subtract", "multiply") and all(matrix.isSparse() for matrix in matrices):
+            # The result of two sparse matrices is sparse, which the dense estimates do not cover
+            return
+
+        matrix = matrices[0]
+        shapeB = (matrices[1].getRows(), matrices[1].getCols()) if len(matrices) > 1 else None
+
+        structure = "general"
+        if operation in ("solve", "inverse", "determinate", "eigenDecomp"):
+            if matrix.isDiagonal():
+                structure = "diagonal"
+            elif matrix.isUpperTriangular():
+                structure = "upper"
+            elif matrix.isLowerTriangular():
+                structure = "lower"
+            elif matrix.isSymmetric():
+                structure = "symmetric"
+
+        valuesOnly = operation == "eigenDecomp" and targets[0] == "_" and targets[1] == "_"
+        reconstruct = operation == "eigenDecomp" and targets[0] != "_"
+        return Matrix.estimateMemory(operation, (matrix.getRows(), matrix.getCols()), shapeB, structure,
+                                     matrix.getMatrix().dtype, valuesOnly, reconstruct)
+
+    # Runs one step of a script
+    #
+    # Will return either True or None
+    def __runStep(self, number, targets, operation, arguments):
+        matrices = []
+        for name in arguments[:BatchRunner.__OPERATIONS[operation][2]]:
+            if name not in self.__matrices:
+                print(f"Line {number}: the matrix {name} has not been made.")
+                return
+            matrices.append(self.__matrices[name])
+
+        # Checks the estimated memory of the operation against the limit
+        blockSize = None
+        if self.__memoryLimit is not None:
+            estimate = BatchRunner.__estimateMemory(operation, targets, matrices)
+            if estimate is not None and estimate > self.__memoryLimit:
+                megabytes, limit = estimate / 1024 / 1024, self.__memoryLimit / 1024 / 1024
+                if operation != "multiply" or matrices[0].isSparse() or matrices[1].isSparse():
+                    print(f"Line {number}: {operation} needs about {megabytes:.1f} MB, more than the memory limit of {limit:.1f} MB.")
+                    return
+
+                # The four blocks used by each step of the tiled product, of values of up to 16 bytes, must also fit in the limit
+                blockSize = max(1, min(Matrix.blockSize, int((self.__memoryLimit / (4 * 16)) ** 0.5)))
+                print(f"Line {number}: multiply needs about {megabytes:.1f} MB, more than the memory limit of {limit:.1f} MB, "
+                      "so it is computed tile by tile on disk.")
+
+        match operation:
+            case "load":
+                results = [self.__store.loadMatrix(arguments[0])]
+            case "import":
+                results = [Matrix.createImport(arguments[0])]
+            case "add":
+                results = [matrices[0].add(matrices[1])]
+            case "subtract":
+                results = [matrices[0].subtract(matrices[1])]
+            case "multiply":
+                results = [matrices[0].multiply(matrices[1], blockSize = blockSize)]
+            case "solve":
+                results = [matrices[0].solve(matrices[1])]
+            case "transpose":
+                results = [matrices[0].transpose()]
+            case "inverse":
+                results = [matrices[0].inverse()]
+            case "toDtype":
+                results = [matrices[0].toDtype(arguments[1])]
+            case "eigenDecomp":
+                # Only the parts with a target are found
+                valuesOnly = targets[0] == "_" and targets[1] == "_"
+                results = matrices[0].eigenDecomp(valuesOnly, reconstruct = targets[0] != "_")
+                if results is None:
+                    return
+                results = [result if target != "_" else True for target, result in zip(targets, results)]
+            case "determinate":
+                determinate = matrices[0].determinate()
+                if determinate is None:
+                    return
+                print(determinate)
+                return True
+            case "print":
+                matrices[0].printMatrix()
+                return True
+            case "save":
+                return self.__store.saveMatrix(arguments[1], matrices[0])
+            case "export":
+                return matrices[0].exportCSV(arguments[1])
+            case "heatmap":
+                return matrices[0].showVisualization(arguments[1])
+
+        if any(result is None for result in results):
+            return
+
+        for target, result in zip(targets, results):
+            if target != "_":
+                self.__matrices[target] = result
+        return True
+
+# %% [markdown]
+# # Matrix Server Class
+
+# %%
+# Class utilized to serve the operations of the Matrix class to other programs over a local TCP socket, so several
+# users share one copy of each large matrix instead of each State Machine loading its own.
+#
+# Every message is a 4 byte length, a JSON header of that length, and then the raw values of the arrays the header
+# describes, in order. A request names its operation, its matrices, each either the name of a matrix kept by the
+# server or saved in the matrices folder, or the position of a value sent with the request, its parameters, and
+# optionally the names to keep its results under on the server instead of sending them back:
+#
+#   {"id": 1, "operation": "multiply", "matrices": ["A", 0], "parameters": {}, "keep": ["C"], "values": [...]}
+#
+# The response has the same id, "ok", a "error" when ok is False, and the values of the results. A dense value is
+# described as {"kind": "dense", "dtype", "shape"}, and a sparse value as {"kind": "sparse", "dtype", "shape", "nnz"}
+# followed by its data, indices, and indptr arrays. Parts of a eigen decomposition that were not asked for are None.
+#
+# The operations run on a pool of threads, as Numpy releases the GIL in its BLAS and LAPACK calls and the threads
+# share the kept matrices without copying them, so the event loop keeps answering other clients while a large
+# operation runs. The MatrixStore has a thread of its own, as its SQLite catalog can only be used by one thread.
+# Values are sent and read chunkBytes at a time, waiting for the client to read each chunk, so a large result is
+# never copied into one message.
+#
+# The operations are the ones of BatchRunner, with these that work on the matrices of the server:
+#   ping                           answers with nothing, used to measure the overhead of a request
+#   list                           answers with "names", the kept matrices and the matrices of the folder
+#   put [0] keep [name]            keeps a sent matrix under a name
+#   get [name]                     sends back a matrix
+#   drop [names]                   forgets kept matrices
+#   save [name] {"name": saved}    saves a matrix to the matrices folder
+class MatrixServer:
+
+    # The port the server listens on and the clients connect to if no other port is given
+    port = 8765
+
+    # The most bytes of values sent or read at a time
+    chunkBytes = 4 * 1024 * 1024
+
+    # Larger headers are treated as a broken connection
+    __MAX_HEADER = 16 * 1024 * 1024
+
+    # operation -> (amount of matrices, function taking the list of Matrix Objects and the dict of parameters)
+    __OPERATIONS = { "add": (2, lambda matrices, parameters: matrices[0].add(matrices[1])),
+                     "subtract": (2, lambda matrices, parameters: matrices[0].subtract(matrices[1])),
+                     "multiply": (2, lambda matrices, parameters: matrices[0].multiply(matrices[1])),
+                     "solve": (2, lambda matrices, parameters: matrices[0].solve(matrices[1])),
+                     "transpose": (1, lambda matrices, parameters: matrices[0].transpose()),
+                     "inverse": (1, lambda matrices, parameters: matrices[0].inverse()),
+                     "determinate": (1, lambda matrices, parameters: matrices[0].determinate()),
+                     "eigenDecomp": (1, lambda matrices, parameters: matrices[0].eigenDecomp(parameters.get("valuesOnly", False),
+                                                                                             parameters.get("reconstruct", True))),
+                     "toDtype": (1, lambda matrices, parameters: matrices[0].toDtype(parameters.get("dtype")))
+                    }
+
+    # folder - str - the folder of the saved matrices the clients can use by name
+    # host - str - the address to listen on, only this computer can connect to the default
+    # port - int - the port to listen on, MatrixServer.port if not provided, or 0 for any free port
+    # workers - int - the amount of threads running operations, all of the cores of the computer if None
+    def __init__(self, folder = "matrices", host = "127.0.0.1", port = None, workers = None):
+        self.__folder = folder
+        self.__host = host
+        self.__port = port if port is not None else MatrixServer.port
+        self.__workers = workers if workers is not None else os.cpu_count()
+
+        # name -> Matrix Object, the matrices kept by the put and keep of the clients
+        self.__matrices = {}
+
+        self.__store = None
+        self.__loop = None
+        self.__stopped = None
+        self.__writers = set()
+        self.__ready = threading.Event()
+        self.__thread = None
+        self.__error = None
+        self.__requests = 0
+
+    # Runs the server until it is stopped
+    def serve(self):
+        import asyncio
+        asyncio.run(self.__serve())
+
+    # Runs the server on a thread of its own, used to serve from a program that does other work
+    #
+    # Returns the port the server listens on, raises the error of the server if it could not start, such as the
+    # OSError of a port that is in use
+    def start(self):
+        self.__error = None
+        self.__ready.clear()
+        self.__thread = threading.Thread(target = self.__run, daemon = True)
+        self.__thread.start()
+        self.__ready.wait()
+        if self.__error is not None:
+            self.__thread.join()
+            raise self.__error
+        return self.__port
+
+    # Stops a running server, closing the connections of the clients. Can be called from any thread.
+    def stop(self):
+        if self.__loop is not None:
+            self.__loop.call_soon_threadsafe(self.__stopped.set)
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+
+    # returns the port the server listens on
+    def getPort(self):
+        return self.__port
+
+    # returns the amount of requests answered
+    def getRequests(self):
+        return self.__requests
+
+    # Function needed for start, serves on the thread of the server and keeps the error that stopped it from starting
+    def __run(self):
+        try:
+            self.serve()
+        except Exception as error:
+            if self.__ready.is_set():
+                raise
+            self.__error = error
+        finally:
+            self.__ready.set()
+
+    # Function needed for serving, opens the store and listens until stop is called
+    async def __serve(self):
+        import asyncio
+
+        # The server is created before the threads and the store, so a port that cannot be listened on fails
+        # before anything else is started
+        server = await asyncio.start_server(self.__connection, self.__host, self.__port, start_serving = False)
+        self.__port = server.sockets[0].getsockname()[1]
+
+        self.__loop = asyncio.get_running_loop()
+        self.__stopped = asyncio.Event()
+        self.__pool = ThreadPoolExecutor(max_workers = self.__workers)
+        self.__storeThread = ThreadPoolExecutor(max_workers = 1)
+        try:
+            self.__store = await self.__loop.run_in_executor(self.__storeThread, MatrixStore, self.__folder)
+            await server.start_serving()
+            print(f"Serving matrices on {self.__host}:{self.__port}", flush = True)
+            self.__ready.set()
+
+            await self.__stopped.wait()
+        finally:
+            server.close()
+            for writer in list(self.__writers):
+                writer.close()
+            await server.wait_closed()
+            self.__pool.shutdown()
+            self.__storeThread.shutdown()
+            self.__loop = None
+
+    # Function needed for serving, answers the requests of one client in order until it disconnects
+    async def __connection(self, reader, writer):
+        import asyncio
+
+        self.__writers.add(writer)
+        try:
+            while True:
+                try:
+                    header, arrays = await MatrixServer.__receive(reader)
+                except asyncio.IncompleteReadError:
+                    break
+
+                response, values = await self.__respond(header, arrays)
+                response["id"] = header.get("id")
+                # Counted before it is sent, so a client that has its answer always sees it counted
+                self.__requests += 1
+                await MatrixServer.__send(writer, response, values)
+        except (ConnectionError, ValueError, TypeError, KeyError, IndexError) as error:
+            # A broken connection or a message that is not in the format of the server
+            print(f"A client was disconnected: {error}")
+        finally:
+            self.__writers.discard(writer)
+            writer.close()
+
+    # Function needed for serving, runs one request
+    #
+    # header - dict - the header of the request
+    # arrays - list - the arrays sent with the request
+    #
+    # Returns a tuple of the header of the response and the values sent with it
+    async def __respond(self, header, arrays):
+        operation = header.get("operation")
+        references = header.get("matrices", [])
+        parameters = header.get("parameters") or {}
+        keep = header.get("keep")
+        sent = MatrixServer.rebuild(header.get("values", []), arrays)
+
+        if not isinstance(references, list) or not isinstance(parameters, dict) or (keep is not None and not isinstance(keep, list)):
+            return {"ok": False, "error": "The matrices and keep must be lists, and the parameters a dict."}, []
+
+        match operation:
+            case "ping":
+                return {"ok": True}, []
+            case "list":
+                stored = await self.__loop.run_in_executor(self.__storeThread, self.__store.listMatrices)
+                return {"ok": True, "names": sorted(set(self.__matrices) | set(stored))}, []
+            case "drop":
+                for name in references:
+                    self.__matrices.pop(name, None)
+                return {"ok": True}, []
+
+        # The names are used as the file names of saved matrices, so a name could otherwise reach outside of the folder
+        names = [reference for reference in references if isinstance(reference, str)]
+        names += [name for name in keep or [] if name != "_"]
+        if operation == "save" and isinstance(parameters.get("name"), str):
+            names.append(parameters["name"])
+        for name in names:
+            if not MatrixServer.__validName(name):
+                return {"ok": False, "error": f"{name!r} is not a valid matrix name."}, []
+
+        matrices = []
+        for reference in references:
+            matrix = await self.__matrix(reference, sent)
+            if matrix is None:
+                return {"ok": False, "error": f"There is no matrix {reference}."}, []
+            matrices.append(matrix)
+
+        if operation in ("put", "get"):
+            results = matrices[:1]
+        elif operation == "save":
+            if len(matrices) != 1 or not isinstance(parameters.get("name"), str):
+                return {"ok": False, "error": "save needs one matrix and the name to save it as."}, []
+            saved = await self.__loop.run_in_executor(self.__storeThread, self.__store.saveMatrix, parameters["name"], matrices[0])
+            return ({"ok": True}, []) if saved else ({"ok": False, "error": "The matrix could not be saved."}, [])
+        elif operation in MatrixServer.__OPERATIONS:
+            count, function = MatrixServer.__OPERATIONS[operation]
+            if len(matrices) != count:
+                return {"ok": False, "error": f"{operation} needs {count} matrices."}, []
+
+            try:
+                results = await self.__loop.run_in_executor(self.__pool, function, matrices, parameters)
+            except (ValueError, IndexError, TypeError, MemoryError) as error:
+                # A sent sparse matrix with indices outside of its shape, or a matrix too large for the memory
+                print(f"{operation} failed: {error}")
+                results = None
+            if results is None:
+                return {"ok": False, "error": f"{operation} could not be done on these matrices, see the output of the server."}, []
+            results = results if isinstance(results, list) else [results]
+        else:
+            return {"ok": False, "error": f"{operation} is not a operation."}, []
+
+        if not results:
+            return {"ok": False, "error": f"{operation} needs a matrix."}, []
+
+        # Kept results are only described, not sent back
+        if keep is not None:
+            if len(keep) != len(results):
+                return {"ok": False, "error": f"{operation} has {len(results)} results to keep."}, []
+
+            kept = []
+            for name, result in zip(keep, results):
+                if name != "_" and isinstance(result, Matrix):
+                    self.__matrices[name] = result
+                    kept.append({"name": name, "rows": result.getRows(), "cols": result.getCols(), "dtype": str(result.getMatrix().dtype)})
+            return {"ok": True, "kept": kept}, []
+
+        return {"ok": True}, [result.getMatrix() if isinstance(result, Matrix) else result for result in results]
+
+    # Function needed for running requests, checks that a name can be used as the file name of a matrix
+    #
+    # name - the name sent by a client
+    #
+    # Returns wether it is a non empty str without a folder, path separator or ".."
+    @staticmethod
+    def __validName(name):
+        return (isinstance(name, str) and name != "" and os.path.basename(name) == name
+                and not any(part in name for part in ("/", "\\", "..", "\0")))
+
+    # Function needed for running requests, finds the matrix a request refers to
+    #
+    # reference - str or int - the name of a kept or saved matrix, or the position of a sent value
+    # sent - list - the values sent with the request
+    #
+    # Will return either a Matrix object or None
+    async def __matrix(self, reference, sent):
+        if isinstance(reference, int) and 0 <= reference < len(sent):
+            value = sent[reference]
+            return Matrix(value) if isinstance(value, SparseArray) or (isinstance(value, np.ndarray) and value.ndim == 2) else None
+        elif not isinstance(reference, str):
+            return
+        elif reference in self.__matrices:
+            return self.__matrices[reference]
+        return await self.__loop.run_in_executor(self.__storeThread, self.__store.loadMatrix, reference)
+
+    # Function needed for serving, reads one message
+    #
+    # Returns a tuple of the header and the list of arrays sent after it
+    @staticmethod
+    async def __receive(reader):
+        length = struct.unpack("<I", await reader.readexactly(4))[0]
+        if length > MatrixServer.__MAX_HEADER:
+            raise ValueError("the header is too large")
+
+        header = json.loads(await reader.readexactly(length))
+        arrays = []
+        for dtype, shape in MatrixServer.layout(header.get("values", [])):
+            array = np.empty(shape, dtype = dtype)
+            flat = array.reshape(-1).view(np.uint8)
+            for start in range(0, flat.size, MatrixServer.chunkBytes):
+                flat[start:start + MatrixServer.chunkBytes] = np.frombuffer(
+                    await reader.readexactly(min(MatrixServer.chunkBytes, flat.size - start)), dtype = np.uint8)
+            arrays.append(array)
+        return header, arrays
+
+    # Function needed for serving, writes one message, waiting for the client to read each chunk of the values
+    #
+    # header - dict - the header of the message, the description of the values is added to it
+    # values - list - the values sent after the header
+    @staticmethod
+    async def __send(writer, header, values):
+        descriptions, arrays = MatrixServer.describe(values)
+        data = json.dumps(dict(header, values = descriptions)).encode()
+        writer.write(struct.pack("<I", len(data)) + data)
+
+        for array in arrays:
+            for chunk in MatrixServer.chunks(array):
+                writer.write(memoryview(chunk))
+                await writer.drain()
+        await writer.drain()
+
+    # Describes values for a message, used by the server and its clients
+    #
+    # values - list - Numpy arrays, SparseArrays, Numpy scalars, or None
+    #
+    # Returns a tuple of the list of descriptions for the header and the list of arrays sent after it
+    @staticmethod
+    def describe(values):
+        descriptions, arrays = [], []
+        for value in values:
+            if value is None:
+                descriptions.append(None)
+            elif isinstance(value, SparseArray):
+                descriptions.append({"kind": "sparse", "dtype": value.dtype.str, "shape": list(value.shape), "nnz": int(value.getNnz())})
+                arrays += [value.data, value.indices, value.indptr]
+            else:
+                value = np.asarray(value)
+                descriptions.append({"kind": "dense", "dtype": value.dtype.str, "shape": list(value.shape)})
+                arrays.append(value)
+        return descriptions, arrays
+
+    # Finds the dtype and shape of each array that follows a header, only number dtypes are accepted
+    #
+    # descriptions - list - the descriptions of the values of the header
+    #
+    # Returns a list of (dtype, shape) tuples, raises a ValueError for a description that cannot be read
+    @staticmethod
+    def layout(descriptions):
+        layout = []
+        for description in descriptions:
+            if description is None:
+                continue
+
+            dtype = np.dtype(description["dtype"])
+            shape = tuple(int(size) for size in description["shape"])
+            if dtype.kind not in "biufc" or any(size < 0 for size in shape):
+                raise ValueError("the values must be numbers with a shape of positive sizes")
+            if description["kind"] == "sparse" and len(shape) != 2:
+                raise ValueError("a sparse matrix must have rows and columns")
+
+            if description["kind"] == "sparse":
+                nnz = int(description["nnz"])
+                layout += [(dtype, (nnz,)), (np.dtype(np.int64), (nnz,)), (np.dtype(np.int64), (shape[0] + 1,))]
+            else:
+                layout.append((dtype, shape))
+        return layout
+
+    # Rebuilds the values of a message from the descriptions and arrays of the message
+    #
+    # Returns a list of Numpy arrays, SparseArrays, Numpy scalars, and None
+    @staticmethod
+    def rebuild(descriptions, arrays):
+        values, position = [], 0
+        for description in descriptions:
+            if description is None:
+                values.append(None)
+            elif description["kind"] == "sparse":
+                data, indices, indptr = arrays[position:position + 3]
+                values.append(SparseArray(data, indices, indptr, tuple(description["shape"])))
+                position += 3
+            else:
+                array = arrays[position]
+                values.append(array[()] if array.ndim == 0 else array)
+                position += 1
+        return values
+
+    # Splits the values of a array into chunks of at most about chunkBytes, copying only the rows of one chunk
+    # at a time when the array is not contiguous, such as a transposed matrix
+    #
+    # array - a Numpy array
+    #
+    # Returns a generator of the chunks as Numpy arrays of bytes
+    @staticmethod
+    def chunks(array):
+        if array.ndim < 2:
+            flat = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+            for start in range(0, flat.size, MatrixServer.chunkBytes):
+                yield flat[start:start + MatrixServer.chunkBytes]
+            return
+
+        rowBytes = max(1, array[0].nbytes if array.shape[0] > 0 else 1)
+        rows = max(1, MatrixServer.chunkBytes // rowBytes)
+        for start in range(0, array.shape[0], rows):
+            yield np.ascontiguousarray(array[start:start + rows]).reshape(-1).view(np.uint8)
+
 # %% [markdown]
 # # Start Command
 
 # %%
-# On start up instantiate the Machine
+# On start up instantiate the Machine, or run a script of operations if one is given with --batch
 def main():
+    parser = argparse.ArgumentParser(description = "Matrix Operations Manager")
+    parser.add_argument("--batch", metavar = "SCRIPT", default = None,
+                        help = "run a script of matrix operations without the menus")
+    parser.add_argument("--timings", metavar = "JSON", default = None,
+                        help = "time the operations and write the timings to a JSON file on exit")
+    parser.add_argument("--trace-memory", action = "store_true",
+                        help = "also trace the peak memory of the timed operations, which slows them down")
+    parser.add_argument("--memory-limit", metavar = "MB", type = float, default = None,
+                        help = "stop a batch script before a operation that would allocate more than this many megabytes")
+    parser.add_argument("--result-cache", metavar = "MB", type = float, default = 2048,
+                        help = "the most megabytes of operation results to keep in matrices/results, 0 turns the cache off")
+    parser.add_argument("--serve", action = "store_true",
+                        help = "serve the matrix operations to other programs instead of showing the menus")
+    parser.add_argument("--host", default = "127.0.0.1", help = "the address the server listens on")
+    parser.add_argument("--port", type = int, default = MatrixServer.port, help = "the port the server listens on, 0 for any free port")
+    parser.add_argument("--workers", type = int, default = None, help = "the amount of threads the server runs operations on")
+    # Jupyter runs the notebook with arguments of its own, so the arguments are only read when run as a script
+    args = parser.parse_args([] if "ipykernel" in sys.modules else None)
+
+    Instrumentation.enabled = args.timings is not None
+    Instrumentation.traceMemory = args.trace_memory
+
+    if args.result_cache > 0:
+        Matrix.resultCache = ResultCache(os.path.join("matrices", "results"), maxBytes = int(args.result_cache * 1024 * 1024))
+
+    if args.batch is not None:
+        memoryLimit = int(args.memory_limit * 1024 * 1024) if args.memory_limit is not None else None
+        succeeded = BatchRunner(memoryLimit = memoryLimit).runFile(args.batch)
+        if args.timings is not None:
+            Instrumentation.dumpJSON(args.timings)
+        sys.exit(0 if succeeded else 1)
+
+    if args.serve:
+        # The operations run on several threads, where tracemalloc cannot be started for each call
+        if args.trace_memory:
+            tracemalloc.start()
+        try:
+            MatrixServer(host = args.host, port = args.port, workers = args.workers).serve()
+        except KeyboardInterrupt:
+            pass
+        except OSError as error:
+            print(f"The server could not start: {error}")
+            sys.exit(1)
+        if args.timings is not None:
+            Instrumentation.dumpJSON(args.timings)
+        return
+
     begin = StateMachine()
+    if args.timings is not None:
+        Instrumentation.dumpJSON(args.timings)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,110 @@
+# Measures how long the Matrix Operation Manager takes to start, so regressions in cold start are caught.
+#
+# Two timings are taken, each in a fresh python process so nothing is already imported:
+#   import - the time to run "import script", as done by unitTests.py and other scripts
+#   prompt - the time from starting "script.py" to the home screen being printed
+#
+# Usage:
+#   py .\startupBenchmark.py [--runs 5] [--max-import 0.5] [--max-prompt 1.0] [--output startup.json]
+#
+# Exits with 1 if the median of a timing is above its limit, or if the plotting libraries are
+# imported on start up.
+
+# %%
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+# Run in the child process, prints the import time and whether the plotting libraries were imported
+IMPORT_CODE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import script\n"
+    "print(time.perf_counter() - start)\n"
+    "print(int('seaborn' in sys.modules or 'matplotlib' in sys.modules))\n"
+)
+
+# %%
+# Times "import script" in a new python process
+#
+# Returns a tuple of the import time in seconds and wether the plotting libraries were imported
+def timeImport():
+    output = subprocess.run([sys.executable, "-c", IMPORT_CODE], cwd = FOLDER,
+                            capture_output = True, text = True, check = True).stdout.split()
+    return float(output[0]), output[1] == "1"
+
+# Times how long script.py takes to print its home screen, then exits the program through the home screen
+#
+# Returns the time to the first prompt in seconds
+def timePrompt():
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-u", os.path.join(FOLDER, "script.py")], cwd = FOLDER,
+                               stdin = subprocess.PIPE, stdout = subprocess.PIPE, text = True)
+
+    # The last option of the home screen is the exit, its number is used to close the program
+    exitOption = None
+    for line in process.stdout:
+        if line.rstrip().endswith(".) Exit"):
+            exitOption = line.split(".)")[0]
+            break
+    elapsed = time.perf_counter() - start
+
+    process.communicate(exitOption + "\n")
+    return elapsed
+
+# Returns the median, minimum, and maximum of a list of timings
+def summarize(timings):
+    return {"median": statistics.median(timings), "min": min(timings), "max": max(timings)}
+
+# %%
+def main():
+    parser = argparse.ArgumentParser(description = "Measure the start up time of the Matrix Operation Manager.")
+    parser.add_argument("--runs", type = int, default = 5, help = "number of processes to time for each measurement")
+    parser.add_argument("--max-import", type = float, default = None, help = "fail if the median import time is above this many seconds")
+    parser.add_argument("--max-prompt", type = float, default = None, help = "fail if the median time to the first prompt is above this many seconds")
+    parser.add_argument("--output", default = None, help = "path of a JSON file to write the results to")
+    args = parser.parse_args()
+
+    importTimes = []
+    plottingImported = False
+    for i in range(args.runs):
+        importTime, plotting = timeImport()
+        importTimes.append(importTime)
+        plottingImported = plottingImported or plotting
+
+    promptTimes = [timePrompt() for i in range(args.runs)]
+
+    results = {"runs": args.runs,
+               "import": summarize(importTimes),
+               "prompt": summarize(promptTimes),
+               "plottingImported": plottingImported}
+
+    print(f"import script:   median {results['import']['median']:.3f}s (min {results['import']['min']:.3f}s, max {results['import']['max']:.3f}s)")
+    print(f"first prompt:    median {results['prompt']['median']:.3f}s (min {results['prompt']['min']:.3f}s, max {results['prompt']['max']:.3f}s)")
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent = 2)
+
+    # Checks the results against the limits
+    failed = False
+    if plottingImported:
+        print("Regression: seaborn or matplotlib is imported on start up.")
+        failed = True
+    if args.max_import is not None and results["import"]["median"] > args.max_import:
+        print(f"Regression: the import time is above {args.max_import}s.")
+        failed = True
+    if args.max_prompt is not None and results["prompt"]["median"] > args.max_prompt:
+        print(f"Regression: the time to the first prompt is above {args.max_prompt}s.")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,16 @@ import unittest
 from unittest.mock import patch
 import numpy as np
 import os
-from script import Matrix, StateMachine
+from script import BatchRunner, Instrumentation, Matrix, MatrixBatch, MatrixExpression, MatrixCache, MatrixServer, MatrixStore, ResultCache, SparseArray, StateMachine
 import csv
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import tracemalloc
+from client import MatrixClient
 
 
 # %%
@@ -18,7 +26,7 @@ class TestMatrixClass(unittest.TestCase):
         self.matrix2 = Matrix.createManual([[1,2,3],[4,5,6],[7,8,9]])
         
         # used for import testing, creates a csv file
-        self.path = "matrices\\" + "unitTest" + ".csv"
+        self.path = os.path.join("matrices", "unitTest" + ".csv")
         np.savetxt(self.path, self.matrix2.getMatrix(), delimiter=",")
 
     def tearDown(self):
@@ -67,6 +75,31 @@ class TestMatrixClass(unittest.TestCase):
         numCheck = matrix.getMatrix() % 1
         numCheck = np.all(numCheck == 0)
         self.assertEqual(numCheck, False)
+
+    def testCreateRandomSeeded(self):
+        # test that the same seed gives the same matrix, no matter how many threads fill it
+        with patch.object(Matrix, "randomChunkBytes", 800):
+            matrix = Matrix.createRandom(100, 20, False, seed = 5, workers = 1)
+            np.testing.assert_array_equal(Matrix.createRandom(100, 20, False, seed = 5, workers = 4).getMatrix(), matrix.getMatrix())
+            self.assertEqual(np.array_equal(Matrix.createRandom(100, 20, False, seed = 6).getMatrix(), matrix.getMatrix()), False)
+        self.assertEqual(np.all((matrix.getMatrix() >= 0) & (matrix.getMatrix() < 100)), True)
+
+        # test the seed as a Generator, the dtype, and a memory mapped output
+        matrix = Matrix.createRandom(30, 30, True, seed = np.random.default_rng(5), dtype = np.int16)
+        self.assertEqual(matrix.getMatrix().dtype, np.int16)
+        self.assertEqual(np.all((matrix.getMatrix() >= 0) & (matrix.getMatrix() < 100)), True)
+
+        path = os.path.join("matrices", "unitTestRandom" + ".npy")
+        matrix = Matrix.createRandom(30, 30, False, seed = 5, dtype = np.float32, outPath = path)
+        self.assertIsInstance(matrix.getMatrix(), np.memmap)
+        np.testing.assert_array_equal(np.load(path), Matrix.createRandom(30, 30, False, seed = 5, dtype = np.float32).getMatrix())
+        del matrix
+        os.remove(path)
+
+        # test for a seed or dtype that cannot be used
+        self.assertEqual(Matrix.createRandom(2, 2, False, seed = "huh"), None)
+        self.assertEqual(Matrix.createRandom(2, 2, False, dtype = np.int64), None)
+        self.assertEqual(Matrix.createRandom(2, 2, True, dtype = "huh"), None)
         
     def testCreateImport(self):
         # test for import with a path that exists
@@ -77,6 +110,105 @@ class TestMatrixClass(unittest.TestCase):
         matrix = Matrix.createImport(1)
         self.assertEqual(matrix, None)
 
+    @patch('builtins.print')
+    def testCreateImportStream(self, mock_print):
+        # test that a streamed import, in memory or memory mapped, matches the import of the whole file
+        path = os.path.join("matrices", "unitTestStream" + ".csv")
+        outPath = os.path.join("matrices", "unitTestStream" + ".npy")
+        with open(path, "w") as file:
+            file.write("# comment\n1.5,2,3\n\n4,5,6 # comment\n7,8,9e-3")
+        expected = Matrix.createImport(path).getMatrix()
+
+        for chunkBytes in [1, 5, 16, 1024]:
+            matrix = Matrix.createImport(path, chunkBytes = chunkBytes)
+            np.testing.assert_array_equal(matrix.getMatrix(), expected)
+
+        matrix = Matrix.createImport(path, chunkBytes = 8, outPath = outPath, report = True)
+        self.assertIsInstance(matrix.getMatrix(), np.memmap)
+        np.testing.assert_array_equal(matrix.getMatrix(), expected)
+        self.assertIn("rows/second", mock_print.call_args[0][0])
+        del matrix
+        np.testing.assert_array_equal(Matrix.createLoad(outPath).getMatrix(), expected)
+        os.remove(outPath)
+
+        # test that a file with rows of different lengths is not imported, and leaves no output file
+        with open(path, "w") as file:
+            file.write("1,2,3\n4,5\n")
+        self.assertEqual(Matrix.createImport(path, chunkBytes = 4, outPath = outPath), None)
+        self.assertEqual(os.path.exists(outPath), False)
+        os.remove(path)
+
+    def testCreateImportParallel(self):
+        # test that a import parsed by several processes is bit identical to the serial import
+        path = os.path.join("matrices", "unitTestParallel" + ".csv")
+        outPath = os.path.join("matrices", "unitTestParallel" + ".npy")
+        rng = np.random.default_rng(10)
+        np.savetxt(path, rng.standard_normal((500, 7)) * 10.0 ** rng.integers(-8, 8, (500, 7)), delimiter=",")
+        expected = Matrix.createImport(path).getMatrix()
+
+        # test that a file too small to give each process a large chunk is parsed without starting processes
+        with patch('script.ProcessPoolExecutor') as mock_pool:
+            matrix = Matrix.createImport(path, workers = 2)
+            mock_pool.assert_not_called()
+        np.testing.assert_array_equal(matrix.getMatrix().view(np.int64), expected.view(np.int64))
+
+        # smaller chunks, so the small test file is split between the processes
+        minChunkBytes = Matrix.importMinChunkBytes
+        Matrix.importMinChunkBytes = 1024
+        self.addCleanup(setattr, Matrix, "importMinChunkBytes", minChunkBytes)
+
+        matrix = Matrix.createImport(path, workers = 2)
+        np.testing.assert_array_equal(matrix.getMatrix().view(np.int64), expected.view(np.int64))
+
+        matrix = Matrix.createImport(path, outPath = outPath, workers = 3)
+        np.testing.assert_array_equal(np.asarray(matrix.getMatrix()).view(np.int64), expected.view(np.int64))
+        del matrix
+        os.remove(outPath)
+
+        # test that a error in a worker is returned as a failed import
+        with open(path, "a") as file:
+            file.write("1,2\n")
+        self.assertEqual(Matrix.createImport(path, outPath = outPath, workers = 2), None)
+        self.assertEqual(os.path.exists(outPath), False)
+        os.remove(path)
+
+    def testCreateLoad(self):
+        # test for loading a matrix saved in the binary format, memory mapped and not
+        path = os.path.join("matrices", "unitTest" + ".npy")
+        np.save(path, self.matrix2.getMatrix())
+
+        matrix = Matrix.createLoad(path)
+        self.assertIsInstance(matrix.getMatrix(), np.memmap)
+        np.testing.assert_allclose(matrix.getMatrix(), self.matrix2.getMatrix())
+
+        matrix = Matrix.createLoad(path, mmap = False)
+        self.assertNotIsInstance(matrix.getMatrix(), np.memmap)
+        np.testing.assert_allclose(matrix.getMatrix(), self.matrix2.getMatrix())
+        os.remove(path)
+
+        # test for loading a path that does not exist or is not a binary file
+        self.assertEqual(Matrix.createLoad(path), None)
+        self.assertEqual(Matrix.createLoad(self.path), None)
+
+    def testCreateImportSparse(self):
+        # test for import of row, column, value triplets, with repeated entries summed
+        path = os.path.join("matrices", "unitTestSparse" + ".csv")
+        np.savetxt(path, [[0, 1, 2.5], [2, 0, 1], [2, 0, 3]], delimiter=",")
+
+        matrix = Matrix.createImportSparse(path)
+        self.assertEqual(matrix.isSparse(), True)
+        np.testing.assert_allclose(matrix.toDense().getMatrix(), [[0, 2.5], [0, 0], [4, 0]])
+
+        matrix = Matrix.createImportSparse(path, 4, 5)
+        self.assertEqual((matrix.getRows(), matrix.getCols()), (4, 5))
+
+        # test for import of triplets outside of the given shape, non whole number rows, and a incorrect path
+        self.assertEqual(Matrix.createImportSparse(path, 2, 2), None)
+        np.savetxt(path, [[0.5, 1, 2]], delimiter=",")
+        self.assertEqual(Matrix.createImportSparse(path), None)
+        self.assertEqual(Matrix.createImportSparse(1), None)
+        os.remove(path)
+
     def testCreateManual(self):
         # check for invalid inputs on create call
         matrix = Matrix.createManual(1)
@@ -112,12 +244,139 @@ class TestMatrixClass(unittest.TestCase):
 
     def testMultiply(self):
         # test for Matrix multiplication
-        mult = np.multiply(np.array([[1,2,3]]), np.array([[1],[2],[3]]))
+        mult = np.matmul(np.array([[1,2,3]]), np.array([[1],[2],[3]]))
         matrix = self.matrix1.multiply(self.matrix1.transpose())
         np.testing.assert_allclose(matrix.getMatrix(), mult)
 
+        mult = np.matmul(self.matrix2.getMatrix(), self.matrix2.getMatrix())
+        np.testing.assert_allclose(self.matrix2.multiply(self.matrix2).getMatrix(), mult)
+
         # test for invalid multiplication
         self.assertEqual(self.matrix1.multiply(self.matrix1), None)
+        self.assertEqual(self.matrix2.multiply(self.matrix2, blockSize = 0), None)
+
+    def testTiledMultiply(self):
+        # test that a tiled product matches the in memory product, including tiles cut short at the edges
+        matrixA = Matrix(np.random.uniform(size=(7,5)))
+        matrixB = Matrix(np.random.uniform(size=(5,6)))
+        mult = np.matmul(matrixA.getMatrix(), matrixB.getMatrix())
+
+        matrix = matrixA.multiply(matrixB, blockSize = 2)
+        self.assertIsInstance(matrix.getMatrix(), np.memmap)
+        np.testing.assert_allclose(matrix.getMatrix(), mult)
+
+        # test that the product can be written to a .npy file
+        path = os.path.join("matrices", "unitTestProduct" + ".npy")
+        matrix = matrixA.multiply(matrixB, blockSize = 3, outPath = path)
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), mult)
+        del matrix
+        os.remove(path)
+
+        # test that memory mapped matrices larger than the limit are multiplied in tiles
+        path = os.path.join("matrices", "unitTestMapped" + ".npy")
+        np.save(path, matrixA.getMatrix())
+        mappedA = Matrix.createLoad(path)
+        outOfCoreBytes = Matrix.outOfCoreBytes
+        try:
+            Matrix.outOfCoreBytes = 0
+            matrix = mappedA.multiply(matrixB)
+            self.assertIsInstance(matrix.getMatrix(), np.memmap)
+            np.testing.assert_allclose(matrix.getMatrix(), mult)
+        finally:
+            Matrix.outOfCoreBytes = outOfCoreBytes
+
+        self.assertNotIsInstance(mappedA.multiply(matrixB).getMatrix(), np.memmap)
+        del mappedA
+        os.remove(path)
+
+    def testExpression(self):
+        # test that the operators build a expression that gives the same result as numpy once evaluated
+        rng = np.random.default_rng(13)
+        npA, npB, npC = rng.random((70, 40)), rng.random((70, 40)), rng.random((40, 70))
+        matrixA, matrixB, matrixC = Matrix(npA), Matrix(npB), Matrix(npC)
+
+        expression = matrixA + matrixB - 2 * matrixA * matrixB + matrixC.T - 1
+        self.assertIsInstance(expression, MatrixExpression)
+        self.assertEqual(expression.getShape(), (70, 40))
+        np.testing.assert_allclose(expression.evaluate().getMatrix(), npA + npB - 2 * npA * npB + npC.T - 1)
+
+        # test that products and transposes of sub expressions are found, with chunks smaller than the matrices
+        with patch.object(MatrixExpression, "chunkBytes", 1000):
+            expression = (matrixA @ matrixC).T - (matrixB - (matrixA - matrixB * np.float64(3))) @ matrixC
+            np.testing.assert_allclose(expression.evaluate().getMatrix(), (npA @ npC).T - (npB - (npA - npB * 3)) @ npC)
+
+        # test that sums of sparse matrices stay sparse
+        sparse = Matrix(np.identity(4)).toSparse()
+        self.assertEqual((sparse + sparse - sparse.T).evaluate().isSparse(), True)
+        np.testing.assert_allclose((sparse * 3 + 1).evaluate().getMatrix(), np.identity(4) * 3 + 1)
+
+        # test that a sparse matrix in a dense expression is read a chunk of rows at a time, without converting it
+        npSparse = np.where(npA > 0.8, npA, 0)
+        with patch.object(MatrixExpression, "chunkBytes", 1000), patch.object(SparseArray, "toDense", side_effect = AssertionError):
+            expression = Matrix(npSparse).toSparse() * matrixB + 1 - matrixC.T
+            np.testing.assert_allclose(expression.evaluate().getMatrix(), npSparse * npB + 1 - npC.T)
+
+        # test that matrices that do not match raise a error as the expression is built
+        with self.assertRaises(ValueError):
+            matrixA + matrixC
+        with self.assertRaises(ValueError):
+            matrixA @ matrixB
+
+    @patch('builtins.print')
+    def testInPlace(self, mock_print):
+        # test that the in place operations change the matrix and forget its old factorization
+        rng = np.random.default_rng(14)
+        npA, npB = rng.random((30, 30)), rng.random((30, 30))
+        matrixA, matrixB = Matrix(npA.copy()), Matrix(npB)
+        matrixA.determinate()
+
+        self.assertIs(matrixA.add_(matrixB), matrixA)
+        self.assertAlmostEqual(matrixA.determinate(), np.linalg.det(npA + npB))
+        matrixA.subtract_(matrixB).scale_(3)
+        np.testing.assert_allclose(matrixA.getMatrix(), npA * 3)
+        self.assertEqual(matrixA.isDiagonal(), False)
+        matrixA.scale_(0)
+        self.assertEqual(matrixA.isDiagonal(), True)
+
+        # test that matrices that cannot hold the result, or are read only, are not changed
+        matrix = Matrix.createManual([[1,2],[3,4]])
+        self.assertEqual(matrix.add_(Matrix(np.full((2, 2), 0.5))), None)
+        self.assertEqual(matrix.scale_("huh"), None)
+        readOnly = Matrix(np.zeros((2, 2)))
+        readOnly.getMatrix().flags.writeable = False
+        self.assertEqual(readOnly.add_(matrix), None)
+        self.assertEqual(matrix.toSparse().scale_(2), None)
+        np.testing.assert_array_equal(matrix.getMatrix(), [[1,2],[3,4]])
+
+    def testOut(self):
+        # test that results are written into the given matrix
+        rng = np.random.default_rng(15)
+        npA, npB = rng.random((20, 20)) + np.identity(20) * 20, rng.random((20, 20))
+        matrixA, matrixB = Matrix(npA), Matrix(npB)
+        out = Matrix(np.empty((20, 20)))
+
+        self.assertIs(matrixA.add(matrixB, out = out), out)
+        np.testing.assert_allclose(out.getMatrix(), npA + npB)
+        matrixA.subtract(matrixB.toSparse(), out = out)
+        np.testing.assert_allclose(out.getMatrix(), npA - npB)
+        matrixA.multiply(matrixB, out = out)
+        np.testing.assert_allclose(out.getMatrix(), npA @ npB)
+        matrixA.transpose(out = out)
+        np.testing.assert_allclose(out.getMatrix(), npA.T)
+
+        # test the inverse of each structure, and a matrix written into itself
+        for npMatrix in [npA, np.triu(npA), np.tril(npA), np.diag(np.diagonal(npA)), npA @ npA.T]:
+            Matrix(npMatrix).inverse(out = out)
+            np.testing.assert_allclose(out.getMatrix(), np.linalg.inv(npMatrix), atol = 1e-12)
+        matrix = Matrix(npA.copy())
+        matrix.inverse(out = matrix)
+        np.testing.assert_allclose(matrix.getMatrix(), np.linalg.inv(npA))
+
+        # test that a output with the wrong shape or dtype is not used
+        with patch('builtins.print'):
+            self.assertEqual(matrixA.multiply(matrixB, out = Matrix(np.empty((20, 3)))), None)
+            self.assertEqual(matrixA.inverse(out = Matrix(np.empty((20, 20), dtype = int))), None)
+            self.assertEqual(matrixA.add(matrixB, out = matrixB.toSparse()), None)
 
     def testTranspose(self):
         # test for Matrix Transposition
@@ -127,7 +386,17 @@ class TestMatrixClass(unittest.TestCase):
     def testDeterminate(self):
         # test for getting a Determinate
         det = self.matrix2.determinate()
-        self.assertEqual(det, np.linalg.det(np.array([[1,2,3],[4,5,6],[7,8,9]])))
+        self.assertAlmostEqual(det, np.linalg.det(np.array([[1,2,3],[4,5,6],[7,8,9]])))
+
+        det = Matrix.createManual([[1,2,3],[4,5,6],[7,8,11]]).determinate()
+        self.assertAlmostEqual(det, np.linalg.det(np.array([[1,2,3],[4,5,6],[7,8,11]])))
+
+        nMat = np.random.uniform(size=(150,150))
+        self.assertAlmostEqual(Matrix(nMat).determinate() / np.linalg.det(nMat), 1)
+
+        # test that the determinate of a 32 bit matrix without a structure is 32 bit, and that a overflow is inf
+        self.assertEqual(Matrix(nMat.astype(np.float32)).determinate().dtype, np.float32)
+        self.assertEqual(Matrix(np.random.uniform(size=(300,300)) * 1e6).determinate() in (np.inf, -np.inf), True)
 
         # test for trying to get a determinate from a invalid matrix
         self.assertEqual(self.matrix1.determinate(), None)
@@ -143,6 +412,90 @@ class TestMatrixClass(unittest.TestCase):
         inv = np.linalg.inv(np.array([[1,2,3],[4,5,6],[7,8,11]]))
         np.testing.assert_allclose(Matrix.createManual([[1,2,3],[4,5,6],[7,8,11]]).inverse().getMatrix(), inv)
 
+    def testSolve(self):
+        # test for solving a linear system, more than one block of rows large
+        nMat = np.random.uniform(size=(150,150))
+        nB = np.random.uniform(size=(150,2))
+        matrix = Matrix(nMat)
+        np.testing.assert_allclose(matrix.solve(Matrix(nB)).getMatrix(), np.linalg.solve(nMat, nB))
+
+        # test that the factorization of the first solve is reused by the later operations
+        with patch.object(Matrix, "_Matrix__luDecompose", side_effect=AssertionError("factored twice")):
+            np.testing.assert_allclose(matrix.inverse().getMatrix(), np.linalg.inv(nMat))
+            self.assertAlmostEqual(matrix.determinate() / np.linalg.det(nMat), 1)
+            np.testing.assert_allclose(matrix.solve(Matrix(nB[:, :1])).getMatrix(), np.linalg.solve(nMat, nB[:, :1]))
+
+        # test that a matrix with a rank lower than its size is singular
+        lowRank = Matrix(np.matmul(nMat[:, :100], nMat[:100]))
+        with patch('builtins.print'):
+            self.assertEqual(lowRank.inverse(), None)
+            self.assertEqual(lowRank.solve(Matrix(nB)), None)
+
+        # test for a complex system
+        cMat = nMat[:20,:20] + 1j * nMat[20:40,:20]
+        np.testing.assert_allclose(Matrix(cMat).solve(Matrix(nB[:20])).getMatrix(), np.linalg.solve(cMat, nB[:20]))
+
+        # test for a singular, non square, and mismatched system
+        self.assertEqual(self.matrix2.solve(self.matrix2), None)
+        self.assertEqual(self.matrix1.solve(self.matrix1), None)
+        self.assertEqual(matrix.solve(self.matrix2), None)
+
+    def testStructure(self):
+        # test the structure checks on matrices larger than one block of rows
+        nMat = np.random.uniform(size=(150,150))
+        spd = np.matmul(nMat, nMat.T) + 150 * np.identity(150)
+
+        checks = [(nMat, (False, False, False, False, False)),
+                  (np.triu(nMat), (False, True, False, False, False)),
+                  (np.tril(nMat), (False, False, True, False, False)),
+                  (np.diag(np.diag(nMat)), (True, True, True, True, True)),
+                  (nMat + nMat.T, (True, False, False, False, False)),
+                  (spd, (True, False, False, False, True))]
+
+        for npMatrix, expected in checks:
+            matrix = Matrix(npMatrix)
+            self.assertEqual((matrix.isSymmetric(), matrix.isUpperTriangular(), matrix.isLowerTriangular(),
+                              matrix.isDiagonal(), matrix.isPositiveDefinite()), expected)
+
+        # test that a value past the first block is checked
+        nMat = np.triu(nMat)
+        nMat[140, 2] = 1
+        self.assertEqual(Matrix(nMat).isUpperTriangular(), False)
+
+        # test that non square matrices have no structure
+        self.assertEqual(self.matrix1.isSymmetric(), False)
+        self.assertEqual(self.matrix1.isDiagonal(), False)
+
+    def testStructuredKernels(self):
+        # test that the structure specific kernels match the general ones
+        nMat = np.random.uniform(size=(100,100)) + np.identity(100)
+        nB = np.random.uniform(size=(100,3))
+        spd = np.matmul(nMat, nMat.T) / 100 + np.identity(100)
+
+        for npMatrix in (np.triu(nMat), np.tril(nMat), np.diag(np.diag(nMat)), spd):
+            matrix = Matrix(npMatrix)
+            self.assertAlmostEqual(matrix.determinate() / np.linalg.det(npMatrix), 1)
+            np.testing.assert_allclose(matrix.inverse().getMatrix(), np.linalg.inv(npMatrix), atol=1e-12)
+            np.testing.assert_allclose(matrix.solve(Matrix(nB)).getMatrix(), np.linalg.solve(npMatrix, nB))
+            np.testing.assert_allclose(matrix.multiply(Matrix(nMat)).getMatrix(), np.matmul(npMatrix, nMat))
+            np.testing.assert_allclose(Matrix(nMat).multiply(matrix).getMatrix(), np.matmul(nMat, npMatrix))
+
+        # test that singular diagonal and triangular matrices have no inverse
+        self.assertEqual(Matrix(np.diag([1.0, 0.0, 2.0])).inverse(), None)
+        self.assertEqual(Matrix(np.triu(self.matrix2.getMatrix()) - np.diag([0,5,0])).inverse(), None)
+
+        # test the eigen values of diagonal and triangular matrices
+        dMat = np.diag([3.0, 1.0, 2.0])
+        matEig = Matrix(dMat).eigenDecomp()
+        neVal, neVec = np.linalg.eigh(dMat)
+        np.testing.assert_allclose(matEig[0].getMatrix(), dMat)
+        np.testing.assert_allclose(matEig[1].getMatrix(), neVec)
+        np.testing.assert_allclose(matEig[2].getMatrix(), np.array([neVal]))
+
+        tMat = np.triu(nMat[:5,:5])
+        matEig = Matrix(tMat).eigenDecomp(valuesOnly = True)
+        np.testing.assert_allclose(np.sort(matEig[2].getMatrix()[0]), np.sort(np.linalg.eigvals(tMat).real))
+
     def testIdentity(self):
         # test for invalid Matrix
         matrix = Matrix("huh")
@@ -180,6 +533,85 @@ class TestMatrixClass(unittest.TestCase):
         np.testing.assert_allclose(matEig[1].getMatrix(), neVec)
         np.testing.assert_allclose(matEig[2].getMatrix(), neValMat)
 
+        # test for eigen decomposition of a symmetric matrix
+        sMat = np.array([[2,1,0],[1,3,1],[0,1,4]])
+        seVal, seVec = np.linalg.eigh(sMat)
+        matEig = Matrix(sMat).eigenDecomp()
+        np.testing.assert_allclose(matEig[0].getMatrix(), sMat, atol=1e-12)
+        np.testing.assert_allclose(matEig[1].getMatrix(), seVec)
+        np.testing.assert_allclose(matEig[2].getMatrix(), np.array([seVal]))
+
+        # test for only finding the eigen values
+        matEig = self.matrix2.eigenDecomp(valuesOnly = True)
+        self.assertEqual(matEig[0], None)
+        self.assertEqual(matEig[1], None)
+        np.testing.assert_allclose(matEig[2].getMatrix(), neValMat)
+
+        # test for skipping the reconstruction
+        matEig = self.matrix2.eigenDecomp(reconstruct = False)
+        self.assertEqual(matEig[0], None)
+        np.testing.assert_allclose(matEig[1].getMatrix(), neVec)
+
+        # test that defective matrices, whose eigen vectors are not independent, have eigen values but no decomposition
+        with patch('builtins.print'):
+            matEig = Matrix.createManual([[1,1],[0,1]]).eigenDecomp()
+            self.assertEqual(Matrix.createManual([[2,1,0],[0,2,0],[0,0,3]]).eigenDecomp()[0], None)
+        self.assertEqual(matEig[0], None)
+        np.testing.assert_allclose(matEig[2].getMatrix(), np.array([[1.0, 1.0]]))
+
+        # test for a non square matrix
+        self.assertEqual(self.matrix1.eigenDecomp(), None)
+
+    def testSparseOperations(self):
+        # test that sparse operations match the dense results, and stay sparse while the result is sparse
+        rng = np.random.default_rng(8)
+        denseA = rng.random((40, 30)) * (rng.random((40, 30)) < 0.05)
+        denseB = rng.random((40, 30)) * (rng.random((40, 30)) < 0.05)
+        denseC = rng.random((30, 20)) * (rng.random((30, 20)) < 0.05)
+        sparseA = Matrix(SparseArray.fromDense(denseA))
+        sparseB = Matrix(SparseArray.fromDense(denseB))
+        sparseC = Matrix(SparseArray.fromDense(denseC))
+        self.assertEqual(sparseA.getMatrix().getNnz(), np.count_nonzero(denseA))
+
+        result = sparseA.add(sparseB)
+        self.assertEqual(result.isSparse(), True)
+        np.testing.assert_allclose(result.toDense().getMatrix(), denseA + denseB)
+
+        result = sparseA.subtract(sparseB)
+        self.assertEqual(result.isSparse(), True)
+        np.testing.assert_allclose(result.toDense().getMatrix(), denseA - denseB)
+
+        result = sparseA.multiply(sparseC)
+        self.assertEqual(result.isSparse(), True)
+        np.testing.assert_allclose(result.toDense().getMatrix(), denseA @ denseC)
+
+        result = sparseA.transpose()
+        self.assertEqual(result.isSparse(), True)
+        np.testing.assert_allclose(result.toDense().getMatrix(), denseA.T)
+
+        # test the matrix vector product and products with dense matrices
+        vector = Matrix(rng.random((30, 1)))
+        np.testing.assert_allclose(sparseA.multiply(vector).getMatrix(), denseA @ vector.getMatrix())
+        np.testing.assert_allclose(Matrix(denseC.T).multiply(sparseA.transpose()).getMatrix(), denseC.T @ denseA.T)
+
+        # test that a result above the density threshold is turned into a dense matrix
+        result = sparseA.add(Matrix(np.ones((40, 30))))
+        self.assertEqual(result.isSparse(), False)
+        np.testing.assert_allclose(result.getMatrix(), denseA + 1)
+
+        # test the structure checks and sparse identity
+        self.assertEqual(sparseA.isSymmetric(), False)
+        symmetric = Matrix(SparseArray.fromDense(denseC[:20] + denseC[:20].T))
+        self.assertEqual(symmetric.isSymmetric(), True)
+        self.assertEqual(symmetric.identity().isSparse(), True)
+        np.testing.assert_allclose(symmetric.identity().toDense().getMatrix(), np.identity(20))
+
+        # test that a sparse matrix can be exported as triplets
+        path = os.path.join("matrices", "unitTestExport" + ".csv")
+        self.assertEqual(sparseA.exportCSV(path), True)
+        np.testing.assert_allclose(Matrix.createImportSparse(path, 40, 30).toDense().getMatrix(), denseA)
+        os.remove(path)
+
     def testGetMatrix(self):
         # test for invalid matrix providing None of through all Getters
         matrix = Matrix("huh")
@@ -212,6 +644,100 @@ class TestMatrixClass(unittest.TestCase):
         self.matrix1.showVisualization()
         mock_show.assert_called_once()
 
+    def testHeatmapFile(self):
+        # test that large matrices are pooled into a image written to a PNG file
+        path = os.path.join("matrices", "unitTestHeatmap" + ".png")
+        matrix = Matrix.createRandom(300, 200, False, seed = 16)
+        with patch.object(Matrix, "heatmapCells", 50):
+            self.assertEqual(matrix.showVisualization(path, pooling = "max"), True)
+        with open(path, "rb") as file:
+            self.assertEqual(file.read(4), b"\x89PNG")
+        os.remove(path)
+
+        # test that small matrices are written with their values, and a unknown pooling is not used
+        self.assertEqual(self.matrix2.showVisualization(path), True)
+        os.remove(path)
+        self.assertEqual(matrix.showVisualization(path, pooling = "huh"), None)
+        self.assertEqual(os.path.exists(path), False)
+
+    def testPooledMatrix(self):
+        # test that blocks of values are pooled into their mean and max, with smaller blocks at the edges
+        npMatrix = np.arange(35, dtype = float).reshape(5, 7)
+        matrix = Matrix(npMatrix)
+        np.testing.assert_allclose(matrix.pooledMatrix(3), [[4.5, 7.5, 9.5], [18.5, 21.5, 23.5], [29, 32, 34]])
+        np.testing.assert_allclose(matrix.pooledMatrix(3, "max"), [[9, 12, 13], [23, 26, 27], [30, 33, 34]])
+        np.testing.assert_allclose(matrix.pooledMatrix(10), npMatrix)
+
+        # test that sparse matrices pool the same as dense matrices, counting the values that are not stored
+        npMatrix = np.where(npMatrix % 4 == 0, -npMatrix, 0)
+        sparse = Matrix(npMatrix).toSparse()
+        np.testing.assert_allclose(sparse.pooledMatrix(3), Matrix(npMatrix).pooledMatrix(3))
+        np.testing.assert_allclose(sparse.pooledMatrix(3, "max"), Matrix(npMatrix).pooledMatrix(3, "max"))
+
+    def testExportCSV(self):
+        # test to see that a exported matrix can be imported again
+        path = os.path.join("matrices", "unitTestExport" + ".csv")
+        self.assertEqual(self.matrix2.exportCSV(path), True)
+        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.matrix2.getMatrix())
+        os.remove(path)
+
+        # test for exporting a invalid matrix
+        self.assertEqual(Matrix("huh").exportCSV(path), None)
+        self.assertEqual(os.path.exists(path), False)
+
+    @patch('builtins.print')
+    def testDtypes(self, mock_print):
+        # test that whole numbers stay int64, and float32 values are unchanged, through a export and import
+        path = os.path.join("matrices", "unitTestDtype" + ".csv")
+        self.assertEqual(self.matrix2.getMatrix().dtype, np.int64)
+        self.matrix2.exportCSV(path)
+        self.assertEqual(Matrix.createImport(path).getMatrix().dtype, np.int64)
+        self.assertEqual(Matrix.createImport(path, chunkBytes = 4).getMatrix().dtype, np.int64)
+
+        matrix = Matrix.createRandom(20, 20, False, seed = 3, dtype = np.float32)
+        matrix.exportCSV(path)
+        imported = Matrix.createImport(path, dtype = "float32")
+        self.assertEqual(imported.getMatrix().dtype, np.float32)
+        np.testing.assert_array_equal(imported.getMatrix(), matrix.getMatrix())
+        self.assertEqual(Matrix.createImport(path).getMatrix().dtype, np.float64)
+
+        # test that whole numbers too large for int64 are imported as float64
+        with open(path, "w") as file:
+            file.write("99999999999999999999999,1\n")
+        self.assertEqual(Matrix.createImport(path).getMatrix().dtype, np.float64)
+
+        # test that sparse matrices keep their whole number values
+        self.matrix2.toSparse().exportCSV(path)
+        sparse = Matrix.createImportSparse(path)
+        self.assertEqual(sparse.getMatrix().dtype, np.int64)
+        self.assertEqual(Matrix.createImportSparse(path, dtype = np.float32).getMatrix().dtype, np.float32)
+        os.remove(path)
+
+        # test that the operations on float32 matrices give float32 results
+        matrix = Matrix.createManual([[4,1],[1,3]], dtype = np.float32)
+        for result in [matrix.inverse(), matrix.solve(matrix), matrix.multiply(matrix), matrix.add(matrix),
+                       matrix.transpose(), matrix.identity()] + matrix.eigenDecomp():
+            self.assertEqual(result.getMatrix().dtype, np.float32)
+        self.assertEqual(matrix.determinate().dtype, np.float32)
+        np.testing.assert_allclose(matrix.inverse().getMatrix(), np.linalg.inv([[4,1],[1,3]]), rtol = 1e-6)
+
+        # test that whole numbers give float64 results for the operations that are not whole numbers
+        self.assertEqual(self.matrix2.inverse(), None)
+        self.assertEqual(Matrix.createManual([[4,1],[1,3]]).inverse().getMatrix().dtype, np.float64)
+
+        # test converting between dtypes
+        self.assertEqual(self.matrix2.toDtype("float32").getMatrix().dtype, np.float32)
+        self.assertEqual(Matrix.createManual([[0.5,2]]).toSparse().toDtype(np.int32).getMatrix().getNnz(), 1)
+        self.assertEqual(self.matrix2.toDtype("huh"), None)
+        self.assertEqual(Matrix.createManual([[1j]]).toDtype(np.float64), None)
+        self.assertEqual(Matrix.createManual([[1,2]], dtype = "huh"), None)
+
+    def testLazyPlottingImport(self):
+        # test that importing the script does not import the plotting libraries
+        code = "import sys, script; print('seaborn' in sys.modules or 'matplotlib' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        self.assertEqual(output.stdout.strip(), "False")
+
     @patch('builtins.print')
     def testPrintMatrix(self, mock_print):
         # test to see that program does not crash when you try to print a null Matrix
@@ -223,6 +749,798 @@ class TestMatrixClass(unittest.TestCase):
         self.matrix1.printMatrix()
         mock_print.assert_called_with('[[1 2 3]]')
 
+    @patch('builtins.print')
+    def testPrintLargeMatrix(self, mock_print):
+        # test that a large matrix is printed as a summary of its first and last values and its statistics
+        npMatrix = np.arange(5000).reshape(50, 100)
+        Matrix(npMatrix).printMatrix()
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        self.assertEqual(printed[0], "50 x 100 matrix of int64")
+        self.assertIn("...", printed[1])
+        self.assertIn("4999", printed[1])
+        self.assertEqual(printed[2], "min 0, max 4999, mean 2499.5, std 1443.38")
+
+        # test that pages of rows are printed one row at a time
+        mock_print.reset_mock()
+        Matrix(npMatrix).printMatrix(mode = "page", start = 48, rows = 5)
+        self.assertEqual(mock_print.call_count, 2)
+        self.assertEqual(mock_print.call_args[0][0], np.array2string(npMatrix[49], threshold = 101, max_line_width = np.inf))
+
+        mock_print.reset_mock()
+        Matrix(npMatrix).toSparse().printMatrix(mode = "full")
+        self.assertEqual(mock_print.call_count, 50)
+
+    def testStatistics(self):
+        # test that the statistics of dense, memory mapped, and sparse matrices match numpy
+        npMatrix = np.random.default_rng(17).standard_normal((300, 200))
+        npMatrix[npMatrix < 1] = 0
+        path = os.path.join("matrices", "unitTestStatistics" + ".npy")
+        np.save(path, npMatrix)
+
+        for matrix in [Matrix(npMatrix), Matrix.createLoad(path), Matrix(npMatrix).toSparse()]:
+            with patch.object(Matrix, "blockSize", 50):
+                statistics = matrix.statistics()
+            self.assertAlmostEqual(statistics["min"], npMatrix.min())
+            self.assertAlmostEqual(statistics["max"], npMatrix.max())
+            self.assertAlmostEqual(statistics["mean"], npMatrix.mean())
+            self.assertAlmostEqual(statistics["std"], npMatrix.std())
+        del matrix
+        os.remove(path)
+
+    def testEstimateMemory(self):
+        # test the estimates of the operations that only allocate their result
+        self.assertEqual(Matrix.estimateMemory("add", (10, 20), (10, 20)), 1600)
+        self.assertEqual(Matrix.estimateMemory("multiply", (10, 20), (20, 5), dtype = np.complex128), 800)
+        self.assertEqual(Matrix.estimateMemory("transpose", (10, 20)), 0)
+
+        # test that the general structure is never below the others
+        for operation in ["determinate", "inverse", "eigenDecomp"]:
+            general = Matrix.estimateMemory(operation, (50, 50))
+            for structure in ["diagonal", "upper", "lower", "positiveDefinite", "symmetric"]:
+                self.assertLessEqual(Matrix.estimateMemory(operation, (50, 50), structure = structure), general)
+
+    @patch('builtins.print')
+    def testEstimateMemoryInvalid(self, mock_print):
+        self.assertEqual(Matrix.estimateMemory("power", (10, 10)), None)
+        self.assertEqual(Matrix.estimateMemory("add", (10, 10)), None)
+        self.assertEqual(Matrix.estimateMemory("inverse", (10, 10), structure = "sparse"), None)
+
+    def testEstimateMemoryTraced(self):
+        # test that the estimates are above the memory traced while running the operations
+        values = np.random.default_rng(0).random((300, 300))
+        matrices = {"general": values, "symmetric": values + values.T, "upper": np.triu(values) + np.identity(300)}
+        runs = {"inverse": ({}, lambda matrix: matrix.inverse()),
+                "solve": ({"shapeB": (300, 300)}, lambda matrix: matrix.solve(Matrix(values))),
+                "eigenDecomp": ({}, lambda matrix: matrix.eigenDecomp())}
+
+        for structure, npMatrix in matrices.items():
+            for operation, (arguments, run) in runs.items():
+                matrix = Matrix(npMatrix.copy())
+                tracemalloc.start()
+                with patch('builtins.print'):
+                    run(matrix)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.assertLessEqual(peak, Matrix.estimateMemory(operation, (300, 300), structure = structure, **arguments))
+
+# %%
+class TestMatrixBatchClass(unittest.TestCase):
+
+    def setUp(self):
+        # a batch of random matrices, with a singular matrix and a zero matrix
+        rng = np.random.default_rng(11)
+        self.npBatch = rng.random((50, 3, 3))
+        self.npBatch[4] = [[1,2,3],[4,5,6],[7,8,9]]
+        self.npBatch[9] = 0
+        self.batch = MatrixBatch(self.npBatch)
+
+    def testFromToMatrices(self):
+        # test that the matrices of a batch are views, and turning them back into a batch does not copy
+        matrices = self.batch.toMatrices()
+        self.assertEqual(len(matrices), 50)
+        self.assertIs(matrices[3].getMatrix().base, self.npBatch)
+        self.assertIs(MatrixBatch.fromMatrices(matrices[2:6]).getBatch().base, self.npBatch)
+
+        # test that matrices that are not views of a batch are copied into a new one
+        batch = MatrixBatch.fromMatrices([Matrix.createManual([[1,2]]), Matrix.createManual([[3,4]])])
+        np.testing.assert_allclose(batch.getBatch(), [[[1,2]], [[3,4]]])
+        self.assertEqual(MatrixBatch.fromMatrices(matrices[::2]).getBatch().base is self.npBatch, False)
+
+        # test that matrices of different shapes or a empty list are not made into a batch
+        self.assertEqual(MatrixBatch.fromMatrices([Matrix.createManual([[1,2]]), Matrix.createManual([[3]])]), None)
+        self.assertEqual(MatrixBatch.fromMatrices([]), None)
+
+    def testOperations(self):
+        # test that each operation matches the operation of each matrix on its own
+        other = MatrixBatch(self.npBatch * 2)
+        np.testing.assert_allclose(self.batch.add(other).getBatch(), self.npBatch * 3)
+        np.testing.assert_allclose(self.batch.subtract(other).getBatch(), -self.npBatch)
+        np.testing.assert_allclose(self.batch.multiply(other).getBatch(), self.npBatch @ (self.npBatch * 2))
+        np.testing.assert_allclose(self.batch.transpose().getBatch(), np.swapaxes(self.npBatch, 1, 2))
+
+        # test that a single Matrix is used for every matrix of the batch
+        identity = Matrix(np.identity(3))
+        np.testing.assert_allclose(self.batch.multiply(identity).getBatch(), self.npBatch)
+        np.testing.assert_allclose(self.batch.add(identity).getBatch(), self.npBatch + np.identity(3))
+
+        # test that batches that do not match are not used
+        self.assertEqual(self.batch.add(MatrixBatch(self.npBatch[:3])), None)
+        self.assertEqual(self.batch.multiply(Matrix(np.ones((2, 2)))), None)
+
+    def testDeterminateInverse(self):
+        # test that the determinates match the Matrix class
+        determinates = self.batch.determinate()
+        for i in range(50):
+            self.assertAlmostEqual(determinates[i], Matrix(self.npBatch[i]).determinate())
+
+        # test that singular matrices are marked as not valid instead of stopping the batch
+        inverse = self.batch.inverse()
+        self.assertEqual(list(np.flatnonzero(~inverse.getValid())), [4, 9])
+        valid = inverse.getValid()
+        np.testing.assert_allclose(inverse.getBatch()[valid] @ self.npBatch[valid], np.broadcast_to(np.identity(3), (48, 3, 3)), atol = 1e-8)
+
+        # test that not valid matrices stay not valid, and non square matrices are not used
+        self.assertEqual(inverse.add(self.batch).getValid().sum(), 48)
+        self.assertEqual(np.isnan(inverse.determinate()).sum(), 2)
+        self.assertEqual(MatrixBatch(np.ones((2, 2, 3))).inverse(), None)
+
+    def testEigenDecomp(self):
+        # test the decomposition of symmetric and non symmetric matrices
+        symmetric = self.npBatch + np.swapaxes(self.npBatch, 1, 2)
+        decomposition, vectors, values = MatrixBatch(symmetric).eigenDecomp()
+        np.testing.assert_allclose(decomposition.getBatch(), symmetric, atol = 1e-10)
+        np.testing.assert_allclose(values.getBatch()[:, 0], np.linalg.eigvalsh(symmetric), atol = 1e-10)
+
+        decomposition, vectors, values = self.batch.eigenDecomp()
+        valid = decomposition.getValid()
+        np.testing.assert_allclose(decomposition.getBatch()[valid], self.npBatch[valid], atol = 1e-8)
+
+        # test that only the values are found when asked for
+        decomposition, vectors, values = self.batch.eigenDecomp(valuesOnly = True)
+        self.assertEqual((decomposition, vectors), (None, None))
+        self.assertEqual(values.getBatch().shape, (50, 1, 3))
+
+# %%
+class TestInstrumentationClass(unittest.TestCase):
+
+    def setUp(self):
+        Instrumentation.clear()
+        self.matrix = Matrix.createManual([[1,2,3],[4,5,6]])
+        self.path = os.path.join("matrices", "instrumentationTest.json")
+
+    def tearDown(self):
+        Instrumentation.enabled = False
+        Instrumentation.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def testDisabled(self):
+        # test that nothing is recorded while disabled
+        self.matrix.add(self.matrix)
+        self.assertEqual(Instrumentation.report(), {})
+
+    def testRecord(self):
+        # test that the calls, shapes, and bytes of a operation are recorded
+        Instrumentation.enabled = True
+        self.matrix.add(self.matrix)
+        self.matrix.add(self.matrix)
+        self.matrix.transpose()
+
+        report = Instrumentation.report()
+        self.assertEqual(set(report.keys()), {"Matrix.add", "Matrix.transpose"})
+        self.assertEqual(report["Matrix.add"]["calls"], 2)
+        self.assertEqual(report["Matrix.add"]["bytesRead"], 4 * 48)
+        self.assertEqual(report["Matrix.add"]["bytesWritten"], 2 * 48)
+        self.assertEqual(report["Matrix.add"]["largestShape"], [2, 3])
+        self.assertEqual(sum(report["Matrix.add"]["histogram"]), 2)
+        self.assertEqual(len(report["Matrix.add"]["histogram"]), len(Instrumentation.histogramEdges) + 1)
+
+        # test that the results of the operation are unchanged
+        np.testing.assert_array_equal(self.matrix.add(self.matrix).getMatrix(), 2 * self.matrix.getMatrix())
+
+    def testRollingWindow(self):
+        # test that only the most recent calls are kept for the percentiles
+        Instrumentation.enabled = True
+        for i in range(Instrumentation.window + 5):
+            Instrumentation.record("test", 0.5, 0.25, [(1, 1)], 8, 0)
+
+        report = Instrumentation.report()["test"]
+        self.assertEqual(report["calls"], Instrumentation.window + 5)
+        self.assertEqual(report["recentCalls"], Instrumentation.window)
+        self.assertAlmostEqual(report["totalCpu"], 0.25 * (Instrumentation.window + 5))
+        self.assertEqual(report["median"], 0.5)
+
+    def testTraceMemory(self):
+        # test that the peak memory and temporaries are traced, and that calls made by a traced call do not restart it
+        Instrumentation.enabled = True
+        Instrumentation.traceMemory = True
+        values = np.random.default_rng(0).random((100, 100))
+        Matrix(values).inverse()
+        Matrix(values).eigenDecomp()
+        Instrumentation.traceMemory = False
+
+        report = Instrumentation.report()
+        self.assertGreaterEqual(report["Matrix.inverse"]["peakBytes"], values.nbytes)
+        self.assertGreater(report["Matrix.inverse"]["temporaries"], 1)
+        self.assertEqual(report["Matrix.inverse"]["temporaryBytes"], report["Matrix.inverse"]["peakBytes"] - values.nbytes)
+        self.assertEqual(report["Matrix.transpose"]["peakBytes"], None)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def testThreads(self):
+        # test that operations timed on several threads at once are all recorded, and that one thread tracing
+        # memory does not stop the calls of the other threads from being timed
+        Instrumentation.enabled = True
+        Instrumentation.traceMemory = True
+        self.addCleanup(setattr, Instrumentation, "traceMemory", False)
+        values = np.random.default_rng(0).random((60, 60))
+
+        def run():
+            for i in range(20):
+                Matrix(values).eigenDecomp()
+
+        def runThreads():
+            threads = [threading.Thread(target = run) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # tracemalloc is not started while other threads run, so the calls are only timed
+        runThreads()
+        report = Instrumentation.report()
+        self.assertEqual(report["Matrix.eigenDecomp"]["calls"], 80)
+        self.assertEqual(report["Matrix.eigenDecomp"]["peakBytes"], None)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        # test that a running tracemalloc traces one call at a time, and not the calls they make
+        tracemalloc.start()
+        runThreads()
+        tracemalloc.stop()
+        report = Instrumentation.report()
+        self.assertEqual(report["Matrix.eigenDecomp"]["calls"], 160)
+        self.assertGreater(report["Matrix.eigenDecomp"]["peakBytes"], 0)
+        self.assertEqual(report["Matrix.transpose"]["peakBytes"], None)
+
+        # test that the calls are traced again once the threads are done
+        Instrumentation.clear()
+        Matrix(values).inverse()
+        self.assertGreater(Instrumentation.report()["Matrix.inverse"]["peakBytes"], 0)
+
+    def testDumpJSON(self):
+        # test that the report is written as JSON
+        Instrumentation.enabled = True
+        self.matrix.determinate()
+        self.assertEqual(Instrumentation.dumpJSON(self.path), True)
+
+        with open(self.path) as file:
+            timings = json.load(file)
+        self.assertEqual(list(timings["operations"].keys()), ["Matrix.determinate"])
+        self.assertEqual(timings["histogramEdges"], Instrumentation.histogramEdges)
+
+# %%
+class TestMatrixCacheClass(unittest.TestCase):
+
+    def setUp(self):
+        # each matrix takes up 24 bytes, so the cache can hold two of them
+        self.cache = MatrixCache(maxBytes = 48)
+        self.matrixA = Matrix(np.zeros((1,3)))
+        self.matrixB = Matrix(np.ones((1,3)))
+        self.matrixC = Matrix(np.identity(1))
+
+    def testGetPut(self):
+        # test that a cached matrix is only returned for the same stamp
+        self.cache.put("a", (1, 24), self.matrixA)
+        self.assertIs(self.cache.get("a", (1, 24)), self.matrixA)
+        self.assertEqual(self.cache.get("a", (2, 24)), None)
+        self.assertEqual(self.cache.get("a", (1, 24)), None)
+        self.assertEqual(self.cache.getBytes(), 0)
+
+    def testEviction(self):
+        # test that the least recently used matrix is evicted once the byte limit is passed
+        self.cache.put("a", 1, self.matrixA)
+        self.cache.put("b", 1, self.matrixB)
+        self.cache.get("a", 1)
+        self.cache.put("c", 1, self.matrixB)
+        self.assertEqual(self.cache.getNames(), ["a", "c"])
+        self.assertEqual(self.cache.getBytes(), 48)
+
+        # test that a matrix larger than the cache is not kept
+        self.cache.put("d", 1, Matrix(np.zeros((3,3))))
+        self.assertEqual(self.cache.get("d", 1), None)
+        self.assertEqual(self.cache.getNames(), ["a", "c"])
+
+    def testInvalidate(self):
+        # test that invalidated matrices are removed
+        self.cache.put("a", 1, self.matrixA)
+        self.cache.put("c", 1, self.matrixC)
+        self.cache.invalidate("a")
+        self.assertEqual(self.cache.getNames(), ["c"])
+        self.assertEqual(self.cache.getBytes(), 8)
+
+        self.cache.clear()
+        self.assertEqual(self.cache.getNames(), [])
+        self.assertEqual(self.cache.getBytes(), 0)
+
+# %%
+class TestResultCacheClass(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = ResultCache(self.folder, minCells = 0)
+        Matrix.resultCache = self.cache
+        self.matrix = Matrix.createManual([[4,1,0],[1,3,1],[0,1,2]])
+
+    def tearDown(self):
+        Matrix.resultCache = None
+        self.cache.close()
+        shutil.rmtree(self.folder, ignore_errors = True)
+
+    def testOperationsCached(self):
+        # test that the second call of each operation reads its result from the cache
+        results = [self.matrix.inverse(), self.matrix.eigenDecomp(), self.matrix.determinate(),
+                   self.matrix.solve(Matrix.createManual([[1],[2],[3]]))]
+        cached = [self.matrix.inverse(), self.matrix.eigenDecomp(), self.matrix.determinate(),
+                  self.matrix.solve(Matrix.createManual([[1],[2],[3]]))]
+
+        self.assertIsInstance(cached[0].getMatrix(), np.memmap)
+        np.testing.assert_array_equal(cached[0].getMatrix(), results[0].getMatrix())
+        for part, cachedPart in zip(results[1], cached[1]):
+            np.testing.assert_array_equal(cachedPart.getMatrix(), part.getMatrix())
+        self.assertEqual(cached[2], results[2])
+        np.testing.assert_array_equal(cached[3].getMatrix(), results[3].getMatrix())
+
+        report = self.cache.report()
+        self.assertEqual(report["entries"], 4)
+        for operation in ("inverse", "eigenDecomp", "determinate", "solve"):
+            self.assertEqual(report["operations"][operation], {"hits": 1, "misses": 1})
+
+        # test that the parameters and the values of the matrices are part of the key
+        self.assertEqual(self.matrix.eigenDecomp(valuesOnly = True)[0], None)
+        self.matrix.scale_(2)
+        np.testing.assert_allclose(self.matrix.inverse().getMatrix(), results[0].getMatrix() / 2)
+        self.assertEqual(self.cache.report()["operations"]["eigenDecomp"]["misses"], 2)
+        self.assertEqual(self.cache.report()["operations"]["inverse"]["misses"], 2)
+
+    def testPersistent(self):
+        # test that results are found by a new cache on the same folder, for a matrix with the same values
+        inverse = self.matrix.inverse()
+        self.cache.close()
+        self.cache = ResultCache(self.folder, minCells = 0)
+        Matrix.resultCache = self.cache
+
+        np.testing.assert_array_equal(Matrix.createManual([[4,1,0],[1,3,1],[0,1,2]]).inverse().getMatrix(), inverse.getMatrix())
+        self.assertEqual(self.cache.report()["operations"]["inverse"], {"hits": 1, "misses": 0})
+
+    def testEviction(self):
+        # test that the least recently used result is deleted once the byte limit is passed
+        self.cache.close()
+        self.cache = ResultCache(self.folder, maxBytes = 300, minCells = 0)
+        Matrix.resultCache = self.cache
+
+        matrixB = Matrix.createManual([[2,0,0],[0,3,0],[0,0,4]])
+        self.matrix.inverse()
+        matrixB.inverse()
+        self.assertEqual(self.cache.report()["entries"], 1)
+        self.assertLessEqual(self.cache.getBytes(), 300)
+
+        matrixB.inverse()
+        self.matrix.inverse()
+        self.assertEqual(self.cache.report()["operations"]["inverse"], {"hits": 1, "misses": 3})
+
+    def testSkipped(self):
+        # test that operations on small matrices, and results with missing files, are not read from the cache
+        self.cache.close()
+        self.cache = ResultCache(self.folder, minCells = 16)
+        Matrix.resultCache = self.cache
+        self.matrix.inverse()
+        self.assertEqual(self.cache.report()["entries"], 0)
+
+        self.cache.close()
+        self.cache = ResultCache(self.folder, minCells = 0)
+        Matrix.resultCache = self.cache
+        self.matrix.inverse()
+        for name in os.listdir(self.folder):
+            if name.endswith(".npy"):
+                os.remove(os.path.join(self.folder, name))
+        self.assertNotEqual(self.matrix.inverse(), None)
+        self.assertEqual(self.cache.report()["operations"]["inverse"], {"hits": 0, "misses": 2})
+
+        self.cache.clear()
+        self.assertEqual(self.cache.report()["entries"], 0)
+
+# %%
+class TestMatrixStoreClass(unittest.TestCase):
+
+    def setUp(self):
+        # a folder of its own, so the tests never write to the blobs and catalog of the matrices folder
+        self.folder = tempfile.mkdtemp()
+        self.store = MatrixStore(self.folder)
+        self.matrix = Matrix.createManual([[1,2,3],[4,5,6]])
+
+    def tearDown(self):
+        self.store.getCatalog().close()
+        shutil.rmtree(self.folder)
+
+    def testSaveLoad(self):
+        # test that a saved matrix is written in the binary format and loads memory mapped
+        self.assertEqual(self.store.saveMatrix("storeTest", self.matrix), True)
+        self.assertEqual(os.path.exists(os.path.join(self.folder, "storeTest" + ".npy")), True)
+
+        matrix = self.store.loadMatrix("storeTest")
+        self.assertIsInstance(matrix.getMatrix(), np.memmap)
+        np.testing.assert_allclose(matrix.getMatrix(), self.matrix.getMatrix())
+
+        # test that saving over a loaded matrix does not change the already loaded values
+        self.store.saveMatrix("storeTest", self.matrix.zero())
+        np.testing.assert_allclose(matrix.getMatrix(), self.matrix.getMatrix())
+        np.testing.assert_allclose(self.store.loadMatrix("storeTest").getMatrix(), np.zeros((2,3)))
+
+        # test that invalid matrices are not saved and missing matrices are not loaded
+        self.assertEqual(self.store.saveMatrix("storeTest", Matrix("huh")), None)
+        self.assertEqual(self.store.loadMatrix("storeTestNonExist"), None)
+
+    def testCache(self):
+        # test that loading a unchanged matrix again is served from the cache
+        self.store.saveMatrix("storeTest", self.matrix)
+        matrix = self.store.loadMatrix("storeTest")
+        self.assertIs(self.store.loadMatrix("storeTest"), matrix)
+        self.assertIn("storeTest", self.store.getCache().getNames())
+
+        # test that saving over or deleting the matrix removes it from the cache
+        self.store.saveMatrix("storeTest", self.matrix.zero())
+        self.assertNotIn("storeTest", self.store.getCache().getNames())
+        np.testing.assert_allclose(self.store.loadMatrix("storeTest").getMatrix(), np.zeros((2,3)))
+
+        self.store.deleteMatrix("storeTest")
+        self.assertEqual(self.store.loadMatrix("storeTest"), None)
+        self.assertEqual(self.store.getCache().getNames(), [])
+
+    def testLegacyCSV(self):
+        # test that CSV files from older versions are loaded, and replaced when saved over
+        path = os.path.join(self.folder, "storeTest" + ".csv")
+        np.savetxt(path, self.matrix.getMatrix(), delimiter=",")
+        np.testing.assert_allclose(self.store.loadMatrix("storeTest").getMatrix(), self.matrix.getMatrix())
+
+        self.store.saveMatrix("storeTest", self.matrix)
+        self.assertEqual(os.path.exists(path), False)
+
+    def testSparse(self):
+        # test that a sparse matrix is saved in its own format and loads sparse
+        sparse = self.matrix.toSparse()
+        self.assertEqual(self.store.saveMatrix("storeTest", sparse), True)
+        self.assertEqual(os.path.exists(os.path.join(self.folder, "storeTest" + ".npz")), True)
+
+        matrix = self.store.loadMatrix("storeTest")
+        self.assertEqual(matrix.isSparse(), True)
+        np.testing.assert_allclose(matrix.toDense().getMatrix(), self.matrix.getMatrix())
+
+        # test that saving a dense matrix with the same name replaces the sparse file
+        self.store.saveMatrix("storeTest", self.matrix)
+        self.assertEqual(os.path.exists(os.path.join(self.folder, "storeTest" + ".npz")), False)
+        self.assertEqual(self.store.loadMatrix("storeTest").isSparse(), False)
+
+    def testListDelete(self):
+        # test that saved matrices are listed once and can be deleted
+        self.store.saveMatrix("storeTest", self.matrix)
+        self.assertEqual(self.store.listMatrices().count("storeTest"), 1)
+
+        self.assertEqual(self.store.deleteMatrix("storeTest"), True)
+        self.assertNotIn("storeTest", self.store.listMatrices())
+        self.assertEqual(self.store.deleteMatrix("storeTest"), None)
+
+    def testCatalog(self):
+        # test that a saved matrix is described in the catalog without being loaded
+        self.store.saveMatrix("storeTest", Matrix.createManual([[1,2],[2,1]]))
+        info = self.store.getInfo("storeTest")
+        self.assertEqual((info["rows"], info["cols"], info["dtype"], info["extension"]), (2, 2, "int64", ".npy"))
+        self.assertEqual((info["symmetric"], info["upper"], info["lower"]), (1, 0, 0))
+
+        path = os.path.join(self.folder, "storeTest.npy")
+        self.assertEqual(info["checksum"], Matrix.createManual([[1,2],[2,1]]).contentHash())
+        self.assertEqual(info["bytes"], os.path.getsize(path))
+
+        # test that saving again keeps when it was first saved, and deleting removes it
+        self.store.saveMatrix("storeTest", self.matrix)
+        self.assertEqual(self.store.getInfo("storeTest")["created"], info["created"])
+        self.assertEqual(self.store.getInfo("storeTest")["rows"], 2)
+        self.store.deleteMatrix("storeTest")
+        self.assertEqual(self.store.getInfo("storeTest"), None)
+
+    def testFindMatrices(self):
+        # test the prefix, shape, and size queries
+        folder = tempfile.mkdtemp()
+        store = MatrixStore(folder)
+        store.saveMatrix("alpha", Matrix(np.zeros((2, 3))))
+        store.saveMatrix("alphabet", Matrix(np.zeros((20, 30))))
+        store.saveMatrix("beta", Matrix(np.zeros((2, 3))))
+
+        self.assertEqual([entry["name"] for entry in store.findMatrices(prefix = "alpha")], ["alpha", "alphabet"])
+        self.assertEqual([entry["name"] for entry in store.findMatrices(rows = 2, cols = 3)], ["alpha", "beta"])
+        self.assertEqual([entry["name"] for entry in store.findMatrices(minBytes = 1000)], ["alphabet"])
+        self.assertEqual(store.findMatrices(prefix = "b", columns = ("name", "rows")), [{"name": "beta", "rows": 2}])
+
+        store.getCatalog().close()
+        shutil.rmtree(folder)
+
+    def testDeduplication(self):
+        # test that matrices with the same contents share one blob
+        folder = tempfile.mkdtemp()
+        blobs = os.path.join(folder, "blobs")
+        store = MatrixStore(folder)
+        identity = Matrix(np.identity(50))
+
+        store.saveMatrix("first", identity)
+        store.saveMatrix("second", identity.transpose())
+        store.saveMatrix("other", self.matrix)
+        self.assertEqual(len(os.listdir(blobs)), 2)
+        self.assertTrue(os.path.samefile(os.path.join(folder, "first.npy"), os.path.join(folder, "second.npy")))
+        self.assertEqual(store.getInfo("first")["checksum"], store.getInfo("second")["checksum"])
+        self.assertNotEqual(identity.contentHash(), identity.toSparse().contentHash())
+
+        # test that a blob is only deleted once no name references it
+        store.deleteMatrix("first")
+        np.testing.assert_array_equal(store.loadMatrix("second").getMatrix(), np.identity(50))
+        self.assertEqual(len(os.listdir(blobs)), 2)
+        store.saveMatrix("second", self.matrix)
+        self.assertEqual(len(os.listdir(blobs)), 1)
+
+        # test that names removed outside of the program release their blob, and a rebuild deletes orphaned blobs
+        os.remove(os.path.join(folder, "other.npy"))
+        store.listMatrices()
+        self.assertEqual(len(os.listdir(blobs)), 1)
+        np.save(os.path.join(blobs, "orphan.npy"), np.zeros(3))
+        store.rebuildCatalog()
+        self.assertEqual(os.listdir(blobs), [store.getInfo("second")["checksum"] + ".npy"])
+
+        store.getCatalog().close()
+        shutil.rmtree(folder)
+
+    @patch('builtins.print')
+    def testCatalogOutsideChanges(self, mock_print):
+        # test that files added and removed outside of the program are found when listing
+        folder = tempfile.mkdtemp()
+        store = MatrixStore(folder)
+        store.saveMatrix("kept", self.matrix)
+        np.save(os.path.join(folder, "added.npy"), np.identity(3))
+        np.savetxt(os.path.join(folder, "legacy.csv"), self.matrix.getMatrix(), delimiter=",")
+        with open(os.path.join(folder, "broken.csv"), "w") as file:
+            file.write("1,a\n")
+
+        self.assertEqual(store.listMatrices(), ["added", "broken", "kept", "legacy"])
+        self.assertEqual(store.getInfo("added")["rows"], 3)
+        self.assertEqual(store.getInfo("legacy")["cols"], 3)
+        self.assertEqual(store.getInfo("broken")["rows"], None)
+
+        os.remove(os.path.join(folder, "added.npy"))
+        self.assertEqual(store.listMatrices(), ["broken", "kept", "legacy"])
+
+        # test that a file changed in place is found by a rebuild
+        np.save(os.path.join(folder, "kept.npy"), np.zeros((4, 4)))
+        store.rebuildCatalog()
+        self.assertEqual(store.getInfo("kept")["rows"], 4)
+
+        # test that a new store reads the same catalog
+        self.assertEqual(MatrixStore(folder).listMatrices(), ["broken", "kept", "legacy"])
+
+        store.getCatalog().close()
+        shutil.rmtree(folder)
+
+# %%
+class TestBatchRunnerClass(unittest.TestCase):
+
+    def setUp(self):
+        self.store = MatrixStore("matrices")
+        self.store.saveMatrix("batchA", Matrix.createManual([[2,1],[1,3]]))
+        self.store.saveMatrix("batchB", Matrix.createManual([[1,0],[2,1]]))
+
+    def tearDown(self):
+        for name in ["batchA", "batchB", "batchC", "batchD", "batchE"]:
+            self.store.deleteMatrix(name)
+
+    @patch('builtins.print')
+    def testRunScript(self, mock_print):
+        # test that only the saved results are written, and match running the operations by hand
+        script = ("A = load batchA  # a comment\n"
+                  "B = load batchB\n"
+                  "\n"
+                  "C = multiply A B\n"
+                  "D = inverse C\n"
+                  "E, _, values = eigenDecomp A\n"
+                  "determinate C\n"
+                  "F = toDtype D float32\n"
+                  "save F batchC\n"
+                  "save values batchD\n")
+        self.assertEqual(BatchRunner(self.store).runScript(script), True)
+
+        matrixA = Matrix.createManual([[2,1],[1,3]])
+        expected = matrixA.multiply(Matrix.createManual([[1,0],[2,1]])).inverse().getMatrix()
+        np.testing.assert_allclose(self.store.loadMatrix("batchC").getMatrix(), expected, rtol = 1e-6)
+        self.assertEqual(self.store.loadMatrix("batchC").getMatrix().dtype, np.float32)
+        np.testing.assert_allclose(self.store.loadMatrix("batchD").getMatrix(), matrixA.eigenDecomp()[2].getMatrix())
+        self.assertNotIn("C", self.store.listMatrices())
+        self.assertIn(5.0, [np.round(call.args[0], 10) for call in mock_print.call_args_list if isinstance(call.args[0], float)])
+
+    @patch('builtins.print')
+    def testFailedScript(self, mock_print):
+        # test that a script stops at a failed step, and does not save anything after it
+        script = ("A = load batchA\n"
+                  "Z = subtract A missing\n"
+                  "save A batchE\n")
+        self.assertEqual(BatchRunner(self.store).runScript(script), None)
+        self.assertNotIn("batchE", self.store.listMatrices())
+
+        # test that a script with a unknown operation or wrong amount of arguments is not run
+        self.assertEqual(BatchRunner(self.store).runScript("A = load batchA\nsave A batchE\nA = power A 2\n"), None)
+        self.assertEqual(BatchRunner(self.store).runScript("A = load batchA batchB\n"), None)
+        self.assertNotIn("batchE", self.store.listMatrices())
+
+        # test that a singular inverse fails the script
+        self.store.saveMatrix("batchE", Matrix.createManual([[1,2],[2,4]]))
+        self.assertEqual(BatchRunner(self.store).runScript("A = load batchE\nB = inverse A\n"), None)
+
+    @patch('builtins.print')
+    def testMemoryLimit(self, mock_print):
+        # test that a operation estimated to go over the limit stops the script
+        self.store.saveMatrix("batchE", Matrix(np.random.default_rng(0).random((200, 200))))
+        runner = BatchRunner(self.store, memoryLimit = 200 * 200 * 8)
+        self.assertEqual(runner.runScript("A = load batchE\nB = inverse A\n"), None)
+
+        # test that a multiply over the limit is tiled instead, with the same result
+        script = ("A = load batchE\n"
+                  "B = multiply A A\n"
+                  "save B batchC\n")
+        self.assertEqual(BatchRunner(self.store, memoryLimit = 200 * 200 * 4).runScript(script), True)
+        npMatrix = self.store.loadMatrix("batchE").getMatrix()
+        np.testing.assert_allclose(self.store.loadMatrix("batchC").getMatrix(), npMatrix @ npMatrix)
+
+    def testBatchCommand(self):
+        # test that script.py runs a script file with --batch, and exits with a error when it fails
+        path = os.path.join("matrices", "unitTestBatch" + ".txt")
+        with open(path, "w") as file:
+            file.write("A = load batchA\nB = transpose A\nsave B batchC\n")
+        output = subprocess.run([sys.executable, "script.py", "--batch", path, "--result-cache", "0"], capture_output=True, text=True)
+        self.assertEqual(output.returncode, 0)
+        self.assertIn("batchC", self.store.listMatrices())
+
+        with open(path, "w") as file:
+            file.write("A = load batchMissing\n")
+        output = subprocess.run([sys.executable, "script.py", "--batch", path, "--result-cache", "0"], capture_output=True, text=True)
+        self.assertEqual(output.returncode, 1)
+        os.remove(path)
+
+        # test that a misspelled option is a error instead of being ignored
+        output = subprocess.run([sys.executable, "script.py", "--bacth", path], capture_output=True, text=True)
+        self.assertEqual(output.returncode, 2)
+        self.assertIn("unrecognized arguments", output.stderr)
+
+class TestMatrixServerClass(unittest.TestCase):
+
+    def setUp(self):
+        # small chunks, so the values of the test matrices are sent in many pieces
+        self.chunkBytes = MatrixServer.chunkBytes
+        MatrixServer.chunkBytes = 256
+
+        self.folder = tempfile.mkdtemp()
+        MatrixStore(self.folder).saveMatrix("serverA", Matrix.createManual([[2,1],[1,3]]))
+        with patch('builtins.print'):
+            self.server = MatrixServer(self.folder, port = 0, workers = 2)
+            self.port = self.server.start()
+        self.client = MatrixClient(port = self.port)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        MatrixServer.chunkBytes = self.chunkBytes
+        shutil.rmtree(self.folder, ignore_errors = True)
+
+    def testValues(self):
+        # test that dense, sparse, transposed, and 32 bit values are sent and read back unchanged
+        npMatrix = np.random.default_rng(0).random((40, 30))
+        np.testing.assert_array_equal(self.client.call("transpose", npMatrix), npMatrix.T)
+        np.testing.assert_array_equal(self.client.call("transpose", npMatrix.T), npMatrix)
+
+        npInts = np.arange(12).reshape(3, 4).astype(np.int32)
+        self.assertEqual(self.client.call("transpose", npInts).dtype, np.int32)
+
+        sparse = SparseArray.fromDense(np.diag(np.arange(1.0, 41.0)))
+        result = self.client.call("add", sparse, sparse)
+        self.assertIsInstance(result, SparseArray)
+        np.testing.assert_array_equal(result.toDense(), 2 * np.diag(np.arange(1.0, 41.0)))
+
+    def testOperations(self):
+        # test that the operations match running them on Matrix objects, on kept and saved matrices
+        npMatrix = np.random.default_rng(1).random((50, 50)) + np.eye(50) * 50
+        self.assertEqual(self.client.put("A", npMatrix), {"name": "A", "rows": 50, "cols": 50, "dtype": "float64"})
+        np.testing.assert_allclose(self.client.call("inverse", "A"), Matrix(npMatrix).inverse().getMatrix())
+        np.testing.assert_allclose(self.client.call("multiply", "A", npMatrix), npMatrix @ npMatrix)
+        self.assertAlmostEqual(self.client.call("determinate", "serverA"), 5.0)
+        self.assertEqual(self.client.call("toDtype", "A", dtype = "float32").dtype, np.float32)
+
+        values = self.client.call("eigenDecomp", "serverA", reconstruct = False)
+        self.assertEqual(values[0], None)
+        np.testing.assert_allclose(values[2], Matrix.createManual([[2,1],[1,3]]).eigenDecomp()[2].getMatrix())
+
+        # test that kept results stay on the server, and can be saved and dropped
+        self.assertEqual(len(self.client.call("multiply", "A", "A", keep = ["B"])), 1)
+        np.testing.assert_allclose(self.client.get("B"), npMatrix @ npMatrix)
+        self.assertEqual(self.client.save("B", "serverB"), True)
+        self.client.drop("A", "B")
+        self.assertEqual(self.client.list(), ["serverA", "serverB"])
+        np.testing.assert_allclose(MatrixStore(self.folder).loadMatrix("serverB").getMatrix(), npMatrix @ npMatrix)
+
+    @patch('builtins.print')
+    def testErrors(self, mock_print):
+        # test that failed requests are answered with a error and the connection keeps working
+        self.assertEqual(self.client.call("power", "serverA"), None)
+        self.assertEqual(self.client.call("inverse", "missing"), None)
+        self.assertEqual(self.client.call("inverse", Matrix.createManual([[1,2],[2,4]])), None)
+        self.assertEqual(self.client.call("multiply", "serverA", np.ones((3, 3))), None)
+        self.assertEqual(self.client.request("add", ["serverA"])[0]["ok"], False)
+        self.assertEqual(self.client.request("transpose", [np.ones(3)])[0]["ok"], False)
+        self.assertAlmostEqual(self.client.call("determinate", "serverA"), 5.0)
+
+    @patch('builtins.print')
+    def testNames(self, mock_print):
+        # test that names that could reach outside of the matrices folder are refused
+        outside = os.path.join(os.path.dirname(self.folder), "serverOutside.npy")
+        self.addCleanup(lambda: os.path.exists(outside) and os.remove(outside))
+        np.save(outside, np.eye(2))
+
+        for name in ("../serverOutside", "..", "sub/serverA", "..\\serverA", "", os.path.join(self.folder, "serverA")):
+            self.assertEqual(self.client.get(name), None)
+            self.assertEqual(self.client.put(name, np.eye(2)), None)
+            self.assertFalse(self.client.save("serverA", name))
+        self.assertEqual(self.client.call("transpose", np.eye(2), keep = [3]), None)
+        self.assertFalse(os.path.exists(os.path.join(os.path.dirname(self.folder), "serverA.npy")))
+
+        # test that "_" still skips a result and plain names still work
+        self.assertEqual(self.client.call("transpose", np.eye(2), keep = ["_"]), [])
+        self.assertTrue(self.client.save("serverA", "serverB"))
+        np.testing.assert_array_equal(self.client.get("serverB"), [[2,1],[1,3]])
+
+    def testConcurrentClients(self):
+        # test that clients sending requests at the same time each get their own results
+        results = {}
+        def run(number):
+            npMatrix = np.eye(60) * (number + 2)
+            with MatrixClient(port = self.port) as client:
+                results[number] = [client.call("inverse", npMatrix) for i in range(5)]
+
+        threads = [threading.Thread(target = run, args = (number,)) for number in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for number in range(4):
+            for result in results[number]:
+                np.testing.assert_allclose(result, np.eye(60) / (number + 2))
+        self.assertGreaterEqual(self.server.getRequests(), 20)
+
+    def testPortInUse(self):
+        # test that a server that cannot listen raises from start instead of waiting forever, and starts no threads
+        threads = threading.active_count()
+        server = MatrixServer(self.folder, port = self.port, workers = 2)
+        with self.assertRaises(OSError):
+            server.start()
+        self.assertEqual(threading.active_count(), threads)
+
+        # test that the running server still answers
+        self.assertAlmostEqual(self.client.call("determinate", "serverA"), 5.0)
+
+    def testLoadTest(self):
+        # test that the load test script runs against the server and writes its results
+        path = os.path.join(self.folder, "load.json")
+        output = subprocess.run([sys.executable, "loadTest.py", "--port", str(self.port), "--clients", "2",
+                                 "--requests", "5", "--size", "20", "--operation", "inverse", "--output", path],
+                                capture_output=True, text=True)
+        self.assertEqual(output.returncode, 0)
+        with open(path) as file:
+            results = json.load(file)
+        self.assertEqual(results["requests"], 10)
+        self.assertEqual(results["failures"], 0)
+        self.assertLessEqual(results["p50"], results["p99"])
+
 # %%
 
 # plan of attack here is to mock the inputs into creating a matrix, 
@@ -236,26 +1554,26 @@ class TestStateMachineClass(unittest.TestCase):
         # Matrices used for testing functionality        
         
         # used to create a empty Matrix file
-        path = "matrices\\" + "testNone" + ".csv"
+        path = os.path.join("matrices", "testNone" + ".csv")
         try:
             np.savetxt(path, Matrix("a").getMatrix(), delimiter=",")
         except:
             pass
 
-        path = "matrices\\" + "test1x3" + ".csv"
+        path = os.path.join("matrices", "test1x3" + ".csv")
         np.savetxt(path, Matrix.createManual([[1,2,3]]).getMatrix(), delimiter=",")
         self.test1x3 = ("test1x3", Matrix.createImport(path))
 
-        path = "matrices\\" + "testInvertible" + ".csv"
+        path = os.path.join("matrices", "testInvertible" + ".csv")
         np.savetxt(path, Matrix.createManual([[1,2,3],[4,5,6],[7,8,11]]).getMatrix(), delimiter=",")
         self.testInvertible = ("testInvertible", Matrix.createImport(path))
 
-        path = "matrices\\" + "test3x3" + ".csv"
+        path = os.path.join("matrices", "test3x3" + ".csv")
         np.savetxt(path, Matrix.createManual([[1,2,3],[4,5,6],[7,8,9]]).getMatrix(), delimiter=",")
         self.test3x3 = ( "test3x3", Matrix.createImport(path))
 
         # used to create a csv with mixed values to show improper imported files
-        path = "matrices\\" + "testNonNumeric" + ".csv"
+        path = os.path.join("matrices", "testNonNumeric" + ".csv")
         mixedArray = np.array([[1,"lol",3]],dtype=object)
         with open(path, 'w', newline='') as csvfile:
             writer = csv.writer(csvfile, delimiter=',')
@@ -267,24 +1585,27 @@ class TestStateMachineClass(unittest.TestCase):
     def tearDown(self):
         # tear down created test files
 
-        path = "matrices\\" + "testNone" + ".csv"
+        path = os.path.join("matrices", "testNone" + ".csv")
         os.remove(path)
-        path = "matrices\\" + "test1x3" + ".csv"
+        path = os.path.join("matrices", "test1x3" + ".csv")
         os.remove(path)
-        path = "matrices\\" + "testInvertible" + ".csv"
+        path = os.path.join("matrices", "testInvertible" + ".csv")
         os.remove(path)
-        path = "matrices\\" + "test3x3" + ".csv"
+        path = os.path.join("matrices", "test3x3" + ".csv")
         os.remove(path)
-        path = "matrices\\" + "testNonNumeric" + ".csv"
+        path = os.path.join("matrices", "testNonNumeric" + ".csv")
         os.remove(path)
 
+        # the tests remove the matrices they saved as files, listing the store deletes the blobs they used
+        MatrixStore("matrices").listMatrices()
+
     # Tests below utilize mock input to test for UI fuctionality, they list of strings
     # details the path a user would need to take to perform actions with the script
 
     @patch('script.input', create=True)
     def testFolderCreate(self, mock_input):
         # test to see that saved matrices folder exists on when program is started
-        mock_input.side_effect = ["5"]
+        mock_input.side_effect = ["6"]
         StateMachine()
         folder1 = "matrices"
         os.chdir(".")
@@ -293,46 +1614,46 @@ class TestStateMachineClass(unittest.TestCase):
     @patch('script.input', create=True)
     def testInputValidation(self, mock_input):
         # test to see private inputValidation method works
-        mock_input.side_effect = ["12", "5"]
+        mock_input.side_effect = ["12", "6"]
         StateMachine()
     
     @patch('script.input', create=True)
     def testPostCreate(self, mock_input):
         # test to see private postCreate method works (show matrix + save matrix)
-        mock_input.side_effect = ["1", "1", "1", "1", "1", "testPostCreate","3", "5"]
+        mock_input.side_effect = ["1", "1", "1", "1", "1", "testPostCreate","3", "6"]
         StateMachine()
 
-        path = "matrices\\" + "testPostCreate" + ".csv"
+        path = os.path.join("matrices", "testPostCreate" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
 
         # test to see private postCreate method works (do not show matrix + save matrix)
-        mock_input.side_effect = ["1", "1", "1", "2", "1", "testPostCreate","3", "5"]
+        mock_input.side_effect = ["1", "1", "1", "2", "1", "testPostCreate","3", "6"]
         StateMachine()
 
-        path = "matrices\\" + "testPostCreate" + ".csv"
+        path = os.path.join("matrices", "testPostCreate" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
 
         # test to see private postCreate method works (show matrix + do not save matrix)
-        mock_input.side_effect = ["1", "1", "1", "1", "2", "3", "5"]
+        mock_input.side_effect = ["1", "1", "1", "1", "2", "3", "6"]
         StateMachine()
 
         # test to see private postCreate method works (do not show matrix + do not save matrix)
-        mock_input.side_effect = ["1", "1", "1", "2", "2", "3", "5"]
+        mock_input.side_effect = ["1", "1", "1", "2", "2", "3", "6"]
         StateMachine()
     
     @patch('script.input', create=True)
     def testHome(self, mock_input):
         
         # test to see that you can exit program from the home screen
-        mock_input.side_effect = ["5"]
+        mock_input.side_effect = ["6"]
         StateMachine()
     
     @patch('script.input', create=True)
     def testCreateMatrix(self, mock_input):
         # test to see that you can reach the create matrix screen and then exit
-        mock_input.side_effect = ["1", "4", "5"]
+        mock_input.side_effect = ["1", "5", "6"]
         StateMachine()
 
     @patch('script.input', create=True)
@@ -340,81 +1661,90 @@ class TestStateMachineClass(unittest.TestCase):
 
         #completely random test
         mock_input.side_effect = ["1", "1", "1", # Create completely random
-                                  "1", "1", "test","3", "5"] # Save Matrix and Exit
+                                  "1", "1", "test","3", "6"] # Save Matrix and Exit
         StateMachine()
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
 
         #random with correct parameters + whole nums
         mock_input.side_effect = ["1", "1", "2", # Create with Parameters
-                                  "1", "2", "1",            # Parameters Chosen
-                                  "1", "1", "test","3", "5"] # Save Matrix and Exit
+                                  "1", "2", "1", "1",            # Parameters Chosen
+                                  "1", "1", "test","3", "6"] # Save Matrix and Exit
         StateMachine()
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
 
         #random with correct parameters without whole nums
         mock_input.side_effect = ["1", "1", "2", # Create with Parameters
-                                  "1", "2", "2",            # Parameters Chosen
-                                  "1", "1", "test","3", "5"] # Save Matrix and Exit
+                                  "1", "2", "2", "1",            # Parameters Chosen
+                                  "1", "1", "test","3", "6"] # Save Matrix and Exit
         StateMachine()
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
 
+        #random with 32 bit decimals
+        mock_input.side_effect = ["1", "1", "2", # Create with Parameters
+                                  "1", "2", "2", "2",            # Parameters Chosen
+                                  "2", "1", "test","3", "6"] # Save Matrix and Exit
+        StateMachine()
+        path = os.path.join("matrices", "test" + ".npy")
+        self.assertEqual(Matrix.createLoad(path, mmap = False).getMatrix().dtype, np.float32)
+        os.remove(path)
+
         #random with negative rows
         mock_input.side_effect = ["1", "1", "2", # Create with Parameters
-                                  "-1", "1", "2", "1",            # Parameters Chosen
-                                  "1", "1", "test","3", "5"] # Save Matrix and Exit
+                                  "-1", "1", "2", "1", "1",            # Parameters Chosen
+                                  "1", "1", "test","3", "6"] # Save Matrix and Exit
         StateMachine()
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
 
         #random with a string for a row
         mock_input.side_effect = ["1", "1", "2", # Create with Parameters
-                                  "lol", "1", "2", "1",            # Parameters Chosen
-                                  "1", "1", "test","3", "5"] # Save Matrix and Exit
+                                  "lol", "1", "2", "1", "1",            # Parameters Chosen
+                                  "1", "1", "test","3", "6"] # Save Matrix and Exit
         StateMachine()
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
 
         #random with zero rows
         mock_input.side_effect = ["1", "1", "2", # Create with Parameters
-                                  "0", "1", "2", "1",            # Parameters Chosen
-                                  "1", "1", "test","3", "5"] # Save Matrix and Exit
+                                  "0", "1", "2", "1", "1",            # Parameters Chosen
+                                  "1", "1", "test","3", "6"] # Save Matrix and Exit
         StateMachine()
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
         
         # random with negative columns
         mock_input.side_effect = ["1", "1", "2", # Create with Parameters
-                                  "1", "-2", "2", "1",            # Parameters Chosen
-                                  "1", "1", "test","3", "5"] # Save Matrix and Exit
+                                  "1", "-2", "2", "1", "1",            # Parameters Chosen
+                                  "1", "1", "test","3", "6"] # Save Matrix and Exit
         StateMachine()
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
         
         #random with a string for a column
         mock_input.side_effect = ["1", "1", "2", # Create with Parameters
-                                  "1", "wat", "2", "1",            # Parameters Chosen
-                                  "1", "1", "test","3", "5"] # Save Matrix and Exit
+                                  "1", "wat", "2", "1", "1",            # Parameters Chosen
+                                  "1", "1", "test","3", "6"] # Save Matrix and Exit
         StateMachine()
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
 
         #random with zero columns
         mock_input.side_effect = ["1", "1", "2", # Create with Parameters
-                                  "1", "0", "2", "1",            # Parameters Chosen
-                                  "1", "1", "test","3", "5"] # Save Matrix and Exit
+                                  "1", "0", "2", "1", "1",            # Parameters Chosen
+                                  "1", "1", "test","3", "6"] # Save Matrix and Exit
         StateMachine()
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
         os.remove(path)
 
@@ -422,85 +1752,106 @@ class TestStateMachineClass(unittest.TestCase):
     def testCreateImport(self, mock_input):
 
         # test normal import
-        path = "matrices/" + self.test1x3[0] + ".csv"
+        path = os.path.join("matrices", self.test1x3[0] + ".csv")
         mock_input.side_effect = ["1", "2", path, # Create with import
-                                  "1", "1", "test", "2", "5"] # Save Matrix and Exit
+                                  "1", "1", "test", "2", "6"] # Save Matrix and Exit
         StateMachine()
         
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test1x3[1].getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test1x3[1].getMatrix())
         os.remove(path)
 
         # test no/wrong path import
-        path = "matrices/" + "doesNotExist" + ".csv"
+        path = os.path.join("matrices", "doesNotExist" + ".csv")
         mock_input.side_effect = ["1", "2", path, # Create with import
-                                  "2", "5"] # Save Matrix and Exit
+                                  "2", "6"] # Save Matrix and Exit
         StateMachine()
         
-        path = "matrices\\" + "doesNotExist" + ".csv"
+        path = os.path.join("matrices", "doesNotExist" + ".npy")
         self.assertEqual(os.path.exists(path), False)
         
         # test try again yes
-        path1 = "matrices/" + "doesNotExist" + ".csv"
-        path2 = "matrices/" + self.test1x3[0] + ".csv"
+        path1 = os.path.join("matrices", "doesNotExist" + ".csv")
+        path2 = os.path.join("matrices", self.test1x3[0] + ".csv")
         mock_input.side_effect = ["1", "2", path1,"1", path2, # Create with import twice
-                                  "1", "1", "test", "2", "5"] # Save Matrix and Exit
+                                  "1", "1", "test", "2", "6"] # Save Matrix and Exit
         StateMachine()
         
-        path = "matrices\\" + "doesNotExist" + ".csv"
+        path = os.path.join("matrices", "doesNotExist" + ".npy")
         self.assertEqual(os.path.exists(path), False)
 
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test1x3[1].getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test1x3[1].getMatrix())
         os.remove(path)
 
         # # test try again no
-        path = "matrices/" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".csv")
         mock_input.side_effect = ["1", "2", path, # Create with import
-                                  "2", "5"] # Save Matrix and Exit
+                                  "2", "6"] # Save Matrix and Exit
         StateMachine()
         
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), False)
 
         # # test import of non numeric import
-        path = "matrices/" + self.testNonNumeric[0] + ".csv"
+        path = os.path.join("matrices", self.testNonNumeric[0] + ".csv")
         mock_input.side_effect = ["1", "2", path, # Create with import
-                                  "2", "5"] # Save Matrix and Exit
+                                  "2", "6"] # Save Matrix and Exit
         StateMachine()
         
         # # test seconday import yes
-        path = "matrices/" + self.test1x3[0] + ".csv"
+        path = os.path.join("matrices", self.test1x3[0] + ".csv")
         mock_input.side_effect = ["1", "2", path, # Create with import
                                   "1", "1", "test", # first matrix saved
                                   "1", path, # Create with import
                                   "1", "1", "test2", # second matrix saved
-                                  "2", "5"] # Exit
+                                  "2", "6"] # Exit
         StateMachine()
         
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test1x3[1].getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test1x3[1].getMatrix())
         os.remove(path)
 
-        path = "matrices\\" + "test2" + ".csv"
+        path = os.path.join("matrices", "test2" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test1x3[1].getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test1x3[1].getMatrix())
         os.remove(path)
 
         # # test seconday import no
-        path = "matrices/" + self.test1x3[0] + ".csv"
+        path = os.path.join("matrices", self.test1x3[0] + ".csv")
         mock_input.side_effect = ["1", "2", path, # Create with import
-                                  "1", "1", "test", "2", "5"] # Save Matrix and Exit
+                                  "1", "1", "test", "2", "6"] # Save Matrix and Exit
         StateMachine()
         
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test1x3[1].getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test1x3[1].getMatrix())
         os.remove(path)
         
+    @patch('script.input', create=True)
+    def testCreateImportSparse(self, mock_input):
+
+        # test sparse import after a wrong path, then save it
+        path1 = os.path.join("matrices", "doesNotExist" + ".csv")
+        path2 = os.path.join("matrices", "sparseTest" + ".csv")
+        np.savetxt(path2, [[0, 0, 1], [0, 1, 2], [0, 2, 3]], delimiter=",")
+        mock_input.side_effect = ["1", "4", path1, "1", path2, # Create with sparse import twice
+                                  "1", "1", "test", "6"] # Save Matrix and Exit
+        StateMachine()
+        os.remove(path2)
+
+        path = os.path.join("matrices", "test" + ".npz")
+        self.assertEqual(os.path.exists(path), True)
+        np.testing.assert_allclose(Matrix.createLoad(path).toDense().getMatrix(), self.test1x3[1].getMatrix())
+        os.remove(path)
+
+        # test try again no
+        mock_input.side_effect = ["1", "4", path1, "2", "6"]
+        StateMachine()
+
     @patch('script.input', create=True)
     def testCreateManual(self, mock_input):
         # np.savetxt(path, Matrix.createManual([[1,2,3]]).getMatrix(), delimiter=",")
@@ -511,13 +1862,14 @@ class TestStateMachineClass(unittest.TestCase):
                                   "huh", "-3", "2.2", # wrong input column test
                                   "3", #column input
                                   "1", "2", "3", #matrix input
-                                  "1", "1", "testa", "2", "5"] # Save Matrix and Exit
+                                  "1", "1", "testa", "2", "6"] # Save Matrix and Exit
 
         StateMachine()
 
-        path = "matrices\\" + "testa" + ".csv"
+        path = os.path.join("matrices", "testa" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test1x3[1].getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test1x3[1].getMatrix())
+        self.assertEqual(Matrix.createLoad(path).getMatrix().dtype, np.int64)
         os.remove(path)
         
         #test the create loop
@@ -530,62 +1882,77 @@ class TestStateMachineClass(unittest.TestCase):
                                   "3", #column input
                                   "1", "2", "3", #matrix input
                                   "1", "1", "test2",
-                                  "2","5"] # Save Matrix and Exit
+                                  "2","6"] # Save Matrix and Exit
         
         StateMachine()
 
-        path = "matrices\\" + "test2" + ".csv"
+        path = os.path.join("matrices", "test2" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test1x3[1].getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test1x3[1].getMatrix())
         os.remove(path)
 
     @patch('script.input', create=True)
     def testListSaved(self, mock_input):
-        mock_input.side_effect = ["2", "5"] # List Matrices and Exit
+        mock_input.side_effect = ["2", "6"] # List Matrices and Exit
 
         StateMachine()
 
+    @patch('script.input', create=True)
+    def testPerformanceReport(self, mock_input):
+        # test that timing is started from the report, that saved matrices are timed, and that it can be stopped
+        path = os.path.join("matrices", "testTimings.json")
+        mock_input.side_effect = ["5", "1", "2", "5", "1", path, "4", "6"]
+        StateMachine()
+
+        with open(path) as file:
+            timings = json.load(file)
+        os.remove(path)
+
+        self.assertIn("StateMachine.listSaved", timings["operations"])
+        self.assertEqual(Instrumentation.enabled, False)
+        Instrumentation.clear()
+
     @patch('script.input', create=True)
     def testDeleteScreen(self, mock_input):
         
         # test Single Delete
-        path = "matrices\\" + "testDelete" + ".csv"
+        path = os.path.join("matrices", "testDelete" + ".csv")
         np.savetxt(path, Matrix.createManual([[1,2,3]]).getMatrix(), delimiter=",")
         self.assertEqual(os.path.exists(path), True)
 
-        mock_input.side_effect = ["4", "testDelete", "2" ,"5"] # Delete Matrix and Exit
+        mock_input.side_effect = ["4", "testDelete", "2" ,"6"] # Delete Matrix and Exit
         StateMachine()
 
-        path = "matrices\\" + "testDelete" + ".csv"
+        path = os.path.join("matrices", "testDelete" + ".csv")
         self.assertEqual(os.path.exists(path), False)
 
         # test Multi-Delete
-        path = "matrices\\" + "testDelete1" + ".csv"
+        path = os.path.join("matrices", "testDelete1" + ".csv")
         np.savetxt(path, Matrix.createManual([[1,2,3]]).getMatrix(), delimiter=",")
         self.assertEqual(os.path.exists(path), True)
 
-        path = "matrices\\" + "testDelete2" + ".csv"
+        path = os.path.join("matrices", "testDelete2" + ".csv")
         np.savetxt(path, Matrix.createManual([[1,2,3]]).getMatrix(), delimiter=",")
         self.assertEqual(os.path.exists(path), True)
 
-        mock_input.side_effect = ["4", "testDelete1", "1", "testDelete2", "2" ,"5"] # Delete Matrix and Exit
+        mock_input.side_effect = ["4", "testDelete1", "1", "testDelete2", "2" ,"6"] # Delete Matrix and Exit
         StateMachine()
 
-        path = "matrices\\" + "testDelete1" + ".csv"
+        path = os.path.join("matrices", "testDelete1" + ".csv")
         self.assertEqual(os.path.exists(path), False)
-        path = "matrices\\" + "testDelete2" + ".csv"
+        path = os.path.join("matrices", "testDelete2" + ".csv")
         self.assertEqual(os.path.exists(path), False)
 
         # test trying to delete a matrix that doesnt exist
-        mock_input.side_effect = ["4", "testDelete3", "2" ,"5"] # Delete Matrix and Exit
+        mock_input.side_effect = ["4", "testDelete3", "2" ,"6"] # Delete Matrix and Exit
         StateMachine()
 
     @patch('script.input', create=True)
     def testMatrixOpLoadRequired(self, mock_input):
         # test that to use matrix operations you most go through option 1 first
         mock_input.side_effect = ["3", # Enter Matrix Operations
-                                  "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", # try each operation without loading a matrix
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12", # try each operation without loading a matrix
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
     @patch('script.input', create=True)
@@ -593,13 +1960,13 @@ class TestStateMachineClass(unittest.TestCase):
         #test load matrix and exit
         mock_input.side_effect = ["3", "1", # Matrix Operation
                                   self.test1x3[0], 
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
         # test trying to load a non-existant matrix
         mock_input.side_effect = ["3", "1", # Matrix Operation
                                   "testNonExist", 
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
     
     @patch('script.input', create=True)
@@ -607,7 +1974,7 @@ class TestStateMachineClass(unittest.TestCase):
         # test add non existent matrix
         mock_input.side_effect = ["3", "1", self.test3x3[0], "2", # Load Matrix  and perform Operation
                                   "testNonExist", "2", # try to add non-existent matrix
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
         # test add
@@ -615,18 +1982,18 @@ class TestStateMachineClass(unittest.TestCase):
                                   "testNonExist", # Try to add a nonexistent Matrix
                                   "1", self.test3x3[0], # Retry adding one that does exist
                                   "1", "test", # Save Matrix
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test3x3[1].add(self.test3x3[1]).getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test3x3[1].add(self.test3x3[1]).getMatrix())
         os.remove(path)
 
         # test incompatible addition
         mock_input.side_effect = ["3", "1", self.test1x3[0], "2", # Load Matrix  and perform Operation
                                   "testNonExist", "1", self.test3x3[0], # Incompatible Addition
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
     @patch('script.input', create=True)
@@ -634,7 +2001,7 @@ class TestStateMachineClass(unittest.TestCase):
         # test subtract non existent matrix
         mock_input.side_effect = ["3", "1", self.test3x3[0], "3", # Load Matrix  and perform Operation
                                   "testNonExist", "2", # try to subtract non-existent matrix
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
         # test subtract
@@ -642,18 +2009,18 @@ class TestStateMachineClass(unittest.TestCase):
                                   "testNonExist", # Try to subtract a nonexistent Matrix
                                   "1", self.test3x3[0], # Retry subtracting one that does exist
                                   "1", "test", # Save Matrix
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test3x3[1].subtract(self.test3x3[1]).getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test3x3[1].subtract(self.test3x3[1]).getMatrix())
         os.remove(path)
 
         # test incompatible subtraction
         mock_input.side_effect = ["3", "1", self.test1x3[0], "3", # Load Matrix  and perform Operation
                                   "testNonExist", "1", self.test3x3[0], # Incompatible Subtraction
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
     @patch('script.input', create=True)
@@ -661,7 +2028,7 @@ class TestStateMachineClass(unittest.TestCase):
         # test multiply non existent matrix
         mock_input.side_effect = ["3", "1", self.test3x3[0], "4", # Load Matrix  and perform Operation
                                   "testNonExist", "2", 
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
         # test multiply
@@ -669,21 +2036,21 @@ class TestStateMachineClass(unittest.TestCase):
                                   "testNonExist", # Try to multiply a nonexistent Matrix
                                   "1", self.test3x3[0], # Retry multiply one that does exist
                                   "1", "test", # Save Matrix
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test3x3[1].multiply(self.test3x3[1]).getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test3x3[1].multiply(self.test3x3[1]).getMatrix())
         os.remove(path)
 
         # test incompatible multiply
         mock_input.side_effect = ["3", "1", self.test1x3[0], "4", # Load Matrix  and perform Operation
                                   "testNonExist", "1", self.test1x3[0], # Incompatible Multiplication
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), False)
 
     @patch('script.input', create=True)
@@ -691,24 +2058,24 @@ class TestStateMachineClass(unittest.TestCase):
         # test transpose
         mock_input.side_effect = ["3", "1", self.test1x3[0], "5", # Load Matrix  and perform Operation
                                   "1", "testT", # Save Matrix
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
-        path = "matrices\\" + "testT" + ".csv"
+        path = os.path.join("matrices", "testT" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test1x3[1].transpose().getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test1x3[1].transpose().getMatrix())
         os.remove(path)
 
     @patch('script.input', create=True)
     def testMatrixOp6(self, mock_input):
         # test incompatible determinate
         mock_input.side_effect = ["3", "1", self.test1x3[0], "6", # Load Matrix  and perform Operation
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
         # test determinate
         mock_input.side_effect = ["3", "1", self.test3x3[0], "6", # Load Matrix  and perform Operation
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
 
@@ -717,20 +2084,20 @@ class TestStateMachineClass(unittest.TestCase):
         # test inverse
         mock_input.side_effect = ["3", "1", self.testInvertible[0], "7", # Load Matrix  and perform Operation
                                   "1", "test", # Save Matrix
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.testInvertible[1].inverse().getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.testInvertible[1].inverse().getMatrix())
         os.remove(path)
 
         # test incompatible inverse
         mock_input.side_effect = ["3", "1", self.test1x3[0], "7", # Load Matrix  and perform Operation
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), False)
 
     @patch('script.input', create=True)
@@ -738,20 +2105,20 @@ class TestStateMachineClass(unittest.TestCase):
         # test identity
         mock_input.side_effect = ["3", "1", self.test3x3[0], "8", # Load Matrix  and perform Operation
                                   "1", "test", # Save Matrix
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test3x3[1].identity().getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), self.test3x3[1].identity().getMatrix())
         os.remove(path)
 
         # test incompatible identity
         mock_input.side_effect = ["3", "1", self.test1x3[0], "8", # Load Matrix  and perform Operation
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
-        path = "matrices\\" + "test" + ".csv"
+        path = os.path.join("matrices", "test" + ".npy")
         self.assertEqual(os.path.exists(path), False)
 
     @patch('script.input', create=True)
@@ -759,46 +2126,55 @@ class TestStateMachineClass(unittest.TestCase):
         # Test eigen decomposition 
         mock_input.side_effect = ["3", "1", self.test3x3[0], "9", # Load Matrix  and perform Operation
                                   "1", "testA", "1", "testB", "1", "testC", # Save Matrices
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
         testArray = self.test3x3[1].eigenDecomp()
-        path = "matrices\\" + "testa" + ".csv"
+        path = os.path.join("matrices", "testA" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), testArray[2].getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), testArray[2].getMatrix())
         os.remove(path)
 
-        path = "matrices\\" + "testb" + ".csv"
+        path = os.path.join("matrices", "testB" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), testArray[1].getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), testArray[1].getMatrix())
         os.remove(path)
 
-        path = "matrices\\" + "testc" + ".csv"
+        path = os.path.join("matrices", "testC" + ".npy")
         self.assertEqual(os.path.exists(path), True)
-        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), testArray[0].getMatrix())
+        np.testing.assert_allclose(Matrix.createLoad(path).getMatrix(), testArray[0].getMatrix())
         os.remove(path)
 
         # test eigen decomposition without saving
         mock_input.side_effect = ["3", "1", self.test3x3[0], "9", # Load Matrix  and perform Operation
                                   "2", "2", "2", # Do Not Save Matrices
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         StateMachine()
 
+        # test eigen decomposition of a matrix that is not diagonalizable
+        path = os.path.join("matrices", "testDefective" + ".csv")
+        np.savetxt(path, np.array([[1,1],[0,1]]), delimiter=",")
+        mock_input.side_effect = ["3", "1", "testDefective", "9", # Load Matrix  and perform Operation
+                                  "2", "2", "2", # Do Not Save Matrices
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
+        StateMachine()
+        os.remove(path)
+
     @patch('script.input', create=True)
     def testMatrixOp10(self, mock_input):
         # Test print to console
         mock_input.side_effect = ["3", "1", self.test1x3[0], "10", # Load Matrix  and perform Operation
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         
         StateMachine()
 
 
-    @patch("script.plt.show")
+    @patch("matplotlib.pyplot.show")
     @patch('script.input', create=True)
     def testMatrixOp11(self, mock_input, mock_show):
         # test for Matrix Visualization pop-up
         mock_input.side_effect = ["3", "1", self.test1x3[0], "11", # Load Matrix  and perform Operation
-                                  "12" ,"5"] # Exit Matrix Operations and Exit Program
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
         
         StateMachine()
         mock_show.assert_called_once()
@@ -807,8 +2183,21 @@ class TestStateMachineClass(unittest.TestCase):
    
     @patch('script.input', create=True)
     def testMatrixOp12(self, mock_input):
+        # test for exporting a matrix to a CSV file
+        path = os.path.join("matrices", "testExport" + ".csv")
+        mock_input.side_effect = ["3", "1", self.test3x3[0], "12", # Load Matrix  and perform Operation
+                                  path, # Export path
+                                  "13" ,"6"] # Exit Matrix Operations and Exit Program
+
+        StateMachine()
+        self.assertEqual(os.path.exists(path), True)
+        np.testing.assert_allclose(Matrix.createImport(path).getMatrix(), self.test3x3[1].getMatrix())
+        os.remove(path)
+
+    @patch('script.input', create=True)
+    def testMatrixOp13(self, mock_input):
         # test for exiting matrix operations
-        mock_input.side_effect = ["3", "12" ,"5"] 
+        mock_input.side_effect = ["3", "13" ,"6"] 
         
         StateMachine()
 